@@ -1,8 +1,13 @@
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+import structlog
 from ..config.settings import settings
-from .routes import health, sentiment, emotions, keywords, topics, language
+from ..utils.cache import CacheManager
+from .middleware import DeadlineMiddleware, PriorityMiddleware, ProfileMiddleware
+from .routes import admin, health, sentiment, emotions, keywords, topics, language, full, duplicates, stream
+
+logger = structlog.get_logger()
 
 def create_app() -> FastAPI:
     app = FastAPI(
@@ -20,29 +25,23 @@ def create_app() -> FastAPI:
     # Note: If you need models preloaded for production, set PRELOAD_MODELS=true
     @app.on_event("startup")
     async def startup_event():
-        import os
-        
-        # Only preload models if explicitly enabled (for production warm-up)
-        preload_models = os.environ.get("PRELOAD_MODELS", "false").lower() == "true"
+        if settings.ENABLE_METRICS:
+            from ..utils.metrics import start_metrics_server
+            start_metrics_server()
+
+        # Reuse results computed before the restart (or by the other workers)
+        if settings.RESULT_STORE_ENABLED and settings.RESULT_STORE_WARM_ON_STARTUP:
+            CacheManager().warm([
+                name for name in ["sentiment", "emotions", "keywords"] if settings.analyzer_enabled(name)
+            ])
         
-        if preload_models:
-            def load_models():
-                from ..models.sentiment_analyzer import SentimentAnalyzer
-                from ..models.emotion_detector import EmotionDetector
-                from ..models.keyword_extractor import KeywordExtractor
-                try:
-                    logger.info("Preloading AI models (PRELOAD_MODELS=true)")
-                    SentimentAnalyzer().initialize()
-                    EmotionDetector().initialize()
-                    KeywordExtractor().initialize()
-                    logger.info("AI models preloaded successfully")
-                except Exception as e:
-                    logger.error("Failed to preload models", error=str(e))
-            
-            # Load in background thread to not block startup
-            import threading
-            thread = threading.Thread(target=load_models, daemon=True)
-            thread.start()
+        # Only preload models if explicitly enabled (for production warm-up). Prefork
+        # workers inherit loaded models but still have to warm them up in their process
+        if settings.PRELOAD_MODELS or settings.PREFORK:
+            from ..models.warmup import start_warm_up
+            logger.info("Preloading AI models", analyzers=settings.ENABLED_ANALYZERS)
+            # Load in background thread to not block startup; /ready waits for it
+            start_warm_up()
 
     # CORS - Restrict origins based on configuration
     # In production, set CORS_ORIGINS to specific domain(s)
@@ -64,6 +63,11 @@ def create_app() -> FastAPI:
         allow_methods=["GET", "POST"],  # Restrict methods
         allow_headers=["Content-Type", "Authorization"],  # Restrict headers
     )
+    # Interactive vs bulk request lanes (X-Priority header)
+    app.add_middleware(PriorityMiddleware)
+    app.add_middleware(DeadlineMiddleware)
+    if settings.PROFILER_ENABLED:
+        app.add_middleware(ProfileMiddleware)
 
     # Include Routes
     @app.get("/")
@@ -75,11 +79,32 @@ def create_app() -> FastAPI:
             "health": "/health"
         }
 
+    # Only the enabled analyzers are mounted (ENABLED_ANALYZERS); models load on first use
+    enabled = settings.analyzer_enabled
     app.include_router(health.router, tags=["Health"])
-    app.include_router(sentiment.router, tags=["Analysis"])
-    app.include_router(emotions.router, tags=["Analysis"])
-    app.include_router(keywords.router, tags=["Analysis"])
-    app.include_router(topics.router, tags=["Analysis"])
-    app.include_router(language.router, tags=["Detection"])
+    if enabled("sentiment"):
+        app.include_router(sentiment.router, tags=["Analysis"])
+    if enabled("emotions"):
+        app.include_router(emotions.router, tags=["Analysis"])
+    if enabled("keywords"):
+        app.include_router(keywords.router, tags=["Analysis"])
+    if enabled("topics"):
+        app.include_router(topics.router, tags=["Analysis"])
+        # Brand tables in worker memory would be split across the workers
+        if settings.TOPIC_STORE_PATH or settings.WORKERS == 1:
+            app.include_router(topics.brand_router, tags=["Analysis"])
+        else:
+            logger.warning("Brand topic tracking disabled: TOPIC_STORE_PATH is empty and WORKERS > 1")
+    if all(enabled(name) for name in ("sentiment", "emotions", "keywords", "language")):
+        app.include_router(full.router, tags=["Analysis"])
+    app.include_router(duplicates.router, tags=["Analysis"])
+    if enabled("sentiment") or enabled("emotions"):
+        app.include_router(stream.router, tags=["Analysis"])
+    if enabled("language"):
+        app.include_router(language.router, tags=["Detection"])
+    if settings.ADMIN_API_KEY:
+        app.include_router(admin.router, tags=["Admin"])
+        if settings.PROFILER_ENABLED:
+            app.include_router(admin.profiler_router, tags=["Admin"])
 
     return app
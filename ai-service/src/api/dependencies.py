@@ -1,10 +1,21 @@
 
+import hmac
 from functools import lru_cache
+from typing import Optional
+from fastapi import Header
 from ..models.sentiment_analyzer import SentimentAnalyzer
 from ..models.emotion_detector import EmotionDetector
 from ..models.keyword_extractor import KeywordExtractor
 from ..models.topic_analyzer import TopicAnalyzer
+from ..models.topic_tracker import TopicTracker
 from ..models.language_detector import LanguageDetector
+from ..models.model_swap import ModelSwapper
+from ..config.settings import settings
+from ..utils.batching import LanedBatcher, MicroBatcher
+from ..utils.cache import normalize_text
+from ..utils.exceptions import AdminAccessDeniedException
+from ..utils.scheduler import BULK, INTERACTIVE, InferenceScheduler, LaneConfig
+from ..utils.metrics import track_batcher, track_scheduler
 
 # Singletons are handled within the classes themselves via __new__ or initialized here.
 # For FastAPI dependencies, we can just return these instances.
@@ -25,6 +36,81 @@ def get_keyword_extractor() -> KeywordExtractor:
 def get_topic_analyzer() -> TopicAnalyzer:
     return TopicAnalyzer()
 
+@lru_cache()
+def get_topic_tracker() -> TopicTracker:
+    return TopicTracker()
+
 @lru_cache()
 def get_language_detector() -> LanguageDetector:
     return LanguageDetector()
+
+@lru_cache()
+def get_inference_scheduler() -> InferenceScheduler:
+    scheduler = InferenceScheduler(
+        slots=settings.INFERENCE_SLOTS,
+        limits={
+            "sentiment": settings.MODEL_CONCURRENCY,
+            "emotions": settings.MODEL_CONCURRENCY,
+            "keywords": settings.KEYWORD_THREADS,
+        },
+        lanes={
+            INTERACTIVE: LaneConfig(
+                weight=settings.LANE_INTERACTIVE_WEIGHT,
+                queue_size=settings.INFERENCE_QUEUE_SIZE,
+                deadline_ms=settings.INFERENCE_QUEUE_DEADLINE_MS,
+            ),
+            BULK: LaneConfig(
+                weight=settings.LANE_BULK_WEIGHT,
+                queue_size=settings.BULK_QUEUE_SIZE,
+                deadline_ms=settings.BULK_QUEUE_DEADLINE_MS,
+            ),
+        }
+    )
+    track_scheduler(scheduler)
+    return scheduler
+
+def _laned_batcher(name: str, process_batch) -> LanedBatcher:
+    # Small batches flushed quickly for interactive requests, large preemptible ones for bulk
+    scheduler = get_inference_scheduler()
+    # Identical texts pending or running are analyzed once
+    key = normalize_text if settings.SINGLE_FLIGHT else None
+    batcher = LanedBatcher({
+        INTERACTIVE: MicroBatcher(
+            name, process_batch,
+            max_batch_size=settings.BATCH_SIZE,
+            max_wait_ms=settings.BATCH_MAX_WAIT_MS,
+            scheduler=scheduler,
+            key=key
+        ),
+        BULK: MicroBatcher(
+            name, process_batch,
+            max_batch_size=settings.BULK_BATCH_SIZE,
+            max_wait_ms=settings.BULK_MAX_WAIT_MS,
+            scheduler=scheduler,
+            key=key,
+            lane=BULK,
+            chunk_size=settings.BULK_PREEMPT_CHUNK
+        ),
+    })
+    for lane_batcher in batcher.batchers.values():
+        track_batcher(lane_batcher)
+    return batcher
+
+@lru_cache()
+def get_sentiment_batcher() -> LanedBatcher:
+    return _laned_batcher("sentiment", get_sentiment_analyzer().analyze_batch)
+
+@lru_cache()
+def get_emotion_batcher() -> LanedBatcher:
+    return _laned_batcher("emotions", get_emotion_detector().analyze_batch)
+
+@lru_cache()
+def get_model_swapper() -> ModelSwapper:
+    return ModelSwapper(get_inference_scheduler())
+
+def require_admin_key(x_admin_key: Optional[str] = Header(None)):
+    """Admin endpoints: the `X-Admin-Key` header must match ADMIN_API_KEY."""
+    if not settings.ADMIN_API_KEY or not hmac.compare_digest(
+        (x_admin_key or "").encode(), settings.ADMIN_API_KEY.encode()
+    ):
+        raise AdminAccessDeniedException()
@@ -0,0 +1,110 @@
+
+"""
+Pure ASGI middlewares: they run in the request's own task, so the context
+variables they set are seen by the route handlers and the tasks they start.
+"""
+import asyncio
+from typing import Optional
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from ..config.settings import settings
+from ..utils.deadlines import RequestBudget, current_request
+from ..utils.profiler import SamplingProfiler
+from ..utils.scheduler import INTERACTIVE, LANES, current_lane
+
+PRIORITY_HEADER = b"x-priority"
+TIMEOUT_HEADER = b"x-request-timeout-ms"
+PROFILE_HEADER = b"x-profile"
+
+def _header(scope: Scope, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1").strip()
+    return None
+
+class PriorityMiddleware:
+    """
+    Puts each request in a priority lane from its `X-Priority` header
+    (interactive | bulk). Missing or unknown values mean interactive.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        requested = (_header(scope, PRIORITY_HEADER) or "").lower()
+        lane = requested if requested in LANES else INTERACTIVE
+
+        token = current_lane.set(lane)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_lane.reset(token)
+
+class DeadlineMiddleware:
+    """
+    Gives each request a RequestBudget: a deadline from its `X-Request-Timeout-Ms`
+    header (REQUEST_TIMEOUT_MS by default, 0 = none) and a flag set when the client
+    disconnects, so that queued work nobody waits for is dropped before inference.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timeout_ms = settings.REQUEST_TIMEOUT_MS
+        requested = _header(scope, TIMEOUT_HEADER)
+        if requested:
+            try:
+                timeout_ms = float(requested)
+            except ValueError:
+                pass
+        budget = RequestBudget.from_timeout_ms(timeout_ms)
+        body_read = asyncio.Event()
+
+        async def tracked_receive() -> Message:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                budget.disconnected = True
+            elif not message.get("more_body", False):
+                body_read.set()
+            return message
+
+        async def watch_disconnect():
+            # Once the body has been read, the next ASGI message is the disconnect
+            await body_read.wait()
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            budget.disconnected = True
+
+        token = current_request.set(budget)
+        watcher = asyncio.create_task(watch_disconnect())
+        try:
+            await self.app(scope, tracked_receive, send)
+        finally:
+            watcher.cancel()
+            current_request.reset(token)
+
+class ProfileMiddleware:
+    """
+    Marks requests carrying an `X-Profile` header for a running request-mode profile
+    (POST /admin/profile?requests=K, see utils/profiler.py). Mounted with PROFILER_ENABLED.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not _header(scope, PROFILE_HEADER):
+            await self.app(scope, receive, send)
+            return
+
+        with SamplingProfiler().marked_request():
+            await self.app(scope, receive, send)
@@ -0,0 +1,58 @@
+import asyncio
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import PlainTextResponse
+from ...config.settings import settings
+from ...models.model_swap import ModelSwapper
+from ...schemas.requests import ModelSwapRequest
+from ...schemas.responses import ModelSwapStatus, ModelsStatusResponse
+from ...utils.exceptions import AnalyzerDisabledException
+from ...utils.profiler import SamplingProfiler
+from ..dependencies import get_model_swapper, require_admin_key
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin_key)])
+# Mounted with PROFILER_ENABLED only
+profiler_router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin_key)])
+
+@router.get("/models", response_model=ModelsStatusResponse)
+async def served_models(swapper: ModelSwapper = Depends(get_model_swapper)):
+    """Model and version served by each transformer analyzer, with its last swap."""
+    return ModelsStatusResponse(models=swapper.status())
+
+@router.post("/models/{analyzer}", response_model=ModelSwapStatus, status_code=202)
+async def swap_model(
+    analyzer: Literal["sentiment", "emotions"],
+    request: ModelSwapRequest,
+    swapper: ModelSwapper = Depends(get_model_swapper)
+):
+    """
+    Loads and warms `request.model` in the background, then serves it instead of the
+    current model without interrupting traffic. Poll GET /admin/models for the outcome.
+    Applies to the worker process handling the request.
+    """
+    if not settings.analyzer_enabled(analyzer):
+        raise AnalyzerDisabledException(analyzer)
+    return ModelSwapStatus(**swapper.start(analyzer, request.model))
+
+@profiler_router.post("/profile", response_class=PlainTextResponse)
+async def profile(
+    seconds: float = Query(10.0, gt=0),
+    requests: Optional[int] = Query(None, ge=1, le=1000),
+    idle: bool = False
+):
+    """
+    Samples the stacks of the worker process for `seconds`, or, with `requests`, while
+    the next `requests` requests carrying an `X-Profile` header are served (for at most
+    `seconds`). Returns flamegraph-compatible collapsed stacks. One profile at a time.
+    """
+    session = SamplingProfiler().start(
+        min(seconds, settings.PROFILER_MAX_SECONDS),
+        settings.PROFILER_INTERVAL_MS / 1000,
+        requests=requests,
+        idle=idle
+    )
+    collapsed = await asyncio.wrap_future(session.result)
+    return PlainTextResponse(collapsed, headers={
+        "X-Profile-Samples": str(session.sample_count),
+        "X-Profile-Requests": str(session.requests_done),
+    })
@@ -0,0 +1,36 @@
+
+import time
+from fastapi import APIRouter
+from ...schemas.requests import DuplicatesRequest
+from ...schemas.responses import DuplicatesResponse
+from ...utils.dedup import get_dedup_index
+from ...utils.preprocessing import TextPreprocessor
+from ..routing import TracedRoute
+
+router = APIRouter(route_class=TracedRoute)
+
+@router.post("/analyze/duplicates", response_model=DuplicatesResponse)
+def analyze_duplicates(request: DuplicatesRequest):
+    """
+    Near-duplicate cluster of each text (MinHash/LSH). Cluster IDs are shared with
+    previous requests while the cluster stays in the index, so reposts sent in
+    different batches get the same ID.
+    """
+    start = time.perf_counter()
+    cleaned_texts = [TextPreprocessor.clean_text(t) for t in request.texts]
+
+    assignments = get_dedup_index().assign(cleaned_texts)
+
+    results = [
+        {
+            "cluster_id": a["cluster_id"],
+            "is_representative": a["is_representative"],
+            "similarity": a["similarity"],
+        }
+        for a in assignments
+    ]
+    clusters = len({a["cluster_id"] for a in assignments if a["cluster_id"] >= 0})
+    clusters += sum(1 for a in assignments if a["cluster_id"] < 0)
+
+    processing_time = round((time.perf_counter() - start) * 1000, 2)
+    return DuplicatesResponse(results=results, clusters=clusters, processing_time_ms=processing_time)
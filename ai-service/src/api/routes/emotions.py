@@ -1,21 +1,40 @@
 
+import time
 from fastapi import APIRouter, Depends
-from ...schemas.requests import EmotionRequest
-from ...schemas.responses import EmotionResponse
-from ...models.emotion_detector import EmotionDetector
+from ...schemas.requests import EmotionRequest, EmotionBatchRequest
+from ...schemas.responses import EmotionResponse, EmotionBatchResponse
+from ...utils.batching import LanedBatcher
 from ...utils.preprocessing import TextPreprocessor
-from ..dependencies import get_emotion_detector
+from ..dependencies import get_emotion_batcher
+from ..routing import TracedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
 
 @router.post("/analyze/emotions", response_model=EmotionResponse)
-def analyze_emotions(
+async def analyze_emotions(
     request: EmotionRequest,
-    detector: EmotionDetector = Depends(get_emotion_detector)
+    batcher: LanedBatcher = Depends(get_emotion_batcher)
 ):
     """
     Analyze emotions (Ekman: anger, joy, sadness, fear, surprise, disgust).
     """
     cleaned_text = TextPreprocessor.clean_text(request.text)
-    result = detector.analyze(cleaned_text)
+    result = await batcher.submit(cleaned_text)
     return EmotionResponse(**result)
+
+
+@router.post("/analyze/emotions/batch", response_model=EmotionBatchResponse)
+async def analyze_emotions_batch(
+    request: EmotionBatchRequest,
+    batcher: LanedBatcher = Depends(get_emotion_batcher)
+):
+    """
+    Analyze emotions of several texts. Results keep the order of the input texts.
+    """
+    start = time.time()
+    cleaned_texts = [TextPreprocessor.clean_text(t) for t in request.texts]
+    results = await batcher.submit_many(cleaned_texts)
+    return EmotionBatchResponse(
+        results=[EmotionResponse(**result) for result in results],
+        processing_time_ms=round((time.time() - start) * 1000, 2)
+    )
@@ -1,13 +1,15 @@
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 import time
 import psutil
 import os
-from ...schemas.responses import HealthResponse, ReadyResponse
+from ...schemas.responses import HealthResponse, ReadyResponse, CacheStatsResponse
 from ...models.sentiment_analyzer import SentimentAnalyzer
 from ...models.emotion_detector import EmotionDetector
 from ...models.keyword_extractor import KeywordExtractor
-from ...models.model_state import get_models_status
+from ...models.model_state import get_models_status, get_models_memory, get_models_progress, models_ready
+from ...config.settings import settings
+from ...utils.cache import CacheManager
 
 router = APIRouter()
 START_TIME = time.time()
@@ -28,9 +30,15 @@ async def health_check():
     )
 
 @router.get("/ready", response_model=ReadyResponse)
-async def readiness_check():
-    """Readiness probe. Checks if models are actually loaded in memory."""
-    
+async def readiness_check(response: Response):
+    """
+    Readiness probe. With PRELOAD_MODELS, answers 503 until the models are loaded and
+    warmed up (see `progress`), so no traffic reaches a worker that would serve it slowly.
+    """
+    ready = models_ready()
+    if not ready:
+        response.status_code = 503
+
     loaded_count = 0
     if SentimentAnalyzer._model: loaded_count += 1
     if EmotionDetector._model: loaded_count += 1
@@ -41,7 +49,20 @@ async def readiness_check():
     memory_mb = process.memory_info().rss / 1024 / 1024
     
     return ReadyResponse(
-        ready=True,
+        ready=ready,
         models_loaded=loaded_count,
-        memory_usage_mb=round(memory_mb, 2)
+        memory_usage_mb=round(memory_mb, 2),
+        models_memory_mb=get_models_memory(),
+        quantized=settings.MODEL_QUANTIZATION and not settings.USE_GPU,
+        progress=get_models_progress()
+    )
+
+@router.get("/cache/stats", response_model=CacheStatsResponse)
+async def cache_stats():
+    """Hit/miss counters of the analysis result caches."""
+    return CacheStatsResponse(
+        enabled=settings.ENABLE_CACHE,
+        ttl_seconds=settings.CACHE_TTL_SECONDS,
+        caches=CacheManager().stats(),
+        store=CacheManager().store_stats()
     )
@@ -1,17 +1,22 @@
 
+import time
+from functools import partial
 from fastapi import APIRouter, Depends
-from ...schemas.requests import KeywordRequest
-from ...schemas.responses import KeywordResponse
+from ...schemas.requests import KeywordRequest, KeywordBatchRequest
+from ...schemas.responses import KeywordResponse, KeywordBatchResponse
 from ...models.keyword_extractor import KeywordExtractor
 from ...utils.preprocessing import TextPreprocessor
-from ..dependencies import get_keyword_extractor
+from ...utils.scheduler import InferenceScheduler
+from ..dependencies import get_keyword_extractor, get_inference_scheduler
+from ..routing import TracedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
 
 @router.post("/analyze/keywords", response_model=KeywordResponse)
-def analyze_keywords(
+async def analyze_keywords(
     request: KeywordRequest,
-    extractor: KeywordExtractor = Depends(get_keyword_extractor)
+    extractor: KeywordExtractor = Depends(get_keyword_extractor),
+    scheduler: InferenceScheduler = Depends(get_inference_scheduler)
 ):
     """
     Extract keywords and named entities.
@@ -21,9 +26,32 @@ def analyze_keywords(
     # Use detected language or default to fr
     lang = request.language if request.language else "fr"
     
-    result = extractor.extract(
+    result = await scheduler.run("keywords", partial(
+        extractor.extract,
         cleaned_text, 
         max_keywords=request.max_keywords,
         lang=lang
-    )
+    ))
     return KeywordResponse(**result)
+
+@router.post("/analyze/keywords/batch", response_model=KeywordBatchResponse)
+async def analyze_keywords_batch(
+    request: KeywordBatchRequest,
+    extractor: KeywordExtractor = Depends(get_keyword_extractor),
+    scheduler: InferenceScheduler = Depends(get_inference_scheduler)
+):
+    """
+    Extract keywords for several texts in one pass (spaCy nlp.pipe + YAKE).
+    Results keep the order of the input texts.
+    """
+    start = time.perf_counter()
+    cleaned_texts = [TextPreprocessor.clean_text(t) for t in request.texts]
+    lang = request.language if request.language else "fr"
+
+    results = await scheduler.run(
+        "keywords",
+        partial(extractor.extract_batch, cleaned_texts, max_keywords=request.max_keywords, lang=lang)
+    )
+
+    processing_time = round((time.perf_counter() - start) * 1000, 2)
+    return KeywordBatchResponse(results=results, processing_time_ms=processing_time)
@@ -1,12 +1,14 @@
 
+import time
 from fastapi import APIRouter, Depends
-from ...schemas.requests import LanguageDetectionRequest
-from ...schemas.responses import LanguageResponse
+from ...schemas.requests import LanguageDetectionRequest, LanguageDetectionBatchRequest
+from ...schemas.responses import LanguageResponse, LanguageBatchResponse
 from ...models.language_detector import LanguageDetector
 from ...utils.preprocessing import TextPreprocessor
 from ..dependencies import get_language_detector
+from ..routing import TracedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
 
 @router.post("/detect/language", response_model=LanguageResponse)
 def detect_language(
@@ -19,3 +21,17 @@ def detect_language(
     cleaned_text = TextPreprocessor.clean_text(request.text)
     result = detector.detect(cleaned_text)
     return LanguageResponse(**result)
+
+@router.post("/detect/language/batch", response_model=LanguageBatchResponse)
+def detect_language_batch(
+    request: LanguageDetectionBatchRequest,
+    detector: LanguageDetector = Depends(get_language_detector)
+):
+    """
+    Detect the language of several texts in one vectorized pass (input order kept).
+    """
+    start = time.perf_counter()
+    cleaned_texts = [TextPreprocessor.clean_text(t) for t in request.texts]
+    results = detector.detect_batch(cleaned_texts)
+    processing_time = round((time.perf_counter() - start) * 1000, 2)
+    return LanguageBatchResponse(results=results, processing_time_ms=processing_time)
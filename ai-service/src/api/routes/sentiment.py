@@ -1,39 +1,56 @@
 
+import time
 from fastapi import APIRouter, Depends
-from ...schemas.requests import SentimentRequest
-from ...schemas.responses import SentimentResponse
-from ...models.sentiment_analyzer import SentimentAnalyzer
+from ...schemas.requests import SentimentRequest, SentimentBatchRequest
+from ...schemas.responses import SentimentResponse, SentimentBatchResponse
+from ...utils.batching import LanedBatcher
 from ...utils.preprocessing import TextPreprocessor
-from ..dependencies import get_sentiment_analyzer
-import hashlib
-from ...utils.cache import simple_memory_cache
-
-router = APIRouter()
-
-@simple_memory_cache()
-def _analyze_cached(text: str, analyzer: SentimentAnalyzer):
-    # Helper to cache logic if needed, but simple_memory_cache wraps function calls.
-    # Since we can't easily cache async route handlers or pass complex objects to lru_cache key,
-    # we usually cache the model method or a service function.
-    # For this project, we'll cache at the service/model level or here if inputs are simple.
-    return analyzer.analyze(text)
+from ..dependencies import get_sentiment_batcher
+from ..routing import TracedRoute
 
+router = APIRouter(route_class=TracedRoute)
 
 @router.post("/analyze/sentiment", response_model=SentimentResponse)
-def analyze_sentiment(
+async def analyze_sentiment(
     request: SentimentRequest,
-    analyzer: SentimentAnalyzer = Depends(get_sentiment_analyzer)
+    batcher: LanedBatcher = Depends(get_sentiment_batcher)
 ):
     """
     Analyze sentiment of the given text.
     Categories: POSITIVE, NEGATIVE, NEUTRAL, MIXED.
+    Concurrent requests are coalesced into a single model call.
     """
     cleaned_text = TextPreprocessor.clean_text(request.text)
     
-    result = analyzer.analyze(cleaned_text)
+    result = await batcher.submit(cleaned_text)
     
     # Add manual language override if provided (though model is multilingual)
     if request.language:
         result["language_detected"] = request.language
         
     return SentimentResponse(**result)
+
+
+@router.post("/analyze/sentiment/batch", response_model=SentimentBatchResponse)
+async def analyze_sentiment_batch(
+    request: SentimentBatchRequest,
+    batcher: LanedBatcher = Depends(get_sentiment_batcher)
+):
+    """
+    Analyze sentiment of several texts. Results keep the order of the input texts.
+    """
+    start = time.time()
+    cleaned_texts = [TextPreprocessor.clean_text(t) for t in request.texts]
+
+    results = await batcher.submit_many(cleaned_texts)
+
+    responses = []
+    for result in results:
+        if request.language:
+            result = {**result, "language_detected": request.language}
+        responses.append(SentimentResponse(**result))
+
+    return SentimentBatchResponse(
+        results=responses,
+        processing_time_ms=round((time.time() - start) * 1000, 2)
+    )
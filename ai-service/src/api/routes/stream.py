@@ -0,0 +1,217 @@
+import asyncio
+import json
+from typing import AsyncIterator, Dict, List, Optional, Set, Union
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from starlette.requests import ClientDisconnect
+import structlog
+from ...config.settings import settings
+from ...schemas.requests import StreamRecord
+from ...models.language_detector import LanguageDetector
+from ...utils.batching import LanedBatcher
+from ...utils.deadlines import current_request
+from ...utils.exceptions import AnalyzerDisabledException, ServiceOverloadedException, TooManyRequestsException
+from ...utils.scheduler import BULK, current_lane
+from ...utils.preprocessing import TextPreprocessor
+from ..dependencies import get_sentiment_batcher, get_emotion_batcher, get_language_detector
+from ..routing import TracedRoute
+
+logger = structlog.get_logger()
+
+router = APIRouter(route_class=TracedRoute)
+
+# Longest legitimate record: a text fully \u-escaped plus the other fields
+MAX_LINE_BYTES = settings.MAX_TEXT_LENGTH * 6 + 1024
+# Backoff while admission control rejects work because of other traffic
+RETRY_DELAY_SECONDS = 0.05
+MAX_RETRY_DELAY_SECONDS = 1.0
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body iterator reads the request body itself.
+    Starlette's version listens for disconnects concurrently, which would swallow
+    the request body messages: the iterator detects disconnects instead.
+    """
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+async def ndjson_lines(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[Optional[bytes]]:
+    """
+    Splits a byte stream into lines without buffering more than one line. Lines
+    longer than `max_line_bytes` are skipped and reported as None.
+    """
+    buffer = b""
+    skipping = False
+    async for chunk in chunks:
+        buffer += chunk
+        while True:
+            newline = buffer.find(b"\n")
+            if newline < 0:
+                break
+            line, buffer = buffer[:newline], buffer[newline + 1:]
+            if skipping:
+                # Tail of an over-long line
+                skipping = False
+                continue
+            if len(line) > max_line_bytes:
+                yield None
+            elif line.strip():
+                yield line
+        if len(buffer) > max_line_bytes:
+            if not skipping:
+                yield None
+            skipping = True
+            buffer = b""
+    if buffer.strip() and not skipping:
+        yield buffer
+
+def _parse(line: Optional[bytes]) -> Union[StreamRecord, Dict]:
+    """The record of a line, or the error line to send back for it."""
+    if line is None:
+        return {"id": None, "error": f"Ligne trop longue (max {MAX_LINE_BYTES} octets)"}
+    try:
+        return StreamRecord.model_validate_json(line)
+    except ValidationError as e:
+        try:
+            record_id = json.loads(line).get("id")
+        except (ValueError, AttributeError):
+            record_id = None
+        error = e.errors()[0]
+        field = ".".join(str(part) for part in error["loc"])
+        return {"id": record_id, "error": f"Enregistrement invalide ({field}): {error['msg']}"}
+
+async def _submit(batcher: LanedBatcher, text: str) -> Dict:
+    # A backfill slows down instead of failing records when the queue is full
+    delay = RETRY_DELAY_SECONDS
+    while True:
+        try:
+            return await batcher.submit(text)
+        except (TooManyRequestsException, ServiceOverloadedException):
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RETRY_DELAY_SECONDS)
+
+async def _analyze_record(
+    record: StreamRecord,
+    tasks: List[str],
+    sentiment_batcher: LanedBatcher,
+    emotion_batcher: LanedBatcher,
+    detector: LanguageDetector,
+) -> Dict:
+    result: Dict = {"id": record.id}
+    try:
+        text = TextPreprocessor.clean_text(record.text)
+        if "language" in tasks:
+            if record.language:
+                code = TextPreprocessor.normalize_language_code(record.language)
+                result["language"] = {"language": code, "confidence": 1.0, "alternatives": []}
+            else:
+                result["language"] = detector.detect(text)
+
+        jobs = {}
+        if "sentiment" in tasks:
+            jobs["sentiment"] = _submit(sentiment_batcher, text)
+        if "emotions" in tasks:
+            jobs["emotions"] = _submit(emotion_batcher, text)
+        for task, value in zip(jobs, await asyncio.gather(*jobs.values())):
+            result[task] = value
+
+        if record.language and "sentiment" in result:
+            result["sentiment"] = {**result["sentiment"], "language_detected": record.language}
+    except Exception as e:
+        logger.error("Stream record failed", id=record.id, error=str(e))
+        return {"id": record.id, "error": "Erreur lors de l'analyse"}
+    return result
+
+def _dump(result: Dict) -> bytes:
+    return (json.dumps(result, ensure_ascii=False) + "\n").encode("utf-8")
+
+async def _wait_for_disconnect(request: Request):
+    # Once the body has been read, the next ASGI message is the disconnect
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+
+async def _stream_results(
+    request: Request,
+    tasks: List[str],
+    sentiment_batcher: LanedBatcher,
+    emotion_batcher: LanedBatcher,
+    detector: LanguageDetector,
+) -> AsyncIterator[bytes]:
+    # Backfills never compete with interactive requests: the records (and the tasks
+    # created for them) run in the bulk lane whatever the X-Priority header says
+    current_lane.set(BULK)
+    # A stream can outlive any request timeout; its disconnect is handled below
+    current_request.set(None)
+    window = max(1, settings.STREAM_MAX_IN_FLIGHT)
+    in_flight: Set[asyncio.Task] = set()
+    disconnect: Optional[asyncio.Task] = None
+    records = errors = 0
+
+    try:
+        async for line in ndjson_lines(request.stream(), MAX_LINE_BYTES):
+            parsed = _parse(line)
+            if isinstance(parsed, dict):
+                errors += 1
+                yield _dump(parsed)
+                continue
+
+            records += 1
+            in_flight.add(asyncio.create_task(
+                _analyze_record(parsed, tasks, sentiment_batcher, emotion_batcher, detector)
+            ))
+            # Backpressure: stop reading the body until a result has been sent
+            if len(in_flight) >= window:
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield _dump(task.result())
+
+        disconnect = asyncio.create_task(_wait_for_disconnect(request))
+        while in_flight:
+            done, _ = await asyncio.wait(in_flight | {disconnect}, return_when=asyncio.FIRST_COMPLETED)
+            if disconnect in done:
+                logger.info("Stream client disconnected", pending=len(in_flight))
+                return
+            in_flight -= done
+            for task in done:
+                yield _dump(task.result())
+    except ClientDisconnect:
+        logger.info("Stream client disconnected while sending", records=records)
+    finally:
+        for task in in_flight:
+            task.cancel()
+        if disconnect is not None:
+            disconnect.cancel()
+        logger.info("Stream finished", records=records, invalid=errors)
+
+@router.post("/analyze/stream", response_class=NDJSONStreamingResponse)
+async def analyze_stream(
+    request: Request,
+    tasks: str = Query(
+        "sentiment,emotions",
+        pattern=r"^(sentiment|emotions|language)(,(sentiment|emotions|language))*$",
+        description="Comma-separated analyses to run on each record"
+    ),
+    sentiment_batcher: LanedBatcher = Depends(get_sentiment_batcher),
+    emotion_batcher: LanedBatcher = Depends(get_emotion_batcher),
+    detector: LanguageDetector = Depends(get_language_detector),
+):
+    """
+    Bulk analysis for backfills. The body is NDJSON, one `{"id", "text", "language"?}`
+    record per line; one result line per record is streamed back as soon as it is
+    ready (completion order, matched by `id`). At most STREAM_MAX_IN_FLIGHT records
+    are read ahead of the results, so the body is never buffered whole and a client
+    reading results slowly slows down the reading of its input. Records run in the
+    bulk priority lane.
+    """
+    task_list = tasks.split(",")
+    for task in task_list:
+        if not settings.analyzer_enabled(task):
+            raise AnalyzerDisabledException(task)
+    return NDJSONStreamingResponse(_stream_results(
+        request, task_list, sentiment_batcher, emotion_batcher, detector
+    ))
@@ -1,12 +1,17 @@
 
-from fastapi import APIRouter, Depends
-from ...schemas.requests import TopicRequest
-from ...schemas.responses import TopicResponse
+from fastapi import APIRouter, Depends, Query
+from ...schemas.requests import TopicRequest, TopicUpdateRequest
+from ...schemas.responses import TopicResponse, BrandTopicsResponse, TopicTrackerStats
 from ...models.topic_analyzer import TopicAnalyzer
+from ...models.topic_tracker import TopicTracker
+from ...utils.exceptions import BrandNotFoundException
 from ...utils.preprocessing import TextPreprocessor
-from ..dependencies import get_topic_analyzer
+from ..dependencies import get_topic_analyzer, get_topic_tracker
+from ..routing import TracedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
+# Per-brand tracking: mounted when the brand tables are shared by the workers (see app.py)
+brand_router = APIRouter(route_class=TracedRoute)
 
 @router.post("/analyze/topics", response_model=TopicResponse)
 def analyze_topics(
@@ -19,3 +24,40 @@ def analyze_topics(
     cleaned_texts = [TextPreprocessor.clean_text(t) for t in request.texts]
     result = analyzer.analyze(cleaned_texts, num_topics=request.num_topics)
     return TopicResponse(**result)
+
+@brand_router.post("/topics/{brand}", response_model=TopicTrackerStats)
+def update_brand_topics(
+    brand: str,
+    request: TopicUpdateRequest,
+    tracker: TopicTracker = Depends(get_topic_tracker)
+):
+    """
+    Fold new mentions of a brand into its trending topics (only send new mentions).
+    """
+    cleaned_texts = [TextPreprocessor.clean_text(t) for t in request.texts]
+    return TopicTrackerStats(**tracker.update(brand, cleaned_texts))
+
+@brand_router.get("/topics/{brand}", response_model=BrandTopicsResponse)
+def get_brand_topics(
+    brand: str,
+    num_topics: int = Query(5, ge=1, le=50),
+    tracker: TopicTracker = Depends(get_topic_tracker)
+):
+    """
+    Current trending topics of a brand.
+    """
+    result = tracker.topics(brand, num_topics=num_topics)
+    if result is None:
+        raise BrandNotFoundException(brand)
+    return BrandTopicsResponse(**result)
+
+@brand_router.delete("/topics/{brand}", status_code=204)
+def delete_brand_topics(
+    brand: str,
+    tracker: TopicTracker = Depends(get_topic_tracker)
+):
+    """
+    Stop tracking a brand and drop its topics.
+    """
+    if not tracker.delete(brand):
+        raise BrandNotFoundException(brand)
@@ -0,0 +1,102 @@
+
+"""
+Route class tracing each request (SERVER_TIMING, see utils/tracing.py).
+
+FastAPI parses and validates the body, calls the endpoint, then validates and
+renders the response in one handler: the endpoint is wrapped so the handler's time
+splits into validate, endpoint and serialize spans.
+"""
+import asyncio
+import functools
+import json
+import time
+from typing import Callable
+from fastapi.routing import APIRoute
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from ..config.settings import settings
+from ..utils.tracing import RequestTrace, current_trace
+
+SERVER_TIMING_HEADER = "Server-Timing"
+
+def _traced_endpoint(endpoint: Callable) -> Callable:
+    # include_router() builds the app's routes again from the router's endpoints
+    if getattr(endpoint, "_traced", False):
+        return endpoint
+
+    # functools.wraps keeps the signature FastAPI reads parameters and dependencies from
+    def enter(trace: RequestTrace) -> float:
+        now = time.perf_counter()
+        trace.add("validate", now - trace.started)
+        return now
+
+    def leave(trace: RequestTrace, entered: float):
+        trace.endpoint_done = time.perf_counter()
+        trace.add("endpoint", trace.endpoint_done - entered)
+
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            trace = current_trace.get()
+            if trace is None:
+                return await endpoint(*args, **kwargs)
+            entered = enter(trace)
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                leave(trace, entered)
+        async_wrapper._traced = True
+        return async_wrapper
+
+    # Sync endpoints run on the thread pool, in a copy of the request's context
+    @functools.wraps(endpoint)
+    def sync_wrapper(*args, **kwargs):
+        trace = current_trace.get()
+        if trace is None:
+            return endpoint(*args, **kwargs)
+        entered = enter(trace)
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            leave(trace, entered)
+    sync_wrapper._traced = True
+    return sync_wrapper
+
+def _add_to_body(response: Response, trace: RequestTrace):
+    if not isinstance(response, JSONResponse):
+        return
+    body = json.loads(response.body)
+    if isinstance(body, dict):
+        body["server_timing"] = trace.as_ms()
+        response.body = response.render(body)
+        response.headers["content-length"] = str(len(response.body))
+
+class TracedRoute(APIRoute):
+    """Returns the request's spans in a `Server-Timing` header (and body, SERVER_TIMING_IN_BODY)."""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, _traced_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def traced_handler(request: Request) -> Response:
+            if not settings.SERVER_TIMING:
+                return await handler(request)
+            trace = RequestTrace()
+            token = current_trace.set(trace)
+            try:
+                response = await handler(request)
+            finally:
+                current_trace.reset(token)
+
+            now = time.perf_counter()
+            if trace.endpoint_done is not None:
+                trace.add("serialize", now - trace.endpoint_done)
+            trace.add("total", now - trace.started)
+            if settings.SERVER_TIMING_IN_BODY:
+                _add_to_body(response, trace)
+            response.headers.append(SERVER_TIMING_HEADER, trace.server_timing())
+            return response
+
+        return traced_handler
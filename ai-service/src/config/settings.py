@@ -7,33 +7,135 @@ class Settings(BaseSettings):
     HOST: str = "0.0.0.0"
     PORT: int = 8000
     WORKERS: int = 2
+    PREFORK: bool = False  # Load models once, then fork the workers (see src/prefork.py)
     LOG_LEVEL: str = "info"
 
     # CORS - Restrict to specific origins in production
     CORS_ORIGINS: str = "*"  # Comma-separated list of allowed origins
+
+    # Admin endpoints (/admin/*), mounted only when set; sent in the `X-Admin-Key` header
+    ADMIN_API_KEY: str = ""
     
+    # Analyzers served by this worker (comma-separated): sentiment, emotions, keywords,
+    # topics, language. Routes of the others aren't mounted and their models never load
+    ENABLED_ANALYZERS: str = "sentiment,emotions,keywords,topics,language"
+
     # Models
     SENTIMENT_MODEL: str = "nlptown/bert-base-multilingual-uncased-sentiment"
     EMOTION_MODEL: str = "j-hartmann/emotion-english-distilroberta-base"
     USE_GPU: bool = False
+    INFERENCE_BACKEND: str = "torch"  # torch | onnx
+    ONNX_MODEL_DIR: str = "models/onnx"  # Output of `python -m src.utils.export_onnx`
+    # Memory-mapped safetensors bundle (`python -m src.utils.build_bundle`); empty = Hugging Face cache
+    MODEL_BUNDLE_DIR: str = ""
+    # Model input windows, in tokens. Longer texts are split into windows and the scores aggregated
+    SENTIMENT_MAX_TOKENS: int = 512
+    EMOTION_MAX_TOKENS: int = 512
+    LONG_TEXT_STRATEGY: str = "weighted_mean"  # weighted_mean | mean | head_tail
+    CHUNK_OVERLAP_TOKENS: int = 32
+    MAX_CHUNKS_PER_TEXT: int = 8
+    # Sentiment cascade: a lexicon/linear fast stage answers the texts it is confident about,
+    # the others are escalated to the transformer
+    SENTIMENT_CASCADE: bool = False
+    SENTIMENT_CASCADE_THRESHOLD: float = 0.85
+    SENTIMENT_FAST_MODEL_PATH: str = ""  # Output of `python -m src.utils.train_fast_sentiment`; empty = lexicon only
+    # Load the models at startup and warm them up (a batch of WARMUP_SAMPLES_PATH texts, by
+    # default the bundled sample, then one text per WARMUP_LENGTHS word count): /ready
+    # answers 503 until then. Without it, models load lazily on first request
+    PRELOAD_MODELS: bool = False
+    WARMUP_SAMPLES_PATH: str = ""
+    WARMUP_LENGTHS: str = "16,128,512,2048"
 
     # Cache
     ENABLE_CACHE: bool = True
     CACHE_SIZE: int = 1000
     CACHE_TTL_SECONDS: int = 3600
+    # Persistent result store shared by all workers of a node (survives restarts)
+    RESULT_STORE_ENABLED: bool = False
+    RESULT_STORE_PATH: str = "data/results.sqlite3"
+    RESULT_STORE_MAX_MB: int = 512
+    RESULT_STORE_TTL_SECONDS: int = 7 * 24 * 3600
+    RESULT_STORE_WARM_ON_STARTUP: bool = True
+    # Identical requests (same content hash and parameters) in flight at the same time share one computation
+    SINGLE_FLIGHT: bool = True
+
+    # Near-duplicate detection (MinHash/LSH): models only run on cluster representatives
+    DEDUP_ENABLED: bool = False
+    DEDUP_THRESHOLD: float = 0.85  # Estimated Jaccard similarity of character 5-grams
+    DEDUP_NUM_PERM: int = 64
+    DEDUP_BANDS: int = 16
+    DEDUP_MAX_ENTRIES: int = 50000
+    DEDUP_MIN_LENGTH: int = 30  # Shorter texts are never merged
 
     # Preprocessing
     MAX_TEXT_LENGTH: int = 5000
     REMOVE_URLS: bool = True
     REMOVE_EMOJIS: bool = False
+    # Texts shorter than this many characters get the most likely candidate language, unless
+    # none of them is plausible (probability below 0.1)
+    LANGUAGE_SHORT_TEXT_CHARS: int = 30
+    LANGUAGE_SHORT_TEXT_CANDIDATES: str = "fr,en,es"
+
+    # Topic tracking (per brand, in memory)
+    TOPIC_MAX_BRANDS: int = 1000
+    TOPIC_CAPACITY: int = 2000  # Phrases tracked per brand
+    TOPIC_HALF_LIFE_HOURS: float = 24.0  # 0 = no decay
+    TOPIC_MIN_COUNT: float = 2.0
+    TOPIC_MAX_DOC_RATIO: float = 0.95
+    # SQLite file shared by the workers of a node and kept across restarts; empty = worker
+    # memory only, and /topics/{brand} is then only mounted with WORKERS=1
+    TOPIC_STORE_PATH: str = ""
 
     # Performance
     BATCH_SIZE: int = 16
+    BATCH_MAX_WAIT_MS: float = 5.0  # How long the batcher waits to coalesce concurrent requests
+    # Inference scheduler: CPU-heavy jobs run on INFERENCE_SLOTS threads
+    INFERENCE_SLOTS: int = 4
+    # torch/onnxruntime intra-op threads per slot (0 = cores / INFERENCE_SLOTS) and inter-op threads
+    INFERENCE_THREADS: int = 0
+    INFERENCE_INTEROP_THREADS: int = 1
+    MODEL_CONCURRENCY: int = 1  # Concurrent batches per transformer model
+    KEYWORD_THREADS: int = 2  # Concurrent spaCy/YAKE jobs
+    # Admission control: reject (503) beyond INFERENCE_QUEUE_SIZE queued jobs, and (429)
+    # when the estimated queueing delay exceeds INFERENCE_QUEUE_DEADLINE_MS
+    INFERENCE_QUEUE_SIZE: int = 64
+    INFERENCE_QUEUE_DEADLINE_MS: float = 2000.0
+    # Priority lanes: requests with `X-Priority: bulk` (and /analyze/stream) use the bulk lane,
+    # the others the interactive one (BATCH_SIZE, BATCH_MAX_WAIT_MS and the queue limits above).
+    # Slots are shared in proportion to the lane weights; bulk batches run in chunks of
+    # BULK_PREEMPT_CHUNK texts and give their slot back between chunks when interactive work waits
+    LANE_INTERACTIVE_WEIGHT: int = 4
+    LANE_BULK_WEIGHT: int = 1
+    BULK_BATCH_SIZE: int = 64
+    BULK_MAX_WAIT_MS: float = 50.0
+    BULK_PREEMPT_CHUNK: int = 16
+    BULK_QUEUE_SIZE: int = 256
+    BULK_QUEUE_DEADLINE_MS: float = 30000.0
+    # YAKE scoring of batches with at least KEYWORD_PROCESS_MIN_BATCH texts runs on a process pool (0 = off)
+    KEYWORD_PROCESSES: int = 2
+    KEYWORD_PROCESS_MIN_BATCH: int = 32
     MODEL_QUANTIZATION: bool = False
+    # /analyze/stream: records read ahead of the results sent back (bounds memory per connection)
+    STREAM_MAX_IN_FLIGHT: int = 128
+    # Default request deadline (0 = none), overridden per request by `X-Request-Timeout-Ms`.
+    # Queued work of expired or disconnected requests is dropped before inference
+    REQUEST_TIMEOUT_MS: float = 30000.0
 
     # Monitoring
     ENABLE_METRICS: bool = False
     METRICS_PORT: int = 9090
+    # Per-request span timings in a `Server-Timing` response header, and optionally in a
+    # `server_timing` field of JSON response bodies
+    SERVER_TIMING: bool = True
+    SERVER_TIMING_IN_BODY: bool = False
+    # Sampling profiler (POST /admin/profile, needs ADMIN_API_KEY): samples every thread's
+    # stack each PROFILER_INTERVAL_MS for at most PROFILER_MAX_SECONDS per profile
+    PROFILER_ENABLED: bool = False
+    PROFILER_INTERVAL_MS: float = 10.0
+    PROFILER_MAX_SECONDS: float = 60.0
+
+    def analyzer_enabled(self, name: str) -> bool:
+        return name in {analyzer.strip() for analyzer in self.ENABLED_ANALYZERS.split(",")}
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -10,10 +10,15 @@ configure_logging()
 app = create_app()
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "src.main:app",
-        host=settings.HOST,
-        port=settings.PORT,
-        workers=settings.WORKERS,
-        reload=False
-    )
\ No newline at end of file
+    if settings.PREFORK:
+        # Models loaded once, workers forked: weights shared copy-on-write
+        from .prefork import serve
+        serve(app)
+    else:
+        uvicorn.run(
+            "src.main:app",
+            host=settings.HOST,
+            port=settings.PORT,
+            workers=settings.WORKERS,
+            reload=False
+        )
\ No newline at end of file
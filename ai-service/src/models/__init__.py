@@ -3,4 +3,5 @@ from .sentiment_analyzer import SentimentAnalyzer
 from .emotion_detector import EmotionDetector
 from .keyword_extractor import KeywordExtractor
 from .topic_analyzer import TopicAnalyzer
+from .topic_tracker import TopicTracker
 from .language_detector import LanguageDetector
@@ -1,11 +1,16 @@
 
-from transformers import pipeline
-from typing import Dict
+from functools import partial
+from typing import Any, Dict, List, Tuple
+import threading
 import time
 import structlog
 from ..config.settings import settings
 from ..utils.exceptions import ModelLoadException
-from .model_state import set_emotion_loaded
+from ..utils.cache import CacheManager, content_cache_key
+from ..utils.dedup import cache_contents
+from ..utils.metrics import record_stages, track_model_load
+from .inference_backend import create_backend, backend_memory_mb, backend_version, chunked_classifier
+from .model_state import set_emotion_loaded, set_model_memory
 
 logger = structlog.get_logger()
 
@@ -17,6 +22,8 @@ class EmotionDetector:
     _instance = None
     _model = None
     _initialized = False
+    _model_name = None  # Model served; the configured one until a hot-swap (see model_swap.py)
+    _swap_lock = threading.Lock()
 
     def __new__(cls):
         if cls._instance is None:
@@ -26,33 +33,85 @@ class EmotionDetector:
     def initialize(self):
         if not self.__class__._initialized:
             try:
-                logger.info("Loading Emotion Model...", model=settings.EMOTION_MODEL)
-                device = 0 if settings.USE_GPU else -1
-                self.__class__._model = pipeline(
-                    "text-classification",
-                    model=settings.EMOTION_MODEL,
-                    device=device,
-                    top_k=None
-                )
-                self.__class__._initialized = True
-                set_emotion_loaded(True)
+                logger.info("Loading Emotion Model...", backend=settings.INFERENCE_BACKEND, model=settings.EMOTION_MODEL)
+                with track_model_load("emotions"):
+                    model = self.load_model(settings.EMOTION_MODEL)
+                self.activate(settings.EMOTION_MODEL, model)
                 logger.info("Emotion Model loaded successfully")
             except Exception as e:
                 logger.error("Failed to load emotion model", error=str(e))
                 raise ModelLoadException("EmotionDetector", str(e))
 
+    def load_model(self, model_name: str):
+        """Builds the backend of `model_name` without serving it."""
+        return create_backend("text-classification", model_name, max_tokens=settings.EMOTION_MAX_TOKENS)
+
+    def activate(self, model_name: str, model):
+        """Serves `model` from now on. Batches already running finish on the previous one."""
+        with self.__class__._swap_lock:
+            self.__class__._model = model
+            self.__class__._model_name = model_name
+            self.__class__._initialized = True
+        set_model_memory("emotions", backend_memory_mb(model))
+        set_emotion_loaded(True)
+
+    def active_model(self) -> Tuple[Any, str]:
+        """The served model and its version, read together since a swap can happen at any time."""
+        with self.__class__._swap_lock:
+            return self.__class__._model, self.model_version
+
     def analyze(self, text: str) -> Dict:
+        return self.analyze_batch([text])[0]
+
+    def analyze_batch(self, texts: List[str]) -> List[Dict]:
+        """Detects emotions for several texts in a single pipeline call (input order kept)."""
         if not self.__class__._initialized:
             self.initialize()
 
         start = time.time()
-        truncated_text = text[:2000]
+        model, version = self.active_model()
+        # Near-duplicates (reposts, templated texts) share their cluster representative's result
+        keys = [
+            content_cache_key(
+                content, version,
+                max_tokens=settings.EMOTION_MAX_TOKENS, strategy=settings.LONG_TEXT_STRATEGY
+            )
+            for content in cache_contents(texts)
+        ]
 
         try:
-            results = self.__class__._model(truncated_text)[0]
-            # results: [{'label': 'joy', 'score': 0.9}, {'label': 'anger', 'score': 0.05}, ...]
-            
-            emotions_map = {item['label']: item['score'] for item in results}
+            results = CacheManager().get_or_compute_many(
+                "emotions", keys, texts, partial(self._analyze_uncached, model=model)
+            )
+        except Exception as e:
+            logger.error("Error during emotion analysis", error=str(e), batch_size=len(texts))
+            raise e
+
+        processing_time = round((time.time() - start) * 1000, 2)
+        for result in results:
+            result["processing_time_ms"] = processing_time
+
+        return results
+
+    @property
+    def model_name(self) -> str:
+        return self.__class__._model_name or settings.EMOTION_MODEL
+
+    @property
+    def model_version(self) -> str:
+        return backend_version(self.model_name)
+
+    def _analyze_uncached(self, texts: List[str], model=None) -> List[Dict]:
+        # Long texts are classified window by window (see utils/chunking.py)
+        classifier = chunked_classifier(model or self.__class__._model, settings.EMOTION_MAX_TOKENS)
+        with record_stages("emotions"):
+            outputs = classifier(texts)
+        # each output: [{'label': 'joy', 'score': 0.9}, {'label': 'anger', 'score': 0.05}, ...]
+
+        results: List[Dict] = []
+
+        for scores_list in outputs:
+            emotions_map = {item['label']: item['score'] for item in scores_list}
             
             # Ensure all Ekman emotions are present
             base_emotions = ["anger", "joy", "sadness", "fear", "surprise", "disgust", "neutral"]
@@ -61,14 +120,9 @@ class EmotionDetector:
             # Find dominant
             dominant = max(scores, key=scores.get)
             
-            processing_time = (time.time() - start) * 1000
-            
-            return {
+            results.append({
                 "emotions": scores,
-                "dominant_emotion": dominant,
-                "processing_time_ms": round(processing_time, 2)
-            }
-            
-        except Exception as e:
-            logger.error("Error during emotion analysis", error=str(e))
-            raise e
+                "dominant_emotion": dominant
+            })
+
+        return results
@@ -0,0 +1,156 @@
+
+"""
+Cheap first stage of the sentiment cascade.
+
+A FR/EN lexicon (negations and intensifiers included) scores a text in a few
+microseconds. When a linear model on hashed word n-grams has been trained
+(`python -m src.utils.train_fast_sentiment`), it replaces the lexicon scores,
+the lexicon masses being two of its features. Texts the fast stage is not
+confident about are escalated to the transformer by SentimentAnalyzer.
+"""
+import json
+import math
+import os
+import re
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import structlog
+
+logger = structlog.get_logger()
+
+LEXICON_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "utils", "data", "sentiment_lexicon.json")
+# Hashed word 1-2 grams, plus the positive and negative lexicon masses
+HASH_FEATURES = 2 ** 18
+NGRAM_RANGE = (1, 2)
+# Class order of the linear model's rows
+CLASSES = ("negative", "neutral", "positive")
+# Words after a negation whose polarity is flipped ("pas très bon", "not good at all")
+NEGATION_SCOPE = 3
+
+_TOKEN_RE = re.compile(r"\w+")
+
+def fold_text(text: str) -> str:
+    """Lowercase, accents removed ("Déçu" and "decu" match the same entry), "n't" expanded."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    folded = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return folded.replace("n't", " not").replace("n’t", " not")
+
+class FastSentimentModel:
+    """Lexicon scorer, optionally refined by a linear model (see module docstring)."""
+
+    def __init__(self, lexicon: Dict, weights: Optional[Dict[str, np.ndarray]] = None):
+        self.polarity: Dict[str, float] = {}
+        for word, weight in lexicon["positive"].items():
+            self.polarity[fold_text(word)] = float(weight)
+        for word, weight in lexicon["negative"].items():
+            self.polarity[fold_text(word)] = -float(weight)
+        self.negations = {fold_text(word) for word in lexicon["negations"]}
+        self.intensifiers = {fold_text(word): float(factor) for word, factor in lexicon["intensifiers"].items()}
+        self.emoji = {char: float(weight) for char, weight in lexicon["emoji"].items()}
+
+        self.coef = self.intercept = None
+        self._vectorizer = None
+        if weights is not None:
+            self.coef = weights["coef"].astype(np.float32)
+            self.intercept = weights["intercept"].astype(np.float32)
+            if self.coef.shape != (len(CLASSES), HASH_FEATURES + 2):
+                raise ValueError(f"Unexpected linear model shape {self.coef.shape}")
+
+    @classmethod
+    def load(cls, weights_path: Optional[str] = None) -> "FastSentimentModel":
+        with open(LEXICON_PATH, encoding="utf-8") as f:
+            lexicon = json.load(f)
+        weights = None
+        if weights_path:
+            with np.load(weights_path) as data:
+                weights = {"coef": data["coef"], "intercept": data["intercept"]}
+            logger.info("Fast sentiment linear model loaded", path=weights_path)
+        return cls(lexicon, weights)
+
+    @property
+    def stage(self) -> str:
+        """Name reported in the `stage` field of the results this model answers."""
+        return "linear" if self.coef is not None else "lexicon"
+
+    def lexicon_masses(self, text: str) -> Tuple[float, float]:
+        """Sums of the positive and negative lexicon weights found in `text`."""
+        positive = negative = 0.0
+        negated_until = -1
+        boost = 1.0
+        for position, token in enumerate(_TOKEN_RE.findall(fold_text(text))):
+            if token in self.negations:
+                negated_until = position + NEGATION_SCOPE
+                continue
+            if token in self.intensifiers:
+                boost = self.intensifiers[token]
+                continue
+            weight = self.polarity.get(token)
+            if weight is not None:
+                weight *= boost
+                if position <= negated_until:
+                    weight = -weight
+                if weight > 0:
+                    positive += weight
+                else:
+                    negative -= weight
+            boost = 1.0
+
+        for char in text:
+            weight = self.emoji.get(char)
+            if weight is not None:
+                if weight > 0:
+                    positive += weight
+                else:
+                    negative -= weight
+        return positive, negative
+
+    def features(self, texts: List[str]):
+        """Sparse feature matrix of the linear model: hashed n-grams, then the two lexicon masses."""
+        from scipy.sparse import csr_matrix, hstack
+
+        if self._vectorizer is None:
+            from sklearn.feature_extraction.text import HashingVectorizer
+            self._vectorizer = HashingVectorizer(
+                n_features=HASH_FEATURES,
+                ngram_range=NGRAM_RANGE,
+                alternate_sign=False,
+                preprocessor=fold_text,
+                token_pattern=r"(?u)\b\w+\b",
+            )
+        masses = np.log1p(np.array([self.lexicon_masses(text) for text in texts], dtype=np.float32))
+        return hstack([self._vectorizer.transform(texts), csr_matrix(masses)], format="csr")
+
+    def predict(self, texts: List[str]) -> List[Tuple[Dict[str, float], float]]:
+        """
+        (scores, confidence) per text, scores being the positive/negative/neutral
+        probabilities. The lexicon alone only vouches for polar texts: its confidence
+        is that of the positive or negative class, so neutral texts are escalated.
+        """
+        if self.coef is not None:
+            logits = self.features(texts) @ self.coef.T + self.intercept
+            logits = np.asarray(logits)
+            logits -= logits.max(axis=1, keepdims=True)
+            probabilities = np.exp(logits)
+            probabilities /= probabilities.sum(axis=1, keepdims=True)
+            predictions = []
+            for row in probabilities:
+                scores = {label: round(float(p), 4) for label, p in zip(CLASSES, row)}
+                predictions.append((scores, round(float(row.max()), 4)))
+            return predictions
+
+        predictions = []
+        for text in texts:
+            positive, negative = self.lexicon_masses(text)
+            total = positive + negative
+            # More evidence, more confidence; its balance splits it between the two poles
+            strength = 1.0 - math.exp(-total)
+            pos_score = strength * positive / total if total else 0.0
+            neg_score = strength * negative / total if total else 0.0
+            scores = {
+                "positive": round(pos_score, 4),
+                "negative": round(neg_score, 4),
+                "neutral": round(1.0 - strength, 4),
+            }
+            predictions.append((scores, round(max(pos_score, neg_score), 4)))
+        return predictions
@@ -0,0 +1,235 @@
+
+"""
+Inference backends for the transformer analyzers.
+
+Both backends are called like a Hugging Face text-classification pipeline with
+top_k=None: `backend(texts, batch_size=..., truncation=True)` returns, for each
+text, the list of `{"label", "score"}` dicts sorted by descending score. The
+analyzers therefore apply the exact same post-processing whatever the backend.
+"""
+import json
+import os
+from functools import partial
+from typing import Dict, List, Tuple
+import numpy as np
+import structlog
+from ..config.settings import settings
+from ..utils.chunking import ChunkedClassifier
+from ..utils.metrics import stage, timed_stage
+from ..utils.quantization import quantize_dynamic_int8, model_memory_mb
+
+logger = structlog.get_logger()
+
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_QUANTIZED_MODEL_FILE = "model.int8.onnx"
+BUNDLE_WEIGHTS_FILE = "model.safetensors"
+
+def inference_threads() -> int:
+    """
+    Intra-op threads per inference slot. Up to INFERENCE_SLOTS jobs run side by side
+    (see utils.scheduler), so by default each gets its share of the cores instead of
+    every model spinning up a thread per core.
+    """
+    if settings.INFERENCE_THREADS > 0:
+        return settings.INFERENCE_THREADS
+    return max(1, (os.cpu_count() or 2) // max(1, settings.INFERENCE_SLOTS))
+
+def configure_torch_threads():
+    """Applies the per-slot intra-op and the inter-op thread counts to torch."""
+    import torch
+
+    torch.set_num_threads(inference_threads())
+    try:
+        torch.set_num_interop_threads(max(1, settings.INFERENCE_INTEROP_THREADS))
+    except RuntimeError:
+        # Can only be set once per process, before any inter-op work (e.g. already
+        # set by the prefork parent)
+        pass
+
+def bundle_model_dir(model_name: str) -> str:
+    """Directory of a model in the pre-converted bundle (output of `python -m src.utils.build_bundle`)."""
+    return os.path.join(settings.MODEL_BUNDLE_DIR, model_name.replace("/", "--"))
+
+def load_bundled_model(model_dir: str):
+    """
+    Model and tokenizer from a bundle directory. The safetensors weights are
+    memory-mapped and assigned to the model as they are (no copy, no random init):
+    loading is near instant and the pages are shared by every process using the
+    bundle, through the page cache.
+    """
+    from safetensors.torch import load_file
+    from transformers import AutoConfig, AutoModelForSequenceClassification, AutoTokenizer
+    from transformers.modeling_utils import no_init_weights
+
+    config = AutoConfig.from_pretrained(model_dir)
+    with no_init_weights():
+        model = AutoModelForSequenceClassification.from_config(config)
+    state_dict = load_file(os.path.join(model_dir, BUNDLE_WEIGHTS_FILE))
+    missing, unexpected = model.load_state_dict(state_dict, strict=False, assign=True)
+    # Non-persistent buffers (position ids, ...) are built by the constructor
+    missing = [key for key in missing if key not in dict(model.named_buffers())]
+    if missing or unexpected:
+        raise ValueError(f"Bundle {model_dir} doesn't match its config: missing={missing}, unexpected={unexpected}")
+    model.tie_weights()
+    model.eval()
+    return model, AutoTokenizer.from_pretrained(model_dir)
+
+def onnx_model_dir(model_name: str) -> str:
+    """Directory holding the exported ONNX graph, tokenizer and config of a model."""
+    return os.path.join(settings.ONNX_MODEL_DIR, model_name.replace("/", "--"))
+
+class OnnxBackend:
+    """Runs an exported classification graph through onnxruntime on CPU (no torch needed)."""
+
+    def __init__(self, model_dir: str, quantized: bool = False, max_tokens: int = 512):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_file = ONNX_QUANTIZED_MODEL_FILE if quantized else ONNX_MODEL_FILE
+        self.model_path = os.path.join(model_dir, model_file)
+        if not os.path.exists(self.model_path):
+            raise FileNotFoundError(
+                f"{self.model_path} not found. Run 'python -m src.utils.export_onnx' first."
+            )
+
+        with open(os.path.join(model_dir, "config.json"), encoding="utf-8") as f:
+            config = json.load(f)
+        self.id2label = {int(k): v for k, v in config["id2label"].items()}
+        self.multi_label = config.get("problem_type") == "multi_label_classification"
+
+        tokenizer_config = {}
+        tokenizer_config_path = os.path.join(model_dir, "tokenizer_config.json")
+        if os.path.exists(tokenizer_config_path):
+            with open(tokenizer_config_path, encoding="utf-8") as f:
+                tokenizer_config = json.load(f)
+
+        # Same truncation and padding as the transformers tokenizer
+        max_length = min(max_tokens, int(tokenizer_config.get("model_max_length", max_tokens)))
+        pad_token = tokenizer_config.get("pad_token")
+        if isinstance(pad_token, dict):
+            pad_token = pad_token.get("content")
+
+        tokenizer_path = os.path.join(model_dir, "tokenizer.json")
+        self.tokenizer = Tokenizer.from_file(tokenizer_path)
+        self.tokenizer.enable_truncation(max_length=max_length)
+        pad_id = self.tokenizer.token_to_id(pad_token) if pad_token else None
+        if pad_id is None:
+            pad_id = config.get("pad_token_id") or 0
+        self.tokenizer.enable_padding(pad_id=pad_id, pad_token=pad_token or "[PAD]")
+        # Untruncated, unpadded copy used to split long texts into windows
+        self.offsets_tokenizer = Tokenizer.from_file(tokenizer_path)
+        self.offsets_tokenizer.no_truncation()
+        self.offsets_tokenizer.no_padding()
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = inference_threads()
+        options.inter_op_num_threads = max(1, settings.INFERENCE_INTEROP_THREADS)
+        self.session = ort.InferenceSession(
+            self.model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def __call__(self, texts: List[str], batch_size: int = 16, truncation: bool = True) -> List[List[Dict]]:
+        outputs: List[List[Dict]] = []
+        for i in range(0, len(texts), max(1, batch_size)):
+            with stage("tokenize"):
+                encodings = self.tokenizer.encode_batch(texts[i:i + batch_size])
+                features = {
+                    "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+                    "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+                    "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+                }
+            with stage("forward"):
+                logits = self.session.run(None, {name: features[name] for name in self.input_names})[0]
+            with stage("postprocess"):
+                outputs.extend(self._to_scores(row) for row in logits)
+        return outputs
+
+    def token_offsets(self, texts: List[str]) -> List[List[Tuple[int, int]]]:
+        """Char offsets of every token of each text, without special tokens or truncation."""
+        encodings = self.offsets_tokenizer.encode_batch(texts, add_special_tokens=False)
+        return [e.offsets for e in encodings]
+
+    def _to_scores(self, logits: np.ndarray) -> List[Dict]:
+        # Same activation as the transformers pipeline: softmax, or sigmoid for multi-label
+        if self.multi_label:
+            probs = 1 / (1 + np.exp(-logits))
+        else:
+            exp = np.exp(logits - logits.max())
+            probs = exp / exp.sum()
+        scores = [{"label": self.id2label[i], "score": float(p)} for i, p in enumerate(probs)]
+        scores.sort(key=lambda item: item["score"], reverse=True)
+        return scores
+
+def backend_version(model_name: str) -> str:
+    """Identifies what produced a result (model, backend, precision); part of the cache keys."""
+    precision = "int8" if settings.MODEL_QUANTIZATION and not settings.USE_GPU else "fp32"
+    return f"{model_name}@{settings.INFERENCE_BACKEND}-{precision}"
+
+def create_backend(task: str, model_name: str, max_tokens: int = 512):
+    """Builds the inference backend selected by INFERENCE_BACKEND."""
+    quantize = settings.MODEL_QUANTIZATION and not settings.USE_GPU
+
+    if settings.INFERENCE_BACKEND == "onnx":
+        return OnnxBackend(onnx_model_dir(model_name), quantized=quantize, max_tokens=max_tokens)
+
+    if settings.INFERENCE_BACKEND != "torch":
+        raise ValueError(f"Unknown INFERENCE_BACKEND '{settings.INFERENCE_BACKEND}' (torch, onnx)")
+
+    # Imported here so ONNX deployments never load torch
+    from transformers import pipeline
+
+    configure_torch_threads()
+
+    device = 0 if settings.USE_GPU else -1
+    bundle_dir = bundle_model_dir(model_name)
+    if settings.MODEL_BUNDLE_DIR and os.path.exists(os.path.join(bundle_dir, BUNDLE_WEIGHTS_FILE)):
+        model, tokenizer = load_bundled_model(bundle_dir)
+        backend = pipeline(task, model=model, tokenizer=tokenizer, device=device, top_k=None)
+        logger.info("Model loaded from bundle (memory-mapped)", model=model_name, path=bundle_dir)
+    else:
+        if settings.MODEL_BUNDLE_DIR:
+            logger.warning("Model missing from bundle, loading from the Hugging Face cache", model=model_name)
+        backend = pipeline(task, model=model_name, device=device, top_k=None)
+    # truncation=True cuts at model_max_length: align it with the configured window
+    backend.tokenizer.model_max_length = min(backend.tokenizer.model_max_length, max_tokens)
+    # The pipeline looks these up on the instance for every item/batch
+    backend.preprocess = timed_stage("tokenize", backend.preprocess)
+    backend.forward = timed_stage("forward", backend.forward)
+    backend.postprocess = timed_stage("postprocess", backend.postprocess)
+    if quantize:
+        # int8 dynamic quantization of the Linear layers (CPU only). The quantized
+        # weights are private to the process: use the bundle's int8 ONNX graph
+        # (INFERENCE_BACKEND=onnx) to get both int8 and shared pages
+        backend.model = quantize_dynamic_int8(backend.model)
+        logger.info("Model quantized to int8", model=model_name)
+    return backend
+
+def token_offsets(backend, texts: List[str]) -> List[List[Tuple[int, int]]]:
+    """Char offsets of the tokens of each text, for either backend."""
+    if isinstance(backend, OnnxBackend):
+        return backend.token_offsets(texts)
+    encodings = backend.tokenizer(
+        texts, add_special_tokens=False, truncation=False,
+        return_offsets_mapping=True, verbose=False
+    )
+    return [[tuple(offset) for offset in offsets] for offsets in encodings["offset_mapping"]]
+
+def chunked_classifier(backend, max_tokens: int) -> ChunkedClassifier:
+    """Wraps a backend so texts longer than `max_tokens` are split into windows, not truncated."""
+    return ChunkedClassifier(
+        backend,
+        partial(token_offsets, backend),
+        max_tokens=max_tokens,
+        strategy=settings.LONG_TEXT_STRATEGY,
+        overlap_tokens=settings.CHUNK_OVERLAP_TOKENS,
+        max_windows=settings.MAX_CHUNKS_PER_TEXT,
+        batch_size=settings.BATCH_SIZE,
+    )
+
+def backend_memory_mb(backend) -> float:
+    """Weight footprint of a backend, in MB."""
+    if isinstance(backend, OnnxBackend):
+        return round(os.path.getsize(backend.model_path) / 1024 / 1024, 2)
+    return model_memory_mb(backend.model)
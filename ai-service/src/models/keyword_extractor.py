@@ -1,16 +1,46 @@
 
-import yake
-import spacy
-from typing import List, Dict
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from importlib.metadata import version
+from itertools import repeat
+from typing import List, Dict, Tuple, Union
 import time
 import structlog
+from ..config.settings import settings
 from ..utils.exceptions import ModelLoadException
+from ..utils.cache import CacheManager, make_cache_key
+from ..utils.keyword_scoring import yake_keywords_many
+from ..utils.metrics import record_stages, stage, track_model_load
 from .model_state import set_keyword_loaded
 
 logger = structlog.get_logger()
 
 logger = structlog.get_logger()
 
+# Categories mapping
+LABEL_MAP = {
+    "ORG": "ORGANIZATION",
+    "PER": "PERSON",
+    "LOC": "LOCATION",
+    "GPE": "LOCATION",
+    "PRODUCT": "PRODUCT"
+}
+
+def keep_ner_only(nlp):
+    """
+    Disables every pipeline component except the NER (and the shared tok2vec when
+    the NER listens to it): only `doc.ents` is used, the parser, tagger and
+    lemmatizer are wasted work.
+    """
+    keep = {"ner"}
+    for name, component in nlp.pipeline:
+        if "ner" in getattr(component, "listening_components", []):
+            keep.add(name)
+    for name in nlp.pipe_names:
+        if name not in keep:
+            nlp.disable_pipe(name)
+    return nlp
+
 class KeywordExtractor:
     """
     Keyword Extraction using YAKE (Statistical/Lightweight) + Spacy for Named Entities (NER).
@@ -20,6 +50,7 @@ class KeywordExtractor:
     _nlp_fr = None
     _nlp_en = None
     _initialized = False
+    _process_pool = None
 
     def __new__(cls):
         if cls._instance is None:
@@ -31,10 +62,11 @@ class KeywordExtractor:
             try:
                 logger.info("Loading SpaCy models...")
                 # Assuming models are downloaded in Dockerfile
-                import fr_core_news_sm
-                import en_core_web_sm
-                self.__class__._nlp_fr = fr_core_news_sm.load()
-                self.__class__._nlp_en = en_core_web_sm.load()
+                with track_model_load("keywords"):
+                    import fr_core_news_sm
+                    import en_core_web_sm
+                    self.__class__._nlp_fr = keep_ner_only(fr_core_news_sm.load())
+                    self.__class__._nlp_en = keep_ner_only(en_core_web_sm.load())
                 self.__class__._initialized = True
                 set_keyword_loaded(True)
                 logger.info("SpaCy models loaded.")
@@ -48,73 +80,123 @@ class KeywordExtractor:
         return self.__class__._nlp_en # Default to English
 
     def extract(self, text: str, max_keywords: int = 10, lang: str = "fr") -> Dict:
+        return self.extract_batch([text], max_keywords=max_keywords, lang=lang)[0]
+
+    def extract_batch(self, texts: List[str], max_keywords: int = 10, lang: Union[str, List[str]] = "fr") -> List[Dict]:
+        """
+        Extracts keywords for several texts (input order kept). `lang` is either one
+        language for all texts or one language per text.
+        """
         if not self.__class__._initialized:
             self.initialize()
 
         start = time.time()
-        keywords_list = []
-        
+        langs = [lang] * len(texts) if isinstance(lang, str) else list(lang)
+
         try:
-            # 1. Spacy NER (Named Entity Recognition) - High Quality
-            nlp = self._get_nlp_model(lang)
-            doc = nlp(text)
-            
-            seen_words = set()
-            
-            # Categories mapping
-            label_map = {
-                "ORG": "ORGANIZATION",
-                "PER": "PERSON",
-                "LOC": "LOCATION",
-                "GPE": "LOCATION",
-                "PRODUCT": "PRODUCT"
-            }
-
-            for ent in doc.ents:
-                if ent.text.lower() not in seen_words and ent.label_ in label_map:
-                    keywords_list.append({
-                        "word": ent.text,
-                        "score": 1.0, # High confidence for NER
-                        "category": label_map.get(ent.label_, "ENTITY")
-                    })
-                    seen_words.add(ent.text.lower())
+            keys = [
+                make_cache_key(text, self.model_version, max_keywords=max_keywords, lang=text_lang)
+                for text, text_lang in zip(texts, langs)
+            ]
+            keywords_lists = CacheManager().get_or_compute_many(
+                "keywords", keys, list(zip(texts, langs)),
+                lambda items: self._extract_keywords_batch(items, max_keywords)
+            )
+        except Exception as e:
+            logger.error("Error during keyword extraction", error=str(e), batch_size=len(texts))
+            return [{"keywords": [], "processing_time_ms": 0.0} for _ in texts]
+
+        processing_time = round((time.time() - start) * 1000, 2)
+        return [
+            {"keywords": keywords_list, "processing_time_ms": processing_time}
+            for keywords_list in keywords_lists
+        ]
+
+    @property
+    def model_version(self) -> str:
+        # Read from the package metadata: importing spaCy takes seconds
+        return f"spacy-{version('spacy')}+yake"
+
+    def _extract_keywords_batch(self, items: List[Tuple[str, str]], max_keywords: int) -> List[List[Dict]]:
+        with record_stages("keywords"):
+            # 1. Spacy NER (Named Entity Recognition) - High Quality, one nlp.pipe per language
+            entities: List[List[Tuple[str, str]]] = [[] for _ in items]
+            with stage("forward"):
+                for lang in {text_lang for _, text_lang in items}:
+                    indexes = [i for i, (_, text_lang) in enumerate(items) if text_lang == lang]
+                    docs = self._get_nlp_model(lang).pipe(
+                        (items[i][0] for i in indexes), batch_size=settings.BATCH_SIZE
+                    )
+                    for i, doc in zip(indexes, docs):
+                        entities[i] = [(ent.text, ent.label_) for ent in doc.ents]
 
             # 2. YAKE Extraction (Statistical) - Good for general topics
-            # YAKE configuration
-            kw_extractor = yake.KeywordExtractor(
-                lan=lang, 
-                n=2,              # Bigrams max
-                dedupLim=0.9, 
-                top=max_keywords, 
-                features=None
+            with stage("postprocess"):
+                yake_results = self._yake_batch(items, max_keywords)
+
+                return [
+                    self._merge_keywords(text_entities, text_yake, max_keywords)
+                    for text_entities, text_yake in zip(entities, yake_results)
+                ]
+
+    def _yake_batch(self, items: List[Tuple[str, str]], top: int) -> List[List[Tuple[str, float]]]:
+        """YAKE is pure Python: large batches are scored on a process pool to use several cores."""
+        workers = settings.KEYWORD_PROCESSES
+        if workers < 1 or len(items) < settings.KEYWORD_PROCESS_MIN_BATCH:
+            return yake_keywords_many(items, top)
+
+        chunk_size = -(-len(items) // (workers * 4))
+        chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+        try:
+            results: List[List[Tuple[str, float]]] = []
+            for chunk_result in self._get_process_pool().map(yake_keywords_many, chunks, repeat(top)):
+                results.extend(chunk_result)
+            return results
+        except Exception as e:
+            logger.warning("YAKE process pool failed, scoring in process", error=str(e))
+            self.__class__._process_pool = None
+            return yake_keywords_many(items, top)
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        if self.__class__._process_pool is None:
+            # spawn: forking a process that holds torch and batcher threads isn't safe
+            self.__class__._process_pool = ProcessPoolExecutor(
+                max_workers=settings.KEYWORD_PROCESSES,
+                mp_context=multiprocessing.get_context("spawn")
             )
+        return self.__class__._process_pool
+
+    def _merge_keywords(
+        self,
+        entities: List[Tuple[str, str]],
+        yake_keywords: List[Tuple[str, float]],
+        max_keywords: int
+    ) -> List[Dict]:
+        keywords_list = []
+        seen_words = set()
+
+        for text, label in entities:
+            if text.lower() not in seen_words and label in LABEL_MAP:
+                keywords_list.append({
+                    "word": text,
+                    "score": 1.0, # High confidence for NER
+                    "category": LABEL_MAP.get(label, "ENTITY")
+                })
+                seen_words.add(text.lower())
+
+        for kw, score in yake_keywords:
+            # YAKE returns lower score -> better relevance. We invert it for consistency (0 to 1)
+            # Typical YAKE score is 0.01 (good) to >1 (bad).
+            relevance = max(0.0, 1.0 - score) if score < 1.0 else 0.1
             
-            yake_keywords = kw_extractor.extract_keywords(text)
-            
-            for kw, score in yake_keywords:
-                # YAKE returns lower score -> better relevance. We invert it for consistency (0 to 1)
-                # Typical YAKE score is 0.01 (good) to >1 (bad).
-                relevance = max(0.0, 1.0 - score) if score < 1.0 else 0.1
-                
-                if kw.lower() not in seen_words:
-                    keywords_list.append({
-                        "word": kw,
-                        "score": round(relevance, 2),
-                        "category": "TOPIC"
-                    })
-                    seen_words.add(kw.lower())
-
-            # Sort by score descending and limit
-            keywords_list.sort(key=lambda x: x['score'], reverse=True)
-            keywords_list = keywords_list[:max_keywords]
-
-            processing_time = (time.time() - start) * 1000
-            
-            return {
-                "keywords": keywords_list,
-                "processing_time_ms": round(processing_time, 2)
-            }
+            if kw.lower() not in seen_words:
+                keywords_list.append({
+                    "word": kw,
+                    "score": round(relevance, 2),
+                    "category": "TOPIC"
+                })
+                seen_words.add(kw.lower())
 
-        except Exception as e:
-            logger.error("Error during keyword extraction", error=str(e))
-            return {"keywords": [], "processing_time_ms": 0.0}
+        # Sort by score descending and limit
+        keywords_list.sort(key=lambda x: x['score'], reverse=True)
+        return keywords_list[:max_keywords]
@@ -1,25 +1,212 @@
 
-from typing import Dict, List
+from functools import lru_cache
+from itertools import chain
+from typing import Dict, List, Optional, Tuple
+import json
+import os
+import threading
 import time
-from langdetect import detect, detect_langs, LangDetectException
+import unicodedata
+import numpy as np
 import structlog
 from ..config.settings import settings
 
 logger = structlog.get_logger()
 
+# Scripts used by a single language of the langdetect profiles
+SCRIPT_LANGUAGES = {
+    "GREEK": "el",
+    "HEBREW": "he",
+    "THAI": "th",
+    "HANGUL": "ko",
+    "HIRAGANA": "ja",
+    "KATAKANA": "ja",
+    "GUJARATI": "gu",
+    "KANNADA": "kn",
+    "MALAYALAM": "ml",
+    "TAMIL": "ta",
+    "TELUGU": "te",
+    "GURMUKHI": "pa",
+    "BENGALI": "bn",
+}
+
+@lru_cache(maxsize=4096)
+def _normalize_char(ch: str) -> str:
+    from langdetect.utils.ngram import NGram
+
+    return NGram.normalize(ch)
+
+@lru_cache(maxsize=4096)
+def _script(ch: str) -> Optional[str]:
+    if not ch.isalpha():
+        return None
+    name = unicodedata.name(ch, "")
+    return name.split(" ", 1)[0] if name else None
+
+@lru_cache(maxsize=65536)
+def _word_ngrams(word: str) -> tuple:
+    """
+    1- to 3-grams of one normalized word, like langdetect's NGram buffer:
+    bounded by spaces, skipped while inside an all-caps run.
+    """
+    ngrams = []
+    grams = " "
+    last_char = " "
+    capitalword = False
+    for ch in word + " ":
+        if len(grams) >= 3:
+            grams = grams[1:]
+        grams += ch
+
+        if ch.isupper():
+            if last_char.isupper():
+                capitalword = True
+        else:
+            capitalword = False
+        last_char = ch
+        if capitalword:
+            continue
+
+        if ch != " ":
+            ngrams.append(ch)
+        ngrams.append(grams[-2:])
+        if len(grams) == 3:
+            ngrams.append(grams)
+    return tuple(ngrams)
+
+def extract_ngrams(text: str) -> List[str]:
+    """1- to 3-grams of a text, extracted like langdetect does (words are independent)."""
+    normalized = "".join([_normalize_char(ch) for ch in text])
+    ngrams: List[str] = []
+    for word in normalized.split():
+        ngrams.extend(_word_ngrams(word))
+    return ngrams
+
+class NGramLanguageModel:
+    """
+    Naive Bayes over langdetect's character n-gram profiles.
+
+    langdetect samples n-grams at random over several trials, so it is slow and
+    returns different answers for the same text unless seeded. This model scores
+    every n-gram of the text once, against a log-probability matrix built from the
+    same profiles: deterministic, and a batch is scored with one numpy gather.
+    """
+
+    # Same smoothing as langdetect (ALPHA_DEFAULT / BASE_FREQ)
+    SMOOTHING = 0.5 / 10000
+    WORD_CACHE_SIZE = 100_000
+
+    def __init__(self, profiles_dir: str):
+        profiles = []
+        for filename in sorted(os.listdir(profiles_dir)):
+            with open(os.path.join(profiles_dir, filename), encoding="utf-8") as f:
+                profiles.append(json.load(f))
+
+        self.languages: List[str] = [p["name"] for p in profiles]
+        self.vocabulary: Dict[str, int] = {}
+        for profile in profiles:
+            for ngram in profile["freq"]:
+                self.vocabulary.setdefault(ngram, len(self.vocabulary))
+
+        probs = np.zeros((len(self.vocabulary), len(profiles)), dtype=np.float32)
+        for column, profile in enumerate(profiles):
+            n_words = profile["n_words"]
+            for ngram, freq in profile["freq"].items():
+                if 1 <= len(ngram) <= 3:
+                    probs[self.vocabulary[ngram], column] = freq / n_words[len(ngram) - 1]
+        self.log_probs = np.log(probs + self.SMOOTHING, dtype=np.float32)
+        # Vocabulary indexes of already seen words (mentions reuse the same words a lot)
+        self._word_indexes: Dict[str, List[int]] = {}
+
+    @classmethod
+    def from_langdetect(cls) -> "NGramLanguageModel":
+        import langdetect
+
+        return cls(os.path.join(os.path.dirname(langdetect.__file__), "profiles"))
+
+    @lru_cache(maxsize=8)
+    def language_mask(self, codes: str) -> Optional[np.ndarray]:
+        """Boolean mask of the comma-separated `codes` among the languages (None when none is known)."""
+        mask = np.zeros(len(self.languages), dtype=bool)
+        for code in codes.split(","):
+            if code.strip() in self.languages:
+                mask[self.languages.index(code.strip())] = True
+        return mask if mask.any() else None
+
+    def _text_indexes(self, text: str) -> List[int]:
+        indexes: List[int] = []
+        normalized = "".join([_normalize_char(ch) for ch in text])
+        for word in normalized.split():
+            word_indexes = self._word_indexes.get(word)
+            if word_indexes is None:
+                if len(self._word_indexes) >= self.WORD_CACHE_SIZE:
+                    self._word_indexes.clear()
+                vocabulary = self.vocabulary
+                word_indexes = [vocabulary[g] for g in _word_ngrams(word) if g in vocabulary]
+                self._word_indexes[word] = word_indexes
+            indexes.extend(word_indexes)
+        return indexes
+
+    def predict_proba(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Language probabilities, one row per text, and whether each text had any
+        known n-gram (rows of texts without one are meaningless).
+        """
+        indexes = [self._text_indexes(text) for text in texts]
+        lengths = np.array([len(text_indexes) for text_indexes in indexes], dtype=np.int64)
+        indptr = np.concatenate(([0], np.cumsum(lengths)))
+        flat = np.fromiter(chain.from_iterable(indexes), dtype=np.int64, count=int(indptr[-1]))
+
+        if len(texts) == 1:
+            # A plain gather is cheaper than building a sparse matrix for one text
+            log_likelihoods = self.log_probs[flat].sum(axis=0, keepdims=True)
+        else:
+            from scipy.sparse import csr_matrix
+
+            # (texts x vocabulary) n-gram counts times the log-probability matrix
+            counts = csr_matrix(
+                (np.ones(len(flat), dtype=np.float32), flat, indptr),
+                shape=(len(texts), len(self.vocabulary))
+            )
+            log_likelihoods = np.asarray(counts @ self.log_probs)
+
+        exp = np.exp(log_likelihoods - log_likelihoods.max(axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True), lengths > 0
+
 class LanguageDetector:
     """
-    Language detection using langdetect (lightweight library).
+    Language detection with a deterministic character n-gram model (langdetect profiles).
     """
-    
+
+    _model: Optional[NGramLanguageModel] = None
+    _lock = threading.Lock()
+
+    # langdetect only reports languages above this probability
+    ALTERNATIVE_THRESHOLD = 0.1
+
     def __init__(self):
-        # langdetect is library-based, no heavy model loading needed
+        # Profiles are loaded once per process, on first use
         pass
 
+    @classmethod
+    def _get_model(cls) -> NGramLanguageModel:
+        if cls._model is None:
+            with cls._lock:
+                if cls._model is None:
+                    start = time.time()
+                    cls._model = NGramLanguageModel.from_langdetect()
+                    logger.info(
+                        "Language model loaded",
+                        languages=len(cls._model.languages),
+                        ngrams=len(cls._model.vocabulary),
+                        load_time_ms=round((time.time() - start) * 1000, 2)
+                    )
+        return cls._model
+
     def detect(self, text: str) -> Dict:
         """
         Detects the language of the provided text.
-        
+
         Returns:
             {
                 "language": "fr",
@@ -28,34 +215,84 @@ class LanguageDetector:
                 "processing_time_ms": float
             }
         """
+        return self.detect_batch([text])[0]
+
+    def detect_batch(self, texts: List[str]) -> List[Dict]:
+        """Detects the language of several texts in one vectorized pass (input order kept)."""
         start = time.time()
-        
-        try:
-            # Main detection
-            lang = detect(text)
-            
-            # Detailed probabilities
-            probs = detect_langs(text)
-            
-            alternatives = [
-                {"language": p.lang, "confidence": p.prob}
-                for p in probs
+
+        results = self._detect_batch(texts)
+
+        processing_time = round((time.time() - start) * 1000, 3)
+        for result in results:
+            result["processing_time_ms"] = processing_time
+        return results
+
+    def _detect_batch(self, texts: List[str]) -> List[Dict]:
+        results: List[Optional[Dict]] = [None] * len(texts)
+
+        # Fast path: no letters at all, or a script only one language uses
+        pending = []
+        for i, text in enumerate(texts):
+            scripts = {_script(ch) for ch in text} - {None}
+            if not scripts:
+                results[i] = self._fallback_result()
+            elif scripts & {"HIRAGANA", "KATAKANA"}:
+                results[i] = self._certain_result("ja")
+            elif len(scripts) == 1 and next(iter(scripts)) in SCRIPT_LANGUAGES:
+                results[i] = self._certain_result(SCRIPT_LANGUAGES[next(iter(scripts))])
+            else:
+                pending.append(i)
+
+        if pending:
+            model = self._get_model()
+            short_mask = model.language_mask(settings.LANGUAGE_SHORT_TEXT_CANDIDATES)
+            probabilities, known = model.predict_proba([texts[i] for i in pending])
+            for i, probs, has_ngrams in zip(pending, probabilities, known):
+                if not has_ngrams:
+                    results[i] = self._fallback_result()
+                elif short_mask is not None and len(texts[i]) < settings.LANGUAGE_SHORT_TEXT_CHARS:
+                    results[i] = self._short_text_result(model, probs, short_mask)
+                else:
+                    results[i] = self._to_result(model, probs)
+
+        return results
+
+    def _short_text_result(self, model: NGramLanguageModel, probs: np.ndarray, mask: np.ndarray) -> Dict:
+        """
+        Short texts carry little evidence: the most likely expected language wins,
+        unless none of them is plausible. Confidences stay the unrestricted ones.
+        """
+        expected = np.where(mask, probs, 0.0)
+        best = int(expected.argmax())
+        if expected[best] < self.ALTERNATIVE_THRESHOLD:
+            return self._to_result(model, probs)
+        return self._to_result(model, probs, best)
+
+    def _to_result(self, model: NGramLanguageModel, probs: np.ndarray, best: Optional[int] = None) -> Dict:
+        best = int(probs.argmax()) if best is None else best
+        candidates = np.flatnonzero(probs > self.ALTERNATIVE_THRESHOLD)
+        candidates = candidates[np.argsort(probs[candidates])[::-1]]
+        return {
+            "language": model.languages[best],
+            "confidence": round(float(probs[best]), 4),
+            "alternatives": [
+                {"language": model.languages[i], "confidence": round(float(probs[i]), 4)}
+                for i in candidates
             ]
-            
-            # Confidence of the top match
-            confidence = alternatives[0]["confidence"] if alternatives else 0.0
-            
-        except LangDetectException:
-            logger.warning("Language detection failed, defaulting to 'en'")
-            lang = "en"
-            confidence = 0.0
-            alternatives = []
-            
-        processing_time = (time.time() - start) * 1000
-        
+        }
+
+    def _certain_result(self, lang: str) -> Dict:
         return {
             "language": lang,
-            "confidence": confidence,
-            "alternatives": alternatives,
-            "processing_time_ms": round(processing_time, 2)
+            "confidence": 1.0,
+            "alternatives": [{"language": lang, "confidence": 1.0}]
+        }
+
+    def _fallback_result(self) -> Dict:
+        logger.warning("Language detection failed, defaulting to 'en'")
+        return {
+            "language": "en",
+            "confidence": 0.0,
+            "alternatives": []
         }
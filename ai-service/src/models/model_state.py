@@ -3,6 +3,12 @@ sentiment_model_loaded = False
 emotion_model_loaded = False
 keyword_model_loaded = False
 
+# Weight footprint per loaded model (MB)
+models_memory_mb = {}
+
+# Startup load and warm-up progress per analyzer (see warmup.py); empty when models load lazily
+models_progress = {}
+
 def set_sentiment_loaded(loaded: bool):
     global sentiment_model_loaded
     sentiment_model_loaded = loaded
@@ -20,4 +26,21 @@ def get_models_status():
         "sentiment": sentiment_model_loaded,
         "emotions": emotion_model_loaded,
         "keywords": keyword_model_loaded
-    }
\ No newline at end of file
+    }
+
+def set_model_memory(name: str, memory_mb: float):
+    models_memory_mb[name] = memory_mb
+
+def get_models_memory():
+    return dict(models_memory_mb)
+
+def set_model_progress(name: str, state: str, **details):
+    entry = models_progress.setdefault(name, {})
+    entry.update(details, state=state)
+
+def get_models_progress():
+    return {name: dict(entry) for name, entry in models_progress.items()}
+
+def models_ready() -> bool:
+    """False while a model is still loading or warming up, or failed to."""
+    return all(entry["state"] == "ready" for entry in models_progress.values())
@@ -0,0 +1,120 @@
+
+"""
+Zero-downtime model hot-swap.
+
+A new model version is loaded and warmed up on an inference slot of the bulk lane,
+so interactive traffic keeps its priority meanwhile, then atomically replaces the
+served one. Batches that already started finish on the model they started with,
+and result cache keys contain the model version, so the previous model's results
+are never served for the new one. Swaps apply to the worker process that received
+them; restarted workers load the configured models again.
+"""
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List
+import structlog
+from ..config.settings import settings
+from ..utils.deadlines import current_request
+from ..utils.exceptions import ModelSwapInProgressException
+from ..utils.metrics import track_model_load
+from ..utils.scheduler import BULK, InferenceScheduler
+from .emotion_detector import EmotionDetector
+from .sentiment_analyzer import SentimentAnalyzer
+from .warmup import warmup_batches
+
+logger = structlog.get_logger()
+
+SWAPPABLE = {"sentiment": SentimentAnalyzer, "emotions": EmotionDetector}
+
+LOADING = "loading"
+ACTIVE = "active"
+FAILED = "failed"
+
+class ModelSwapper:
+    """Runs the hot-swaps of the analyzers' models, one at a time per analyzer."""
+
+    def __init__(self, scheduler: InferenceScheduler):
+        self.scheduler = scheduler
+        self._swaps: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def start(self, analyzer: str, model_name: str) -> Dict:
+        """Starts loading `model_name` for `analyzer` in the background; returns the swap's state."""
+        instance = SWAPPABLE[analyzer]()
+        with self._lock:
+            previous = self._swaps.get(analyzer)
+            if previous is not None and previous["state"] == LOADING:
+                raise ModelSwapInProgressException(analyzer)
+            swap = self._swaps[analyzer] = {
+                "analyzer": analyzer,
+                "model": model_name,
+                "previous_model": instance.model_name,
+                "state": LOADING,
+                "load_ms": None,
+                "warmup_ms": None,
+                "error": None,
+            }
+
+        logger.info("Model swap started", analyzer=analyzer, model=model_name, previous=swap["previous_model"])
+        # The swap outlives the admin request: it mustn't inherit the request's deadline
+        token = current_request.set(None)
+        try:
+            future = self.scheduler.submit(f"{analyzer}-swap", self._load_and_warm, instance, swap, lane=BULK)
+        except Exception as e:
+            # Rejected by admission control (bulk lane full): the caller can retry
+            with self._lock:
+                swap["state"] = FAILED
+                swap["error"] = str(e)
+            raise
+        finally:
+            current_request.reset(token)
+        future.add_done_callback(lambda done: self._finish(swap, done))
+        return dict(swap)
+
+    def _load_and_warm(self, instance, swap: Dict):
+        start = time.perf_counter()
+        with track_model_load(swap["analyzer"]):
+            model = instance.load_model(swap["model"])
+        swap["load_ms"] = round((time.perf_counter() - start) * 1000, 2)
+
+        # Same warm-up as at startup, so no request pays the new model's first calls
+        start = time.perf_counter()
+        for batch in warmup_batches():
+            instance._analyze_uncached(batch, model=model)
+        swap["warmup_ms"] = round((time.perf_counter() - start) * 1000, 2)
+
+        instance.activate(swap["model"], model)
+
+    def _finish(self, swap: Dict, future: Future):
+        with self._lock:
+            error = future.exception()
+            if error is None:
+                swap["state"] = ACTIVE
+                logger.info(
+                    "Model swapped", analyzer=swap["analyzer"], model=swap["model"],
+                    load_ms=swap["load_ms"], warmup_ms=swap["warmup_ms"]
+                )
+            else:
+                # The previous model keeps serving
+                swap["state"] = FAILED
+                swap["error"] = str(error)
+                logger.error("Model swap failed", analyzer=swap["analyzer"], model=swap["model"], error=str(error))
+
+    def status(self) -> List[Dict]:
+        """Served model of each enabled swappable analyzer, with its last swap."""
+        with self._lock:
+            swaps = {name: dict(swap) for name, swap in self._swaps.items()}
+        models = []
+        for name, analyzer_class in SWAPPABLE.items():
+            if not settings.analyzer_enabled(name):
+                continue
+            analyzer = analyzer_class()
+            models.append({
+                "analyzer": name,
+                "model": analyzer.model_name,
+                "version": analyzer.model_version,
+                "loaded": analyzer_class._initialized,
+                "last_swap": swaps.get(name),
+            })
+        return models
@@ -1,11 +1,17 @@
 
-from transformers import pipeline
-from typing import Dict, Literal, List
+from functools import partial
+from typing import Any, Dict, Literal, List, Optional, Tuple
+import threading
 import time
 import structlog
 from ..config.settings import settings
 from ..utils.exceptions import ModelLoadException
-from .model_state import set_sentiment_loaded
+from ..utils.cache import CacheManager, content_cache_key
+from ..utils.dedup import cache_contents
+from ..utils.metrics import record_cascade, record_stages, track_model_load
+from .fast_sentiment import FastSentimentModel
+from .inference_backend import create_backend, backend_memory_mb, backend_version, chunked_classifier
+from .model_state import set_sentiment_loaded, set_model_memory
 
 logger = structlog.get_logger()
 
@@ -17,6 +23,9 @@ class SentimentAnalyzer:
     _instance = None
     _model = None
     _initialized = False
+    _fast_model = None
+    _model_name = None  # Model served; the configured one until a hot-swap (see model_swap.py)
+    _swap_lock = threading.Lock()
 
     def __new__(cls):
         if cls._instance is None:
@@ -27,68 +36,142 @@ class SentimentAnalyzer:
         """Lazy loading of the model."""
         if not self.__class__._initialized:
             try:
-                logger.info("Loading Sentiment Model...", model=settings.SENTIMENT_MODEL)
-                device = 0 if settings.USE_GPU else -1
-                self.__class__._model = pipeline(
-                    "sentiment-analysis",
-                    model=settings.SENTIMENT_MODEL,
-                    device=device,
-                    top_k=None # Return all scores
-                )
-                self.__class__._initialized = True
-                set_sentiment_loaded(True)
+                logger.info("Loading Sentiment Model...", backend=settings.INFERENCE_BACKEND, model=settings.SENTIMENT_MODEL)
+                with track_model_load("sentiment"):
+                    model = self.load_model(settings.SENTIMENT_MODEL)
+                self.activate(settings.SENTIMENT_MODEL, model)
                 logger.info("Sentiment Model loaded successfully")
             except Exception as e:
                 logger.error("Failed to load sentiment model", error=str(e))
                 raise ModelLoadException("SentimentAnalyzer", str(e))
 
+    def load_model(self, model_name: str):
+        """Builds the backend of `model_name` without serving it."""
+        return create_backend("sentiment-analysis", model_name, max_tokens=settings.SENTIMENT_MAX_TOKENS)
+
+    def activate(self, model_name: str, model):
+        """Serves `model` from now on. Batches already running finish on the previous one."""
+        with self.__class__._swap_lock:
+            self.__class__._model = model
+            self.__class__._model_name = model_name
+            self.__class__._initialized = True
+        set_model_memory("sentiment", backend_memory_mb(model))
+        set_sentiment_loaded(True)
+
+    def active_model(self) -> Tuple[Any, str]:
+        """The served model and its version, read together since a swap can happen at any time."""
+        with self.__class__._swap_lock:
+            return self.__class__._model, self.model_version
+
     def analyze(self, text: str) -> Dict:
         """
         Analyzes the sentiment of a text.
         """
-        if not self.__class__._initialized:
-            self.initialize()
+        return self.analyze_batch([text])[0]
 
+    def analyze_batch(self, texts: List[str]) -> List[Dict]:
+        """
+        Analyzes the sentiment of several texts in a single pipeline call.
+        Results are returned in input order. Texts already analyzed by the same
+        model version are served from the result cache.
+        With SENTIMENT_CASCADE, texts the fast stage is confident about are answered
+        by it and only the others reach the transformer; `stage` tells which answered.
+        """
         start = time.time()
-        
-        # Truncate text to model's max length (usually 512 tokens)
-        # We approximate tokens by chars for speed if needed, but pipeline handles truncation often.
-        # Explicit truncation is safer for long texts.
-        truncated_text = text[:2000] 
-
-        try:
-            # Result is a list of lists because top_k=None and we pass a single string
-            results = self.__class__._model(truncated_text)
-            # results looks like: [[{'label': '5 stars', 'score': 0.8}, {'label': '4 stars', ...}]]
-            scores_list = results[0] # First sentence results
-            
+        results: List[Optional[Dict]] = [None] * len(texts)
+        escalated = list(range(len(texts)))
+        if settings.SENTIMENT_CASCADE:
+            fast_model = self.fast_model
+            escalated = []
+            for i, (scores, confidence) in enumerate(fast_model.predict(texts)):
+                if confidence >= settings.SENTIMENT_CASCADE_THRESHOLD:
+                    results[i] = {**self._result_from_scores(scores, confidence), "stage": fast_model.stage}
+                else:
+                    escalated.append(i)
+            record_cascade(fast_model.stage, len(texts) - len(escalated))
+            record_cascade("transformer", len(escalated))
+
+        if escalated:
+            if not self.__class__._initialized:
+                self.initialize()
+            model, version = self.active_model()
+            escalated_inputs = [texts[i] for i in escalated]
+            # Near-duplicates (reposts, templated texts) share their cluster representative's
+            # result. Texts the fast stage answered stay out of the dedup index
+            keys = [
+                content_cache_key(
+                    content, version,
+                    max_tokens=settings.SENTIMENT_MAX_TOKENS, strategy=settings.LONG_TEXT_STRATEGY
+                )
+                for content in cache_contents(escalated_inputs)
+            ]
+            try:
+                computed = CacheManager().get_or_compute_many(
+                    "sentiment", keys, escalated_inputs, partial(self._analyze_uncached, model=model)
+                )
+            except Exception as e:
+                logger.error("Error during sentiment analysis", error=str(e), batch_size=len(texts))
+                # Return neutral fallback in worst case
+                return [self._fallback_result() for _ in texts]
+            for i, result in zip(escalated, computed):
+                results[i] = {**result, "stage": "transformer"}
+
+        processing_time = round((time.time() - start) * 1000, 2)
+        for result in results:
+            result["processing_time_ms"] = processing_time
+
+        return results
+
+    @property
+    def model_name(self) -> str:
+        return self.__class__._model_name or settings.SENTIMENT_MODEL
+
+    @property
+    def model_version(self) -> str:
+        return backend_version(self.model_name)
+
+    @property
+    def fast_model(self) -> FastSentimentModel:
+        """First stage of the cascade, loaded on first use (lexicon, plus the linear model if configured)."""
+        if self.__class__._fast_model is None:
+            self.__class__._fast_model = FastSentimentModel.load(settings.SENTIMENT_FAST_MODEL_PATH or None)
+        return self.__class__._fast_model
+
+    def _analyze_uncached(self, texts: List[str], model=None) -> List[Dict]:
+        # Texts longer than the model window are split into token windows whose
+        # scores are aggregated, so the end of long reviews counts too
+        classifier = chunked_classifier(model or self.__class__._model, settings.SENTIMENT_MAX_TOKENS)
+        with record_stages("sentiment"):
+            outputs = classifier(texts)
+        # each output looks like: [{'label': '5 stars', 'score': 0.8}, {'label': '4 stars', ...}]
+
+        results: List[Dict] = []
+
+        for scores_list in outputs:
             # Normalize scores based on model type
             formatted_scores = self._normalize_scores(scores_list)
-            
-            sentiment_label = self._determine_sentiment_label(formatted_scores)
-            
-            processing_time = (time.time() - start) * 1000
-            
-            return {
-                "sentiment": sentiment_label,
-                "confidence": formatted_scores.get("max_score", 0.0), # Highest score
-                "scores": {
-                    "positive": formatted_scores["positive"],
-                    "negative": formatted_scores["negative"],
-                    "neutral": formatted_scores["neutral"]
-                },
-                "processing_time_ms": round(processing_time, 2)
-            }
-            
-        except Exception as e:
-            logger.error("Error during sentiment analysis", error=str(e))
-            # Return neutral fallback in worst case
-            return {
-                "sentiment": "NEUTRAL",
-                "confidence": 0.0,
-                "scores": {"positive": 0.0, "negative": 0.0, "neutral": 1.0},
-                "processing_time_ms": 0.0
+            results.append(self._result_from_scores(formatted_scores, formatted_scores.get("max_score", 0.0)))
+
+        return results
+
+    def _result_from_scores(self, scores: Dict, confidence: float) -> Dict:
+        return {
+            "sentiment": self._determine_sentiment_label(scores),
+            "confidence": confidence,
+            "scores": {
+                "positive": scores["positive"],
+                "negative": scores["negative"],
+                "neutral": scores["neutral"]
             }
+        }
+
+    def _fallback_result(self) -> Dict:
+        return {
+            "sentiment": "NEUTRAL",
+            "confidence": 0.0,
+            "scores": {"positive": 0.0, "negative": 0.0, "neutral": 1.0},
+            "processing_time_ms": 0.0
+        }
 
     def _normalize_scores(self, scores_list: List[Dict]) -> Dict:
         """Maps model specific labels (stars) to positive/negative/neutral."""
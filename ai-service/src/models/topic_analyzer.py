@@ -1,6 +1,5 @@
 
 from typing import List, Dict
-from sklearn.feature_extraction.text import CountVectorizer
 import time
 import structlog
 
@@ -20,6 +19,8 @@ class TopicAnalyzer:
         start = time.time()
         
         try:
+            from sklearn.feature_extraction.text import CountVectorizer
+
             # Use CountVectorizer to find frequent bi-grams and tri-grams
             # Stop words handling would be good here, relying on simple 'english'/'french' list
             # Since we iterate generic 'texts', we assume mixed or dominant language.
@@ -0,0 +1,299 @@
+
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, List, Optional, Set
+import heapq
+import math
+import sqlite3
+import threading
+import time
+import structlog
+from ..config.settings import settings
+from ..utils.exceptions import TopicStoreException
+from ..utils.topic_store import create_topic_store
+
+logger = structlog.get_logger()
+
+class BrandTopics:
+    """
+    Trending phrases of one brand, updated incrementally.
+
+    A Space-Saving style heavy-hitter table keeps at most `capacity` phrases with
+    their (time-decayed) number of mentions, so memory doesn't grow with the number
+    of mentions folded in. Decay is applied lazily: new mentions are weighted by
+    exp(rate * (t - origin)) instead of shrinking every stored count over time.
+    """
+
+    # Rescale stored counts before the growing weights lose float precision
+    MAX_WEIGHT = 1e9
+
+    def __init__(self, capacity: int, half_life_seconds: float):
+        self.capacity = capacity
+        self.decay_rate = math.log(2) / half_life_seconds if half_life_seconds > 0 else 0.0
+        self.origin: Optional[float] = None
+        self.counts: Dict[str, float] = {}
+        self.errors: Dict[str, float] = {}
+        # Highest count ever evicted: upper bound of the count of any untracked phrase
+        self.floor = 0.0
+        self.documents = 0.0
+        self.updated_at: Optional[float] = None
+        self._ranked: Optional[List[str]] = None
+
+    def _weight(self, now: float) -> float:
+        if self.origin is None:
+            return 1.0
+        return math.exp(self.decay_rate * (now - self.origin))
+
+    def _rescale(self, now: float):
+        factor = self._weight(now)
+        for phrase in self.counts:
+            self.counts[phrase] /= factor
+            self.errors[phrase] /= factor
+        self.floor /= factor
+        self.documents /= factor
+        self.origin = now
+
+    def update(self, documents: List[Set[str]], now: Optional[float] = None):
+        """Folds in the phrases of new mentions (one set of phrases per mention)."""
+        now = now if now is not None else time.time()
+        if self.origin is None:
+            self.origin = now
+        weight = self._weight(now)
+        if weight > self.MAX_WEIGHT:
+            self._rescale(now)
+            weight = 1.0
+
+        batch = Counter()
+        for phrases in documents:
+            batch.update(phrases)
+
+        counts, errors = self.counts, self.errors
+        for phrase, count in batch.items():
+            if phrase in counts:
+                counts[phrase] += count * weight
+            else:
+                counts[phrase] = self.floor + count * weight
+                errors[phrase] = self.floor
+
+        if len(counts) > self.capacity:
+            kept = heapq.nlargest(self.capacity, counts, key=counts.get)
+            kept_set = set(kept)
+            evicted_max = max(count for phrase, count in counts.items() if phrase not in kept_set)
+            self.floor = max(self.floor, evicted_max)
+            self.counts = {phrase: counts[phrase] for phrase in kept}
+            self.errors = {phrase: errors[phrase] for phrase in kept}
+            self._ranked = kept
+        else:
+            self._ranked = None
+
+        self.documents += len(documents) * weight
+        self.updated_at = now
+
+    def top(self, num_topics: int, min_count: float, max_doc_ratio: float, now: Optional[float] = None) -> List[Dict]:
+        """
+        Current top phrases. All stored counts share the same decay, so the ranking
+        only changes on update and a query just walks the head of it.
+        """
+        now = now if now is not None else time.time()
+        if self._ranked is None:
+            self._ranked = sorted(self.counts, key=self.counts.get, reverse=True)
+        scale = 1.0 / self._weight(now)
+
+        topics = []
+        for phrase in self._ranked:
+            count = self.counts[phrase]
+            if count * scale < min_count:
+                break
+            # Guaranteed count too low: possibly noise promoted by the eviction floor
+            if (count - self.errors[phrase]) * scale < min_count:
+                continue
+            # Phrases in nearly every mention (the brand name itself, ...) aren't topics
+            if count > max_doc_ratio * self.documents:
+                continue
+            topics.append({
+                "id": len(topics),
+                "label": phrase.title(),
+                "keywords": phrase.split(),
+                "text_count": int(round(count * scale))
+            })
+            if len(topics) == num_topics:
+                break
+        return topics
+
+    def to_state(self) -> Dict:
+        """JSON-serializable state, for the topic store."""
+        return {
+            "capacity": self.capacity,
+            "decay_rate": self.decay_rate,
+            "origin": self.origin,
+            "counts": self.counts,
+            "errors": self.errors,
+            "floor": self.floor,
+            "documents": self.documents,
+            "updated_at": self.updated_at,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "BrandTopics":
+        topics = cls(state["capacity"], 0)
+        topics.decay_rate = state["decay_rate"]
+        topics.origin = state["origin"]
+        topics.counts = state["counts"]
+        topics.errors = state["errors"]
+        topics.floor = state["floor"]
+        topics.documents = state["documents"]
+        topics.updated_at = state["updated_at"]
+        return topics
+
+    def stats(self, now: Optional[float] = None) -> Dict:
+        now = now if now is not None else time.time()
+        return {
+            "documents": round(self.documents / self._weight(now), 2),
+            "phrases_tracked": len(self.counts),
+            "updated_at": self.updated_at,
+        }
+
+class TopicTracker:
+    """
+    Per-brand online topic tracking.
+
+    New mentions are folded into each brand's heavy-hitter table as they arrive, so
+    the trending topics can be read at any time without re-sending past mentions.
+    At most TOPIC_MAX_BRANDS brands are kept (least recently updated dropped first).
+
+    With TOPIC_STORE_PATH set, tables are persisted there, shared by the workers of
+    a node (see utils/topic_store.py); each worker keeps the ones it last read in
+    memory. By default TOPIC_STORE_PATH is empty: they only live in the worker
+    process, and the brand routes are only mounted for a single worker.
+    """
+
+    _instance = None
+    _store = None
+    _store_initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            from sklearn.feature_extraction.text import HashingVectorizer
+
+            cls._instance = super(TopicTracker, cls).__new__(cls)
+            cls._instance._brands: "OrderedDict[str, BrandTopics]" = OrderedDict()
+            # Store version of each table in memory (None without a store)
+            cls._instance._versions: Dict[str, Optional[int]] = {}
+            cls._instance._lock = threading.Lock()
+            # Same tokenization as the stateless /analyze/topics; no vocabulary to fit or store
+            cls._instance._analyzer = HashingVectorizer(
+                ngram_range=(2, 3), stop_words="english"
+            ).build_analyzer()
+        return cls._instance
+
+    @property
+    def store(self):
+        if not self.__class__._store_initialized:
+            self.__class__._store = create_topic_store()
+            self.__class__._store_initialized = True
+        return self.__class__._store
+
+    def _phrases(self, texts: List[str]) -> List[Set[str]]:
+        return [set(self._analyzer(text)) for text in texts]
+
+    def _new_topics(self) -> BrandTopics:
+        return BrandTopics(settings.TOPIC_CAPACITY, settings.TOPIC_HALF_LIFE_HOURS * 3600)
+
+    def _remember(self, brand: str, topics: BrandTopics, version: Optional[int] = None):
+        self._brands[brand] = topics
+        self._brands.move_to_end(brand)
+        self._versions[brand] = version
+        while len(self._brands) > settings.TOPIC_MAX_BRANDS:
+            evicted, _ = self._brands.popitem(last=False)
+            self._versions.pop(evicted, None)
+            logger.info("Topic tracker evicted brand", brand=evicted)
+
+    def _stored(self, brand: str, version: int, load: Callable[[], Optional[Dict]]) -> BrandTopics:
+        """The brand's table as of `version`: the one in memory unless another worker changed it since."""
+        topics = self._brands.get(brand)
+        if topics is None or self._versions.get(brand) != version:
+            topics = BrandTopics.from_state(load())
+        return topics
+
+    def _forget(self, brand: str):
+        self._brands.pop(brand, None)
+        self._versions.pop(brand, None)
+
+    def update(self, brand: str, texts: List[str]) -> Dict:
+        """Adds new mentions of a brand."""
+        start = time.time()
+        documents = self._phrases(texts)
+
+        with self._lock:
+            topics = self._brands.get(brand)
+            version = None
+            try:
+                store = self.store
+                if store is not None:
+                    def apply(stored_version: Optional[int], load: Callable[[], Optional[Dict]]) -> Dict:
+                        nonlocal topics
+                        if stored_version is None:
+                            topics = self._new_topics()
+                        else:
+                            topics = self._stored(brand, stored_version, load)
+                        topics.update(documents)
+                        return topics.to_state()
+
+                    version = store.update(brand, apply)
+                else:
+                    if topics is None:
+                        topics = self._new_topics()
+                    topics.update(documents)
+            except (sqlite3.Error, OSError) as e:
+                # The table in memory may hold mentions that weren't stored
+                self._forget(brand)
+                logger.error("Topic store update failed", brand=brand, error=str(e))
+                raise TopicStoreException()
+            self._remember(brand, topics, version)
+            stats = topics.stats()
+
+        return {
+            "brand": brand,
+            **stats,
+            "processing_time_ms": round((time.time() - start) * 1000, 2)
+        }
+
+    def topics(self, brand: str, num_topics: int = 5) -> Optional[Dict]:
+        """Current trending topics of a brand, or None if the brand isn't tracked."""
+        start = time.time()
+        with self._lock:
+            topics = self._brands.get(brand)
+            try:
+                store = self.store
+                if store is not None:
+                    version = store.version(brand)
+                    if version is None:
+                        self._forget(brand)
+                        return None
+                    topics = self._stored(brand, version, lambda: store.load(brand))
+                    self._remember(brand, topics, version)
+            except (sqlite3.Error, OSError) as e:
+                logger.error("Topic store read failed", brand=brand, error=str(e))
+                raise TopicStoreException()
+            if topics is None:
+                return None
+            items = topics.top(num_topics, settings.TOPIC_MIN_COUNT, settings.TOPIC_MAX_DOC_RATIO)
+            stats = topics.stats()
+
+        return {
+            "brand": brand,
+            "topics": items,
+            **stats,
+            "processing_time_ms": round((time.time() - start) * 1000, 2)
+        }
+
+    def delete(self, brand: str) -> bool:
+        with self._lock:
+            deleted = self._brands.pop(brand, None) is not None
+            self._versions.pop(brand, None)
+            try:
+                if self.store is not None:
+                    deleted = self.store.delete(brand)
+            except (sqlite3.Error, OSError) as e:
+                logger.error("Topic store delete failed", brand=brand, error=str(e))
+                raise TopicStoreException()
+            return deleted
@@ -0,0 +1,128 @@
+
+"""
+Startup warm-up (PRELOAD_MODELS).
+
+Loading a model is not enough to serve it fast: its first calls also pay for
+allocator growth, intra-op thread pool spin-up and tokenizer caches, so a worker
+that only loaded its models still answers its first requests in seconds. Here the
+enabled analyzers load their models, then run a batch of sample texts and single
+texts of several lengths (up to several model windows) before the worker reports
+ready. Progress is kept in model_state and reported by /ready.
+"""
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+import structlog
+from ..config.settings import settings
+from ..utils.quantization import SAMPLE_PATH
+from ..utils.train_fast_sentiment import load_records
+from .model_state import set_model_progress
+
+logger = structlog.get_logger()
+
+PENDING = "pending"
+LOADING = "loading"
+WARMING = "warming"
+READY = "ready"
+FAILED = "failed"
+
+# Analyzers with a model to load and warm (topics fits its model per request)
+WARMUP_ANALYZERS = ("sentiment", "emotions", "keywords", "language")
+
+def warmup_lengths() -> List[int]:
+    return [int(length) for length in settings.WARMUP_LENGTHS.split(",") if length.strip()]
+
+def warmup_batches() -> List[List[str]]:
+    """
+    Warm-up calls: one batch of BATCH_SIZE sample texts (WARMUP_SAMPLES_PATH, the
+    bundled sample by default), then one text per WARMUP_LENGTHS word count.
+    """
+    texts = [record["text"] for record in load_records(settings.WARMUP_SAMPLES_PATH or SAMPLE_PATH)]
+    words = " ".join(texts).split()
+    if not words:
+        # The length texts are built from these words
+        logger.warning("Warm-up samples have no text, using the bundled sample",
+                       path=settings.WARMUP_SAMPLES_PATH)
+        texts = [record["text"] for record in load_records(SAMPLE_PATH)]
+        words = " ".join(texts).split()
+    batches = [texts[:max(1, settings.BATCH_SIZE)]]
+    for length in warmup_lengths():
+        repeated = words * (length // len(words) + 1)
+        batches.append([" ".join(repeated[:length])])
+    return batches
+
+def _warm_sentiment(texts: List[str]):
+    from .sentiment_analyzer import SentimentAnalyzer
+
+    analyzer = SentimentAnalyzer()
+    if settings.SENTIMENT_CASCADE:
+        analyzer.fast_model.predict(texts)
+    # Bypasses the result cache: warm-up texts must not fill it
+    analyzer._analyze_uncached(texts)
+
+def _warm_emotions(texts: List[str]):
+    from .emotion_detector import EmotionDetector
+
+    EmotionDetector()._analyze_uncached(texts)
+
+def _warm_keywords(texts: List[str]):
+    from .keyword_extractor import KeywordExtractor
+
+    extractor = KeywordExtractor()
+    extractor._extract_keywords_batch([(text, lang) for text in texts for lang in ("fr", "en")], 10)
+
+def _warm_language(texts: List[str]):
+    from .language_detector import LanguageDetector
+
+    LanguageDetector().detect_batch(texts)
+
+def _warmers() -> Dict[str, Tuple[Callable[[], None], Callable[[List[str]], None]]]:
+    from .emotion_detector import EmotionDetector
+    from .keyword_extractor import KeywordExtractor
+    from .language_detector import LanguageDetector
+    from .sentiment_analyzer import SentimentAnalyzer
+
+    return {
+        "sentiment": (lambda: SentimentAnalyzer().initialize(), _warm_sentiment),
+        "emotions": (lambda: EmotionDetector().initialize(), _warm_emotions),
+        "keywords": (lambda: KeywordExtractor().initialize(), _warm_keywords),
+        "language": (LanguageDetector._get_model, _warm_language),
+    }
+
+def warm_up_models(names: List[str]):
+    """Loads and warms up the models of `names`, one analyzer after the other."""
+    batches = warmup_batches()
+    warmers = _warmers()
+    start = time.time()
+    for name in names:
+        load, warm = warmers[name]
+        try:
+            set_model_progress(name, LOADING)
+            loading = time.perf_counter()
+            load()
+            load_ms = round((time.perf_counter() - loading) * 1000, 2)
+            set_model_progress(name, WARMING, load_ms=load_ms, batches_done=0, batches_total=len(batches))
+
+            warming = time.perf_counter()
+            for done, batch in enumerate(batches, start=1):
+                warm(batch)
+                set_model_progress(name, WARMING, batches_done=done)
+            warmup_ms = round((time.perf_counter() - warming) * 1000, 2)
+            set_model_progress(name, READY, warmup_ms=warmup_ms)
+            logger.info("Model warmed up", analyzer=name, load_ms=load_ms, warmup_ms=warmup_ms)
+        except Exception as e:
+            set_model_progress(name, FAILED, error=str(e))
+            logger.error("Failed to warm up model", analyzer=name, error=str(e))
+    logger.info("Warm-up finished", analyzers=names, total_s=round(time.time() - start, 2))
+
+def start_warm_up() -> threading.Thread:
+    """
+    Warms up the enabled analyzers in a background thread (/health answers meanwhile).
+    They are marked pending right away, so /ready fails until the warm-up is over.
+    """
+    names = [name for name in WARMUP_ANALYZERS if settings.analyzer_enabled(name)]
+    for name in names:
+        set_model_progress(name, PENDING)
+    thread = threading.Thread(target=warm_up_models, args=(names,), name="warm-up", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,136 @@
+
+"""
+Preload-then-fork server (PREFORK=true).
+
+`uvicorn.run(workers=N)` spawns fresh interpreters: every worker imports torch and
+loads its own copy of the transformer and spaCy models. Here the parent process
+loads the models once, binds the listening socket, then forks the workers: model
+weights are shared copy-on-write between all workers instead of being duplicated.
+Use `python -m src.utils.memory_report --pid <parent pid>` to check shared vs
+private memory per worker.
+"""
+import gc
+import os
+import signal
+import time
+from typing import Dict
+import structlog
+import uvicorn
+from fastapi import FastAPI
+from .config.settings import settings
+
+logger = structlog.get_logger()
+
+# Minimum delay between two restarts of a crashed worker
+RESPAWN_DELAY_SECONDS = 1.0
+
+def preload_models():
+    """Loads every model in the parent, before the fork."""
+    from .models.sentiment_analyzer import SentimentAnalyzer
+    from .models.emotion_detector import EmotionDetector
+    from .models.keyword_extractor import KeywordExtractor
+    from .models.language_detector import LanguageDetector
+
+    loaders = {
+        "keywords": lambda: KeywordExtractor().initialize(),
+        "language": lambda: LanguageDetector().detect("preload"),
+    }
+    if settings.INFERENCE_BACKEND == "onnx":
+        # onnxruntime sessions own thread pools, which don't survive a fork
+        logger.warning("ONNX backend: transformer models are loaded by each worker, not shared")
+    else:
+        loaders = {
+            "sentiment": lambda: SentimentAnalyzer().initialize(),
+            "emotions": lambda: EmotionDetector().initialize(),
+            **loaders,
+        }
+
+    start = time.time()
+    # torch must not start its OpenMP pool in the parent (quantization runs ops):
+    # a pool created before fork() can deadlock the children
+    configured_threads = settings.INFERENCE_THREADS
+    settings.INFERENCE_THREADS = 1
+    try:
+        for name, load in loaders.items():
+            if not settings.analyzer_enabled(name):
+                continue
+            try:
+                load()
+            except Exception as e:
+                # The workers retry lazily on first request, like without PREFORK
+                logger.error("Failed to preload model", error=str(e))
+    finally:
+        settings.INFERENCE_THREADS = configured_threads
+    logger.info("Models preloaded in parent", load_time_s=round(time.time() - start, 2))
+
+def _init_worker():
+    """Per-worker setup after the fork."""
+    if settings.INFERENCE_BACKEND != "onnx":
+        from .models.inference_backend import configure_torch_threads
+        configure_torch_threads()
+
+def _spawn_worker(config: uvicorn.Config, sock, slot: int) -> int:
+    pid = os.fork()
+    if pid:
+        return pid
+
+    # Child: never return into the parent's supervision loop
+    exit_code = 0
+    try:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        # Each worker serves its own metrics: METRICS_PORT + slot
+        settings.METRICS_PORT += slot
+        _init_worker()
+        uvicorn.Server(config).run(sockets=[sock])
+    except BaseException as e:
+        logger.error("Worker crashed", error=str(e))
+        exit_code = 1
+    finally:
+        os._exit(exit_code)
+
+def serve(app: FastAPI):
+    """Loads the models, forks settings.WORKERS workers and restarts those that die."""
+    preload_models()
+
+    # Objects allocated so far (models, tokenizers, vocabularies) are moved out of
+    # the GC's reach: collections in the workers won't write to their pages
+    gc.collect()
+    gc.freeze()
+
+    config = uvicorn.Config(app, host=settings.HOST, port=settings.PORT, log_level=settings.LOG_LEVEL)
+    sock = config.bind_socket()
+
+    workers: Dict[int, int] = {}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for slot in range(max(1, settings.WORKERS)):
+        workers[_spawn_worker(config, sock, slot)] = slot
+    logger.info("Workers started", parent_pid=os.getpid(), workers=list(workers))
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        slot = workers.pop(pid, None)
+        if slot is None or stopping:
+            continue
+        logger.warning("Worker exited, restarting", pid=pid, status=status, slot=slot)
+        time.sleep(RESPAWN_DELAY_SECONDS)
+        workers[_spawn_worker(config, sock, slot)] = slot
+
+    sock.close()
+    logger.info("All workers stopped")
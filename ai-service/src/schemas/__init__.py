@@ -2,14 +2,31 @@
 from .requests import (
     SentimentRequest, 
     EmotionRequest, 
+    SentimentBatchRequest, 
+    EmotionBatchRequest, 
+    FullAnalysisRequest, 
+    FullAnalysisBatchRequest, 
+    DuplicatesRequest, 
     KeywordRequest, 
+    KeywordBatchRequest, 
     TopicRequest, 
-    LanguageDetectionRequest
+    TopicUpdateRequest, 
+    LanguageDetectionRequest, 
+    LanguageDetectionBatchRequest
 )
 from .responses import (
     SentimentResponse, 
     EmotionResponse, 
+    SentimentBatchResponse, 
+    EmotionBatchResponse, 
+    FullAnalysisResponse, 
+    FullAnalysisBatchResponse, 
+    DuplicatesResponse, 
     KeywordResponse, 
+    KeywordBatchResponse, 
     TopicResponse, 
-    LanguageResponse
+    BrandTopicsResponse, 
+    TopicTrackerStats, 
+    LanguageResponse, 
+    LanguageBatchResponse
 )
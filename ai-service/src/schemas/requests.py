@@ -1,6 +1,6 @@
 
 from pydantic import BaseModel, Field, field_validator
-from typing import Optional, List
+from typing import Optional, List, Union
 from ..config.settings import settings
 
 class AnalyzeRequest(BaseModel):
@@ -36,5 +36,66 @@ class TopicRequest(BaseModel):
              raise ValueError('At least 2 non-empty texts are required')
         return cleaned_texts
 
+class TopicUpdateRequest(BaseModel):
+    texts: List[str] = Field(..., min_length=1, max_length=10000, description="New mentions of the brand")
+
+    @field_validator('texts')
+    def validate_texts(cls, v):
+        for t in v:
+            if len(t) > settings.MAX_TEXT_LENGTH:
+                raise ValueError(f'Texts must be at most {settings.MAX_TEXT_LENGTH} characters')
+        return v
+
+class BatchAnalyzeRequest(BaseModel):
+    """Base schema for batch analysis requests. Results keep the order of `texts`."""
+    texts: List[str] = Field(..., min_length=1, max_length=1000, description="List of texts to analyze")
+    language: Optional[str] = Field(None, description="Language code (fr, en, es) applied to all texts.")
+
+    @field_validator('texts')
+    def validate_texts(cls, v):
+        for t in v:
+            if not t.strip():
+                raise ValueError('Texts must not be empty')
+            if len(t) > settings.MAX_TEXT_LENGTH:
+                raise ValueError(f'Texts must be at most {settings.MAX_TEXT_LENGTH} characters')
+        return v
+
+class SentimentBatchRequest(BatchAnalyzeRequest):
+    pass
+
+class EmotionBatchRequest(BatchAnalyzeRequest):
+    pass
+
+class KeywordBatchRequest(BatchAnalyzeRequest):
+    max_keywords: int = Field(10, ge=1, le=50, description="Maximum number of keywords to return")
+
+class DuplicatesRequest(BatchAnalyzeRequest):
+    pass
+
+class FullAnalysisRequest(AnalyzeRequest):
+    max_keywords: int = Field(10, ge=1, le=50, description="Maximum number of keywords to return")
+
+class FullAnalysisBatchRequest(BatchAnalyzeRequest):
+    max_keywords: int = Field(10, ge=1, le=50, description="Maximum number of keywords to return")
+
 class LanguageDetectionRequest(BaseModel):
     text: str = Field(..., min_length=1, max_length=settings.MAX_TEXT_LENGTH)
+
+class LanguageDetectionBatchRequest(BaseModel):
+    texts: List[str] = Field(..., min_length=1, max_length=1000, description="List of texts to analyze")
+
+    @field_validator('texts')
+    def validate_texts(cls, v):
+        for t in v:
+            if len(t) > settings.MAX_TEXT_LENGTH:
+                raise ValueError(f'Texts must be at most {settings.MAX_TEXT_LENGTH} characters')
+        return v
+
+class StreamRecord(BaseModel):
+    """One line of the NDJSON body of /analyze/stream."""
+    id: Union[str, int] = Field(..., description="Caller's identifier, echoed in the result")
+    text: str = Field(..., min_length=1, max_length=settings.MAX_TEXT_LENGTH)
+    language: Optional[str] = Field(None, description="Language code (fr, en, es). Auto-detected if empty.")
+
+class ModelSwapRequest(BaseModel):
+    model: str = Field(..., min_length=1, max_length=200, description="Hugging Face model name (or bundle entry) to serve")
@@ -15,6 +15,10 @@ class SentimentResponse(BaseResponse):
     confidence: float
     scores: SentimentScores
     language_detected: Optional[str] = None
+    stage: Optional[Literal["lexicon", "linear", "transformer"]] = None  # Cascade stage that answered
+
+class SentimentBatchResponse(BaseResponse):
+    results: List[SentimentResponse]
 
 class EmotionScores(BaseModel):
     anger: float
@@ -29,6 +33,9 @@ class EmotionResponse(BaseResponse):
     emotions: EmotionScores
     dominant_emotion: str
 
+class EmotionBatchResponse(BaseResponse):
+    results: List[EmotionResponse]
+
 class KeywordItem(BaseModel):
     word: str
     score: float
@@ -37,6 +44,9 @@ class KeywordItem(BaseModel):
 class KeywordResponse(BaseResponse):
     keywords: List[KeywordItem]
 
+class KeywordBatchResponse(BaseResponse):
+    results: List[KeywordResponse]
+
 class TopicItem(BaseModel):
     id: int
     label: str
@@ -46,6 +56,15 @@ class TopicItem(BaseModel):
 class TopicResponse(BaseResponse):
     topics: List[TopicItem]
 
+class TopicTrackerStats(BaseResponse):
+    brand: str
+    documents: float  # Decayed number of mentions
+    phrases_tracked: int
+    updated_at: float
+
+class BrandTopicsResponse(TopicTrackerStats):
+    topics: List[TopicItem]
+
 class LanguageAlternative(BaseModel):
     language: str
     confidence: float
@@ -55,13 +74,94 @@ class LanguageResponse(BaseResponse):
     confidence: float
     alternatives: List[LanguageAlternative]
 
+class LanguageBatchResponse(BaseResponse):
+    results: List[LanguageResponse]
+
+class DuplicateItem(BaseModel):
+    cluster_id: int  # -1: too short to compare
+    is_representative: bool
+    similarity: float  # Estimated Jaccard similarity to the cluster representative
+
+class DuplicatesResponse(BaseResponse):
+    results: List[DuplicateItem]
+    clusters: int
+
+class FullAnalysisResult(BaseModel):
+    language: LanguageResponse
+    sentiment: SentimentResponse
+    emotions: EmotionResponse
+    keywords: KeywordResponse
+
+class FullAnalysisResponse(FullAnalysisResult, BaseResponse):
+    timings_ms: Dict[str, float]
+
+class FullAnalysisBatchResponse(BaseResponse):
+    results: List[FullAnalysisResult]
+    timings_ms: Dict[str, float]
+
 class HealthResponse(BaseModel):
     status: str
     version: str
     models_loaded: Dict[str, bool]
     uptime_seconds: float
 
+class ModelProgress(BaseModel):
+    state: Literal["pending", "loading", "warming", "ready", "failed"]
+    load_ms: Optional[float] = None
+    warmup_ms: Optional[float] = None
+    batches_done: int = 0
+    batches_total: int = 0
+    error: Optional[str] = None
+
 class ReadyResponse(BaseModel):
     ready: bool
     models_loaded: int
     memory_usage_mb: float
+    models_memory_mb: Dict[str, float] = {}
+    quantized: bool = False
+    progress: Dict[str, ModelProgress] = {}
+
+class CacheStats(BaseModel):
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    hit_ratio: float
+    evictions: int
+    expirations: int
+
+class ResultStoreStats(BaseModel):
+    path: str
+    entries: int
+    size_mb: float
+    max_size_mb: float
+    hits: int
+    misses: int
+    hit_ratio: float
+    evictions: int
+    errors: int
+
+class CacheStatsResponse(BaseModel):
+    enabled: bool
+    ttl_seconds: int
+    caches: Dict[str, CacheStats]
+    store: Optional[ResultStoreStats] = None
+
+class ModelSwapStatus(BaseModel):
+    analyzer: str
+    model: str
+    previous_model: str
+    state: Literal["loading", "active", "failed"]
+    load_ms: Optional[float] = None
+    warmup_ms: Optional[float] = None
+    error: Optional[str] = None
+
+class ServedModel(BaseModel):
+    analyzer: str
+    model: str
+    version: str
+    loaded: bool
+    last_swap: Optional[ModelSwapStatus] = None
+
+class ModelsStatusResponse(BaseModel):
+    models: List[ServedModel]
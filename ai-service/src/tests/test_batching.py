@@ -0,0 +1,161 @@
+
+import asyncio
+import threading
+import time
+from ..utils.batching import MicroBatcher
+from ..utils.deadlines import RequestBudget, current_request
+from ..utils.exceptions import RequestAbandonedException
+
+def test_concurrent_submits_are_coalesced():
+    calls = []
+
+    def process(items):
+        calls.append(list(items))
+        return [item.upper() for item in items]
+
+    batcher = MicroBatcher("test", process, max_batch_size=8, max_wait_ms=20)
+
+    async def run():
+        return await asyncio.gather(*(batcher.submit(t) for t in ["a", "b", "c"]))
+
+    assert asyncio.run(run()) == ["A", "B", "C"]
+    assert calls == [["a", "b", "c"]]
+
+def test_batches_are_capped_at_max_size():
+    calls = []
+
+    def process(items):
+        calls.append(len(items))
+        return items
+
+    batcher = MicroBatcher("test", process, max_batch_size=2, max_wait_ms=50)
+
+    async def run():
+        return await batcher.submit_many(list(range(5)))
+
+    assert asyncio.run(run()) == [0, 1, 2, 3, 4]
+    assert max(calls) <= 2
+    assert sum(calls) == 5
+
+def test_errors_propagate_to_every_caller():
+    def process(items):
+        raise RuntimeError("boom")
+
+    batcher = MicroBatcher("test", process, max_batch_size=4, max_wait_ms=1)
+
+    async def run():
+        return await asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+def test_identical_items_share_one_computation():
+    calls = []
+
+    def process(items):
+        calls.append(list(items))
+        return [{"text": item} for item in items]
+
+    batcher = MicroBatcher("test", process, max_batch_size=8, max_wait_ms=20, key=str.lower)
+
+    async def run():
+        first = asyncio.gather(batcher.submit_many(["a", "b", "A"]))
+        await asyncio.sleep(0)
+        # Joins "a" while it is still pending or running
+        second = await batcher.submit("a")
+        return (await first)[0], second
+
+    first, second = asyncio.run(run())
+    assert calls == [["a", "b"]]
+    assert first == [{"text": "a"}, {"text": "b"}, {"text": "a"}]
+    assert second == {"text": "a"} and second is not first[0]
+
+def test_abandoned_requests_are_dropped_before_inference():
+    calls = []
+
+    def process(items):
+        calls.append(list(items))
+        return items
+
+    batcher = MicroBatcher("test", process, max_batch_size=8, max_wait_ms=20)
+    expired = RequestBudget(time.monotonic() - 1)
+    disconnected = RequestBudget()
+    disconnected.disconnected = True
+
+    async def submit(item, budget):
+        current_request.set(budget)
+        return await batcher.submit(item)
+
+    async def run():
+        return await asyncio.gather(
+            submit("late", expired), submit("gone", disconnected), submit("live", RequestBudget()),
+            return_exceptions=True,
+        )
+
+    late, gone, live = asyncio.run(run())
+    assert calls == [["live"]]
+    assert live == "live"
+    assert isinstance(late, RequestAbandonedException) and late.status_code == 504
+    assert isinstance(gone, RequestAbandonedException) and gone.status_code == 499
+
+def test_caller_joining_a_dropped_item_gets_it_computed():
+    calls = []
+    gate, in_batch, joined = threading.Event(), threading.Event(), threading.Event()
+
+    def process(items):
+        calls.append(list(items))
+        if items == ["y"]:
+            in_batch.set()
+            joined.wait(5)
+        return [item.upper() for item in items]
+
+    batcher = MicroBatcher("test", process, max_batch_size=8, max_wait_ms=5, key=str.lower)
+    gone = RequestBudget()
+
+    async def submit(item, budget):
+        current_request.set(budget)
+        return await batcher.submit(item)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        # Holds the batch back until its first caller has disconnected
+        blocked = loop.run_in_executor(batcher._executor, gate.wait, 5)
+        first = asyncio.gather(submit("x", gone), submit("y", RequestBudget()), return_exceptions=True)
+        await asyncio.sleep(0.05)
+        gone.disconnected = True
+        gate.set()
+        await blocked
+        # "x" was dropped on the slot; a new caller joins it before the batch settles
+        await loop.run_in_executor(None, in_batch.wait, 5)
+        late = asyncio.ensure_future(submit("X", RequestBudget()))
+        await asyncio.sleep(0)
+        joined.set()
+        return await first, await asyncio.wait_for(late, timeout=5)
+
+    (dropped, y), late = asyncio.run(run())
+    assert isinstance(dropped, RequestAbandonedException)
+    assert y == "Y" and late == "X"
+    assert calls == [["y"], ["x"]]
+
+def test_request_timeout_header_sets_the_deadline(monkeypatch):
+    from fastapi.testclient import TestClient
+    from ..api.app import create_app
+    from ..api.dependencies import get_sentiment_batcher
+
+    remaining = []
+
+    async def submit(text):
+        remaining.append(current_request.get().remaining())
+        return {
+            "sentiment": "POSITIVE",
+            "confidence": 1.0,
+            "scores": {"positive": 1.0, "negative": 0.0, "neutral": 0.0},
+            "processing_time_ms": 0.0,
+        }
+
+    monkeypatch.setattr(get_sentiment_batcher().for_lane(), "submit", submit)
+    client = TestClient(create_app())
+    client.post("/analyze/sentiment", json={"text": "Bon produit"}, headers={"X-Request-Timeout-Ms": "500"})
+    client.post("/analyze/sentiment", json={"text": "Bon produit"}, headers={"X-Request-Timeout-Ms": "0"})
+    assert 0 < remaining[0] <= 0.5
+    assert remaining[1] is None
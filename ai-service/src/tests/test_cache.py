@@ -0,0 +1,82 @@
+
+import threading
+import time
+from ..utils.cache import TTLCache, CacheManager, make_cache_key
+from ..utils.singleflight import SingleFlight
+
+def test_cache_key_ignores_whitespace_differences():
+    assert make_cache_key("Super  produit !\n", "model-a") == make_cache_key(" Super produit !", "model-a")
+
+def test_cache_key_depends_on_model_and_params():
+    base = make_cache_key("Super produit", "model-a", lang="fr")
+    assert base != make_cache_key("Super produit", "model-b", lang="fr")
+    assert base != make_cache_key("Super produit", "model-a", lang="en")
+
+def test_lru_eviction():
+    cache = TTLCache(maxsize=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" becomes least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+def test_ttl_expiration():
+    cache = TTLCache(maxsize=10, ttl_seconds=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+def test_cached_values_are_copies():
+    cache = TTLCache(maxsize=10, ttl_seconds=60)
+    cache.set("a", {"sentiment": "POSITIVE"})
+    cache.get("a")["sentiment"] = "NEGATIVE"
+    assert cache.get("a") == {"sentiment": "POSITIVE"}
+
+def test_get_or_compute_many_only_computes_misses():
+    manager = CacheManager()
+    manager.clear()
+    computed = []
+
+    def compute(items):
+        computed.extend(items)
+        return [item.upper() for item in items]
+
+    keys = [make_cache_key(t, "test") for t in ["a", "b", "a"]]
+    assert manager.get_or_compute_many("test", keys, ["a", "b", "a"], compute) == ["A", "B", "A"]
+    assert computed == ["a", "b"]
+
+    assert manager.get_or_compute_many("test", keys[:1], ["a"], compute) == ["A"]
+    assert computed == ["a", "b"]
+    assert manager.stats()["test"]["hits"] >= 1
+
+def test_single_flight_shares_in_flight_computations():
+    flight = SingleFlight("test")
+    computing = threading.Event()
+    release = threading.Event()
+    computed = []
+
+    def slow(keys):
+        computed.append(list(keys))
+        computing.set()
+        release.wait(5)
+        return [key.upper() for key in keys]
+
+    results = {}
+    leader = threading.Thread(target=lambda: results.update(leader=flight.run(["a", "b"], slow)))
+    leader.start()
+    computing.wait(5)
+    follower = threading.Thread(target=lambda: results.update(follower=flight.run(["b", "c"], slow)))
+    follower.start()
+    follower.join(0.2)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert results == {"leader": ["A", "B"], "follower": ["B", "C"]}
+    assert computed == [["a", "b"], ["c"]]
+    assert flight.shared == 1
+    assert flight.in_flight() == 0
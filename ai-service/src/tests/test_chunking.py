@@ -0,0 +1,57 @@
+
+import pytest
+from ..utils.chunking import ChunkedClassifier, aggregate_scores, plan_windows, select_windows
+
+def _word_offsets(texts):
+    # One "token" per word, like a whitespace tokenizer
+    offsets = []
+    for text in texts:
+        text_offsets, position = [], 0
+        for word in text.split(" "):
+            text_offsets.append((position, position + len(word)))
+            position += len(word) + 1
+        offsets.append(text_offsets)
+    return offsets
+
+def test_windows_cover_the_whole_text_with_overlap():
+    offsets = [(i * 2, i * 2 + 1) for i in range(10)]
+    windows = plan_windows(offsets, window_tokens=4, overlap_tokens=1)
+
+    assert windows[0] == (0, 7, 4)
+    assert windows[-1][1] == offsets[-1][1]
+    assert sum(count for _, _, count in windows) == 10 + len(windows) - 1
+
+def test_head_tail_keeps_both_ends():
+    windows = [(i, i + 1, 1) for i in range(5)]
+    assert select_windows(windows, "head_tail", max_windows=8) == [windows[0], windows[-1]]
+    assert select_windows(windows, "mean", max_windows=3) == [windows[0], windows[1], windows[-1]]
+
+def test_weighted_mean_favours_longer_windows():
+    scores = aggregate_scores(
+        [[{"label": "pos", "score": 1.0}, {"label": "neg", "score": 0.0}],
+         [{"label": "pos", "score": 0.0}, {"label": "neg", "score": 1.0}]],
+        weights=[3, 1],
+        strategy="weighted_mean"
+    )
+    assert scores[0] == {"label": "pos", "score": 0.75}
+
+def test_long_texts_are_classified_in_one_batched_call():
+    calls = []
+
+    def backend(texts, batch_size, truncation):
+        calls.append(list(texts))
+        return [[{"label": "neg" if "bad" in t else "pos", "score": 1.0}] for t in texts]
+
+    classifier = ChunkedClassifier(backend, _word_offsets, max_tokens=6, strategy="head_tail")
+    long_text = "good " * 20 + "bad"
+    results = classifier(["ok", long_text])
+
+    assert len(calls) == 1
+    # Short text untouched, long text classified on its head and tail windows
+    assert "ok" in calls[0] and len(calls[0]) == 3
+    assert {item["label"] for item in results[1]} == {"pos", "neg"}
+    assert results[0] == [{"label": "pos", "score": 1.0}]
+
+def test_unknown_strategy_is_rejected():
+    with pytest.raises(ValueError):
+        ChunkedClassifier(lambda *a, **k: [], _word_offsets, max_tokens=10, strategy="median")
@@ -0,0 +1,59 @@
+
+from fastapi.testclient import TestClient
+from ..api.app import create_app
+from ..config.settings import settings
+from ..models.sentiment_analyzer import SentimentAnalyzer
+from ..utils.cache import CacheManager, content_hash
+from ..utils.dedup import NearDuplicateIndex
+
+REVIEW = "Je suis vraiment déçu par ce téléphone, la batterie ne tient pas la journée."
+
+def test_near_duplicates_share_a_cluster():
+    index = NearDuplicateIndex()
+    results = index.assign([
+        REVIEW,
+        "RT @marie " + REVIEW,
+        "Livraison rapide et produit conforme à la description, merci !",
+    ])
+
+    assert results[0]["is_representative"]
+    assert results[1]["cluster_id"] == results[0]["cluster_id"]
+    assert results[1]["representative"] == content_hash(REVIEW)
+    assert results[2]["cluster_id"] != results[0]["cluster_id"]
+
+def test_short_texts_are_never_merged():
+    index = NearDuplicateIndex()
+    results = index.assign(["super produit", "super produits"])
+    assert [r["cluster_id"] for r in results] == [-1, -1]
+
+def test_index_is_bounded():
+    index = NearDuplicateIndex(max_entries=5)
+    index.assign([f"Texte numéro {i} avec un contenu complètement différent {i * 7919}" for i in range(20)])
+    assert index.stats()["clusters"] == 5
+    # Clusters keep fixed-size content hashes, not the texts
+    assert all(len(content) == 64 for _, content in index._entries.values())
+    assert all(index._buckets.values())
+
+def test_models_only_run_on_representatives(monkeypatch):
+    seen = []
+
+    def fake_model(texts, batch_size, truncation):
+        seen.extend(texts)
+        return [[{"label": "1 star", "score": 0.9}, {"label": "5 stars", "score": 0.1}] for _ in texts]
+
+    monkeypatch.setattr(SentimentAnalyzer, "_model", fake_model)
+    monkeypatch.setattr(SentimentAnalyzer, "_initialized", True)
+    monkeypatch.setattr(settings, "DEDUP_ENABLED", True)
+    CacheManager().clear()
+
+    results = SentimentAnalyzer().analyze_batch([REVIEW, REVIEW + " #fail", "RT " + REVIEW])
+    assert seen == [REVIEW]
+    assert [r["sentiment"] for r in results] == ["NEGATIVE"] * 3
+
+def test_duplicates_endpoint():
+    client = TestClient(create_app())
+    response = client.post("/analyze/duplicates", json={"texts": [REVIEW, REVIEW + " !!!"]})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["clusters"] == 1
+    assert data["results"][1]["similarity"] >= settings.DEDUP_THRESHOLD
@@ -0,0 +1,46 @@
+
+import pytest
+from fastapi.testclient import TestClient
+from ..api.app import create_app
+from ..models.sentiment_analyzer import SentimentAnalyzer
+from ..models.emotion_detector import EmotionDetector
+from ..models.keyword_extractor import KeywordExtractor
+from ..utils.cache import CacheManager
+
+spacy = pytest.importorskip("spacy")
+
+@pytest.fixture
+def client(monkeypatch):
+    def fake_sentiment(texts, batch_size, truncation):
+        return [[{"label": "5 stars", "score": 0.9}, {"label": "1 star", "score": 0.1}] for _ in texts]
+
+    def fake_emotions(texts, batch_size, truncation):
+        return [[{"label": "joy", "score": 0.8}, {"label": "anger", "score": 0.2}] for _ in texts]
+
+    monkeypatch.setattr(SentimentAnalyzer, "_model", fake_sentiment)
+    monkeypatch.setattr(SentimentAnalyzer, "_initialized", True)
+    monkeypatch.setattr(EmotionDetector, "_model", fake_emotions)
+    monkeypatch.setattr(EmotionDetector, "_initialized", True)
+    monkeypatch.setattr(KeywordExtractor, "_nlp_fr", spacy.blank("fr"))
+    monkeypatch.setattr(KeywordExtractor, "_nlp_en", spacy.blank("en"))
+    monkeypatch.setattr(KeywordExtractor, "_initialized", True)
+    CacheManager().clear()
+    return TestClient(create_app())
+
+def test_full_analysis_combines_all_stages(client):
+    response = client.post("/analyze/full", json={"text": "Excellent service client, je recommande", "language": "fr"})
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["language"]["language"] == "fr"
+    assert data["sentiment"]["sentiment"] == "POSITIVE"
+    assert data["sentiment"]["language_detected"] == "fr"
+    assert data["emotions"]["dominant_emotion"] == "joy"
+    assert data["keywords"]["keywords"]
+    assert {"preprocess", "language", "sentiment", "emotions", "keywords", "total"} <= set(data["timings_ms"])
+
+def test_full_analysis_batch_keeps_order(client):
+    texts = ["Great product", "Produit nul", "Service correct"]
+    response = client.post("/analyze/full/batch", json={"texts": texts, "language": "en"})
+    assert response.status_code == 200
+    assert len(response.json()["results"]) == len(texts)
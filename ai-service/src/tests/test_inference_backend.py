@@ -0,0 +1,101 @@
+
+import os
+import numpy as np
+import pytest
+from ..models.inference_backend import OnnxBackend, onnx_model_dir
+
+def _backend(labels, multi_label=False):
+    backend = OnnxBackend.__new__(OnnxBackend)
+    backend.id2label = dict(enumerate(labels))
+    backend.multi_label = multi_label
+    return backend
+
+def test_scores_match_pipeline_format():
+    backend = _backend(["1 star", "2 stars", "3 stars", "4 stars", "5 stars"])
+    scores = backend._to_scores(np.array([0.1, 0.2, 0.3, 2.0, 3.0]))
+
+    # Same shape as the transformers pipeline with top_k=None: sorted by score
+    assert [item["label"] for item in scores][:2] == ["5 stars", "4 stars"]
+    assert abs(sum(item["score"] for item in scores) - 1.0) < 1e-6
+
+def test_multi_label_uses_sigmoid():
+    backend = _backend(["joy", "anger"], multi_label=True)
+    scores = backend._to_scores(np.array([0.0, 0.0]))
+    assert all(abs(item["score"] - 0.5) < 1e-6 for item in scores)
+
+def test_onnx_model_dir_is_filesystem_safe():
+    path = onnx_model_dir("nlptown/bert-base-multilingual-uncased-sentiment")
+    assert os.path.basename(path) == "nlptown--bert-base-multilingual-uncased-sentiment"
+
+def test_bundle_roundtrip_matches_source_model(tmp_path):
+    torch = pytest.importorskip("torch")
+    from transformers import BertConfig, BertForSequenceClassification, BertTokenizerFast
+    from ..models.inference_backend import load_bundled_model
+    from ..utils.build_bundle import build_model_bundle
+
+    vocab = tmp_path / "vocab.txt"
+    vocab.write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "good", "bad", "service"]))
+    source = tmp_path / "source"
+    config = BertConfig(
+        vocab_size=8, hidden_size=16, num_hidden_layers=1, num_attention_heads=2,
+        intermediate_size=32, num_labels=2
+    )
+    BertForSequenceClassification(config).eval().save_pretrained(source)
+    BertTokenizerFast(vocab_file=str(vocab)).save_pretrained(source)
+
+    bundle = tmp_path / "bundle"
+    build_model_bundle(str(source), str(bundle))
+    model, tokenizer = load_bundled_model(str(bundle))
+
+    reference = BertForSequenceClassification.from_pretrained(source).eval()
+    inputs = tokenizer(["good service", "bad"], padding=True, return_tensors="pt")
+    with torch.no_grad():
+        assert torch.allclose(model(**inputs).logits, reference(**inputs).logits, atol=1e-6)
+
+def test_onnx_and_torch_backends_give_the_same_results(tmp_path, monkeypatch):
+    torch = pytest.importorskip("torch")
+    pytest.importorskip("onnxruntime")
+    from transformers import BertConfig, BertForSequenceClassification, BertTokenizerFast
+    from ..config.settings import settings
+    from ..models.inference_backend import create_backend
+    from ..models.sentiment_analyzer import SentimentAnalyzer
+    from ..utils.export_onnx import export_model
+
+    vocab = tmp_path / "vocab.txt"
+    vocab.write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "good", "bad", "service", "slow"]))
+    source = tmp_path / "source"
+    labels = ["1 star", "2 stars", "3 stars", "4 stars", "5 stars"]
+    config = BertConfig(
+        vocab_size=9, hidden_size=16, num_hidden_layers=1, num_attention_heads=2, intermediate_size=32,
+        # Large random weights: peaked scores that differ between texts
+        initializer_range=1.0,
+        num_labels=5, id2label=dict(enumerate(labels)), label2id={label: i for i, label in enumerate(labels)}
+    )
+    torch.manual_seed(5)
+    BertForSequenceClassification(config).eval().save_pretrained(source)
+    BertTokenizerFast(vocab_file=str(vocab)).save_pretrained(source)
+
+    export_dir = tmp_path / "onnx"
+    export_model(str(source), str(export_dir))
+    monkeypatch.setattr(settings, "INFERENCE_BACKEND", "torch")
+    monkeypatch.setattr(settings, "MODEL_QUANTIZATION", False)
+    torch_backend = create_backend("sentiment-analysis", str(source))
+    onnx_backend = OnnxBackend(str(export_dir))
+
+    texts = ["good service", "bad slow service", "slow", "good good good bad"]
+    analyzer = SentimentAnalyzer()
+    sentiments = []
+    for expected, actual in zip(torch_backend(texts, batch_size=2, truncation=True), onnx_backend(texts, batch_size=2)):
+        expected_scores = {item["label"]: item["score"] for item in expected}
+        actual_scores = {item["label"]: item["score"] for item in actual}
+        assert actual_scores.keys() == expected_scores.keys()
+        assert all(abs(actual_scores[label] - expected_scores[label]) < 1e-4 for label in labels)
+
+        expected_normalized = analyzer._normalize_scores(expected)
+        actual_normalized = analyzer._normalize_scores(actual)
+        for key in ("positive", "negative", "neutral"):
+            assert abs(actual_normalized[key] - expected_normalized[key]) <= 1e-4
+        sentiment = analyzer._determine_sentiment_label(actual_normalized)
+        assert sentiment == analyzer._determine_sentiment_label(expected_normalized)
+        sentiments.append(sentiment)
+    assert len(set(sentiments)) > 1
@@ -1,5 +1,12 @@
 
 import pytest
+from fastapi.testclient import TestClient
+from ..api.app import create_app
+from ..config.settings import settings
+from ..models.keyword_extractor import KeywordExtractor, keep_ner_only
+from ..utils.cache import CacheManager
+
+spacy = pytest.importorskip("spacy")
 
 # Since KeywordExtractor relies on SpaCy, we might want to mock it.
 # But for simplicity, we'll verify it doesn't crash on simple input.
@@ -8,3 +15,50 @@ import pytest
 
 def test_placeholder_keywords():
     assert True
+
+TEXTS = [
+    "Le service client de cette boutique est excellent, livraison rapide.",
+    "The battery life of this phone is disappointing after the update.",
+    "Produit de qualité, emballage soigné et prix correct.",
+]
+
+@pytest.fixture
+def extractor(monkeypatch):
+    monkeypatch.setattr(KeywordExtractor, "_nlp_fr", spacy.blank("fr"))
+    monkeypatch.setattr(KeywordExtractor, "_nlp_en", spacy.blank("en"))
+    monkeypatch.setattr(KeywordExtractor, "_initialized", True)
+    CacheManager().clear()
+    return KeywordExtractor()
+
+def test_only_ner_stays_enabled():
+    nlp = spacy.blank("en")
+    for name in ("tagger", "parser", "ner"):
+        nlp.add_pipe(name)
+    keep_ner_only(nlp)
+    assert nlp.pipe_names == ["ner"]
+
+def test_batch_matches_single_extraction(extractor):
+    batch = extractor.extract_batch(TEXTS, max_keywords=5, lang=["fr", "en", "fr"])
+    CacheManager().clear()
+    singles = [extractor.extract(text, max_keywords=5, lang=lang) for text, lang in zip(TEXTS, ["fr", "en", "fr"])]
+
+    assert [r["keywords"] for r in batch] == [r["keywords"] for r in singles]
+
+def test_large_batches_use_the_process_pool(extractor, monkeypatch):
+    monkeypatch.setattr(settings, "KEYWORD_PROCESSES", 1)
+    monkeypatch.setattr(settings, "KEYWORD_PROCESS_MIN_BATCH", 2)
+    in_process = extractor._yake_batch([(t, "fr") for t in TEXTS], 5)
+
+    pooled = extractor._yake_batch([(t, "fr") for t in TEXTS], 5)
+    assert KeywordExtractor._process_pool is not None
+    assert pooled == in_process
+    KeywordExtractor._process_pool.shutdown()
+    KeywordExtractor._process_pool = None
+
+def test_keywords_batch_endpoint(extractor):
+    client = TestClient(create_app())
+    response = client.post("/analyze/keywords/batch", json={"texts": TEXTS, "max_keywords": 3})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert len(results) == len(TEXTS)
+    assert all(0 < len(r["keywords"]) <= 3 for r in results)
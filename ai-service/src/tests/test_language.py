@@ -0,0 +1,56 @@
+
+from langdetect.utils.ngram import NGram
+from fastapi.testclient import TestClient
+from ..api.app import create_app
+from ..models.language_detector import LanguageDetector, extract_ngrams
+
+TEXTS = {
+    "fr": "Le service client a été très réactif, je suis satisfait de mon achat.",
+    "en": "The delivery was late and the package arrived damaged.",
+    "es": "El producto llegó a tiempo y funciona perfectamente.",
+}
+
+def _langdetect_ngrams(text):
+    ngram, grams = NGram(), []
+    for ch in text + " ":
+        ngram.add_char(ch)
+        grams.extend(g for g in (ngram.get(1), ngram.get(2), ngram.get(3)) if g)
+    return grams
+
+def test_ngrams_match_langdetect():
+    for text in [*TEXTS.values(), "HELLO World, l'été ABC d"]:
+        assert extract_ngrams(text) == _langdetect_ngrams(text)
+
+def test_detection_is_deterministic_and_batched():
+    detector = LanguageDetector()
+    batch = detector.detect_batch(list(TEXTS.values()))
+
+    assert [r["language"] for r in batch] == list(TEXTS)
+    for text, result in zip(TEXTS.values(), batch):
+        single = detector.detect(text)
+        assert single["language"] == result["language"]
+        assert single["confidence"] == result["confidence"]
+
+def test_short_text_fast_paths():
+    detector = LanguageDetector()
+    assert detector.detect("Καλημέρα")["language"] == "el"
+    assert detector.detect("こんにちは")["language"] == "ja"
+    no_letters = detector.detect("1234 !!")
+    assert (no_letters["language"], no_letters["confidence"]) == ("en", 0.0)
+    # Short Latin texts only compete between the expected languages
+    assert detector.detect("merci beaucoup")["language"] in {"fr", "en", "es"}
+
+def test_short_texts_keep_unrestricted_confidences():
+    detector = LanguageDetector()
+    short = detector.detect("merci beaucoup")
+    alternatives = {item["language"]: item["confidence"] for item in short["alternatives"]}
+    assert short["confidence"] == alternatives[short["language"]]
+    # None of the expected languages is plausible: the text isn't forced into one of them
+    german = detector.detect("Ich liebe dieses Produkt sehr")
+    assert german["language"] == "de"
+
+def test_language_batch_endpoint():
+    client = TestClient(create_app())
+    response = client.post("/detect/language/batch", json={"texts": list(TEXTS.values())})
+    assert response.status_code == 200
+    assert [r["language"] for r in response.json()["results"]] == list(TEXTS)
@@ -0,0 +1,27 @@
+
+import os
+import signal
+import time
+from ..utils.memory_report import memory_report, process_memory
+
+def test_process_memory_fields():
+    info = process_memory(os.getpid())
+    assert info["rss_mb"] > 0
+    assert info["uss_mb"] <= info["rss_mb"]
+
+def test_forked_workers_share_pages():
+    pid = os.fork()
+    if pid == 0:
+        time.sleep(30)
+        os._exit(0)
+    try:
+        time.sleep(0.2)
+        report = memory_report(os.getpid())
+        workers = [p for p in report["processes"] if p["pid"] == pid]
+        assert workers and workers[0]["role"] == "worker"
+        # The child hasn't written to the inherited pages yet: most of them are shared
+        assert workers[0]["shared_mb"] > workers[0]["private_mb"]
+        assert report["total_pss_mb"] <= report["total_rss_mb"]
+    finally:
+        os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
@@ -0,0 +1,75 @@
+import asyncio
+from prometheus_client import REGISTRY, generate_latest
+from ..config.settings import settings
+from ..utils import metrics
+from ..utils.batching import MicroBatcher
+from ..utils.chunking import ChunkedClassifier
+from ..utils.scheduler import InferenceScheduler
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+def test_stages_are_recorded_once_per_batch(monkeypatch):
+    monkeypatch.setattr(settings, "ENABLE_METRICS", True)
+
+    def backend(texts, batch_size=16, truncation=True):
+        with metrics.stage("tokenize"):
+            pass
+        with metrics.stage("forward"):
+            return [[{"label": "POSITIVE", "score": 1.0}] for _ in texts]
+
+    def offsets(texts):
+        return [[(i, i + 1) for i in range(len(text))] for text in texts]
+
+    classifier = ChunkedClassifier(backend, offsets, max_tokens=6, strategy="mean")
+    before = _sample("ai_inference_stage_seconds_count", model="test", stage="forward")
+
+    with metrics.record_stages("test"):
+        classifier(["short", "a much longer text split into windows"])
+
+    for stage in metrics.STAGES:
+        assert _sample("ai_inference_stage_seconds_count", model="test", stage=stage) >= 1
+    assert _sample("ai_inference_stage_seconds_count", model="test", stage="forward") == before + 1
+
+def test_stages_are_not_recorded_when_disabled(monkeypatch):
+    monkeypatch.setattr(settings, "ENABLE_METRICS", False)
+    with metrics.record_stages("disabled"):
+        with metrics.stage("forward"):
+            pass
+    assert _sample("ai_inference_stage_seconds_count", model="disabled", stage="forward") == 0
+
+def test_batch_size_and_queue_metrics():
+    scheduler = InferenceScheduler(slots=1, deadline_ms=10000)
+    batcher = MicroBatcher("metrics-test", lambda items: items, max_batch_size=4, max_wait_ms=1, scheduler=scheduler)
+    metrics.track_scheduler(scheduler)
+    metrics.track_batcher(batcher)
+
+    asyncio.run(batcher.submit_many([1, 2, 3]))
+
+    assert _sample("ai_batch_size_count", batcher="metrics-test", lane="interactive") == 1
+    assert _sample("ai_batch_size_sum", batcher="metrics-test", lane="interactive") == 3
+    assert _sample("ai_queue_wait_seconds_count", model="metrics-test", lane="interactive") == 1
+    assert _sample("ai_batcher_pending_items", batcher="metrics-test", lane="interactive") == 0
+
+def test_exposition_includes_cache_and_load_metrics():
+    with metrics.track_model_load("test-model"):
+        pass
+    output = generate_latest(REGISTRY).decode()
+    assert 'ai_model_load_seconds{model="test-model"}' in output
+    assert "ai_model_rss_bytes" in output
+
+def test_each_worker_serves_metrics_on_its_own_port(monkeypatch):
+    bound = set()
+
+    def start_http_server(port):
+        if port in bound:
+            raise OSError(98, "Address already in use")
+        bound.add(port)
+
+    monkeypatch.setattr(metrics, "start_http_server", start_http_server)
+    monkeypatch.setattr(settings, "PREFORK", False)
+    monkeypatch.setattr(settings, "WORKERS", 2)
+    monkeypatch.setattr(settings, "METRICS_PORT", 9500)
+
+    # Workers start in any order: each takes the first free port
+    assert [metrics.start_metrics_server() for _ in range(3)] == [9500, 9501, None]
@@ -0,0 +1,81 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from ..config.settings import settings
+from ..models import sentiment_analyzer
+from ..models.model_swap import ACTIVE, ModelSwapper
+from ..models.sentiment_analyzer import SentimentAnalyzer
+from ..utils.scheduler import InferenceScheduler
+
+@pytest.fixture
+def fake_models(monkeypatch):
+    """Sentiment 'models' are plain names; results tell which one produced them."""
+    monkeypatch.setattr(SentimentAnalyzer, "_model", "old-model")
+    monkeypatch.setattr(SentimentAnalyzer, "_model_name", "old-model")
+    monkeypatch.setattr(SentimentAnalyzer, "_initialized", True)
+    monkeypatch.setattr(SentimentAnalyzer, "load_model", lambda self, name: name)
+    monkeypatch.setattr(sentiment_analyzer, "backend_memory_mb", lambda model: 0.0)
+    monkeypatch.setattr(settings, "SENTIMENT_CASCADE", False)
+
+def _result(model):
+    return {
+        "sentiment": "NEUTRAL",
+        "confidence": 1.0,
+        "scores": {"positive": 0.0, "negative": 0.0, "neutral": 1.0},
+        "model": model,
+    }
+
+def _wait_for_swap(swapper, analyzer="sentiment"):
+    for _ in range(500):
+        swap = next(model["last_swap"] for model in swapper.status() if model["analyzer"] == analyzer)
+        if swap["state"] != "loading":
+            return swap
+        time.sleep(0.01)
+    raise AssertionError("Swap did not finish")
+
+def test_swap_lets_running_batches_finish_on_the_previous_model(fake_models, monkeypatch):
+    started, release = threading.Event(), threading.Event()
+
+    def analyze(self, texts, model=None):
+        if model == "old-model":
+            started.set()
+            release.wait(5)
+        return [_result(model) for _ in texts]
+
+    monkeypatch.setattr(SentimentAnalyzer, "_analyze_uncached", analyze)
+    analyzer = SentimentAnalyzer()
+    swapper = ModelSwapper(InferenceScheduler(slots=1))
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        running = pool.submit(analyzer.analyze_batch, ["Colis reçu hier"])
+        assert started.wait(5)
+        swapper.start("sentiment", "new-model")
+        assert _wait_for_swap(swapper)["state"] == ACTIVE
+        release.set()
+        assert running.result(timeout=5)[0]["model"] == "old-model"
+
+    # Cache keys carry the model version: the old model's result isn't reused
+    assert analyzer.model_version.startswith("new-model@")
+    assert analyzer.analyze_batch(["Colis reçu hier"])[0]["model"] == "new-model"
+
+def test_admin_swap_requires_the_admin_key(fake_models, monkeypatch):
+    from fastapi.testclient import TestClient
+    from ..api.app import create_app
+    from ..api.dependencies import get_model_swapper
+
+    monkeypatch.setattr(SentimentAnalyzer, "_analyze_uncached", lambda self, texts, model=None: [_result(model)] * len(texts))
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "secret")
+    client = TestClient(create_app())
+
+    body = {"model": "new-model"}
+    assert client.post("/admin/models/sentiment", json=body).status_code == 403
+    assert client.post("/admin/models/sentiment", json=body, headers={"X-Admin-Key": "wrong"}).status_code == 403
+
+    response = client.post("/admin/models/sentiment", json=body, headers={"X-Admin-Key": "secret"})
+    assert response.status_code == 202
+    assert response.json()["previous_model"] == "old-model"
+    assert _wait_for_swap(get_model_swapper())["state"] == ACTIVE
+
+    served = client.get("/admin/models", headers={"X-Admin-Key": "secret"}).json()["models"]
+    assert {"analyzer": "sentiment", "model": "new-model"}.items() <= served[0].items()
@@ -0,0 +1,73 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from fastapi.testclient import TestClient
+from ..api.app import create_app
+from ..config.settings import settings
+from ..models.sentiment_analyzer import SentimentAnalyzer
+from ..utils.profiler import SamplingProfiler
+
+ADMIN = {"X-Admin-Key": "secret"}
+
+def busy_for(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+def test_profile_collapses_the_stacks_of_busy_threads():
+    worker = threading.Thread(target=busy_for, args=(0.3,), name="busy-worker")
+    session = SamplingProfiler().start(0.2, 0.005)
+    worker.start()
+    collapsed = session.result.result(timeout=5)
+    worker.join()
+
+    stacks = dict(line.rsplit(" ", 1) for line in collapsed.splitlines())
+    busy = [stack for stack in stacks if stack.startswith("busy-worker;")]
+    assert busy and all("busy_for (src/tests/test_profiler.py:" in stack for stack in busy)
+    # Threads waiting for work aren't sampled
+    assert not any(stack.split(";")[-1].startswith("wait (threading.py:") for stack in stacks)
+    assert session.sample_count > 0
+
+@pytest.fixture
+def profiled_app(monkeypatch):
+    def slow_model(texts, batch_size, truncation):
+        busy_for(0.1)
+        return [[{"label": "5 stars", "score": 0.9}] for _ in texts]
+
+    monkeypatch.setattr(SentimentAnalyzer, "_model", slow_model)
+    monkeypatch.setattr(SentimentAnalyzer, "_model_name", "profiler-test")
+    monkeypatch.setattr(SentimentAnalyzer, "_initialized", True)
+    monkeypatch.setattr(settings, "SENTIMENT_CASCADE", False)
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "secret")
+    monkeypatch.setattr(settings, "PROFILER_ENABLED", True)
+    monkeypatch.setattr(settings, "PROFILER_INTERVAL_MS", 5.0)
+    return create_app()
+
+def test_profiler_is_disabled_by_default(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "secret")
+    assert not settings.PROFILER_ENABLED
+    response = TestClient(create_app()).post("/admin/profile?seconds=0.1", headers=ADMIN)
+    assert response.status_code == 404
+
+def test_profile_of_the_next_marked_requests(profiled_app):
+    client = TestClient(profiled_app)
+    assert client.post("/admin/profile?seconds=0.1").status_code == 403
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        profile = pool.submit(client.post, "/admin/profile?seconds=10&requests=1", headers=ADMIN)
+        while SamplingProfiler._session is None or SamplingProfiler._session.result.done():
+            time.sleep(0.01)
+        # One profile at a time
+        assert client.post("/admin/profile?seconds=0.1", headers=ADMIN).status_code == 409
+
+        # Unmarked requests aren't profiled
+        client.post("/analyze/sentiment", json={"text": "Requête non profilée"})
+        assert SamplingProfiler._session.sample_count == 0
+        marked = client.post("/analyze/sentiment", json={"text": "Requête profilée"}, headers={"X-Profile": "1"})
+        assert marked.status_code == 200
+        response = profile.result(timeout=10)
+
+    assert response.status_code == 200
+    assert response.headers["X-Profile-Requests"] == "1"
+    assert "slow_model (src/tests/test_profiler.py:" in response.text
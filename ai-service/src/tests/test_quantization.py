@@ -0,0 +1,29 @@
+
+import pytest
+from ..utils.quantization import quantize_dynamic_int8, model_memory_mb, load_labelled_sample
+
+torch = pytest.importorskip("torch")
+
+def _tiny_model():
+    return torch.nn.Sequential(torch.nn.Linear(256, 256), torch.nn.ReLU(), torch.nn.Linear(256, 3))
+
+def test_quantization_shrinks_linear_weights():
+    model = _tiny_model()
+    quantized = quantize_dynamic_int8(model)
+    fp32_mb, int8_mb = model_memory_mb(model), model_memory_mb(quantized)
+    # int8 weights take a quarter of the fp32 ones (biases stay fp32)
+    assert fp32_mb / 5 < int8_mb < fp32_mb / 2
+
+def test_quantized_model_stays_close_to_fp32():
+    torch.manual_seed(0)
+    model = _tiny_model().eval()
+    quantized = quantize_dynamic_int8(model)
+    inputs = torch.randn(4, 256)
+    fp32 = torch.softmax(model(inputs), dim=-1)
+    int8 = torch.softmax(quantized(inputs), dim=-1)
+    assert torch.allclose(fp32, int8, atol=0.05)
+
+def test_labelled_sample_is_bundled():
+    sample = load_labelled_sample()
+    assert len(sample) > 20
+    assert {item["sentiment"] for item in sample} == {"POSITIVE", "NEGATIVE", "NEUTRAL"}
@@ -0,0 +1,59 @@
+
+from ..utils.result_store import SQLiteResultStore
+
+def _store(tmp_path, **kwargs):
+    options = {"max_size_mb": 10, "ttl_seconds": 3600}
+    options.update(kwargs)
+    return SQLiteResultStore(str(tmp_path / "results.sqlite3"), **options)
+
+def test_results_survive_reopening(tmp_path):
+    _store(tmp_path).set_many("sentiment", {"k1": {"sentiment": "POSITIVE"}})
+
+    # A new instance (another worker, or after a restart) sees the same data
+    assert _store(tmp_path).get_many(["k1", "k2"]) == {"k1": {"sentiment": "POSITIVE"}}
+
+def test_expired_results_are_ignored(tmp_path):
+    store = _store(tmp_path, ttl_seconds=-1)
+    store.set_many("sentiment", {"k1": {"sentiment": "POSITIVE"}})
+    assert store.get_many(["k1"]) == {}
+
+def test_size_based_eviction(tmp_path):
+    store = _store(tmp_path, max_size_mb=0.05)
+    for i in range(200):
+        store.set_many("keywords", {f"k{i}": {"text": "x" * 1000}})
+
+    assert store.size_bytes() <= store.max_size_bytes + 8192
+    assert store.evictions > 0
+    # Most recent entries are kept
+    assert "k199" in store.get_many(["k199"])
+
+def test_purging_expired_entries_spares_live_ones(tmp_path):
+    store = _store(tmp_path)
+    for i in range(30):
+        store.set_many("keywords", {f"old{i}": {"text": "x" * 1000}})
+    store._connect().execute("UPDATE results SET created_at = created_at - 7200")
+    store.set_many("keywords", {"live": {"text": "x" * 1000}})
+
+    store.max_size_bytes = store.size_bytes() - 1
+    store.evict()
+    # Dropping the expired entries was enough: the live one stays
+    assert store.evictions == 0
+    assert "live" in store.get_many(["live"])
+
+def test_reads_only_refresh_stale_access_times(tmp_path):
+    store = _store(tmp_path)
+    store.set_many("sentiment", {"fresh": 1, "stale": 2})
+    conn = store._connect()
+    conn.execute("UPDATE results SET accessed_at = accessed_at - 3600 WHERE key = 'stale'")
+    before = dict(conn.execute("SELECT key, accessed_at FROM results").fetchall())
+
+    assert store.get_many(["fresh", "stale"]) == {"fresh": 1, "stale": 2}
+    after = dict(conn.execute("SELECT key, accessed_at FROM results").fetchall())
+    assert after["fresh"] == before["fresh"]
+    assert after["stale"] > before["stale"]
+
+def test_recent_entries_for_warmup(tmp_path):
+    store = _store(tmp_path)
+    store.set_many("sentiment", {"a": 1})
+    store.set_many("emotions", {"b": 2})
+    assert store.recent("sentiment", limit=10) == [("a", 1)]
@@ -0,0 +1,167 @@
+import asyncio
+import threading
+import time
+import pytest
+from ..utils.batching import MicroBatcher
+from ..utils.deadlines import RequestBudget, current_request
+from ..utils.exceptions import RequestAbandonedException, ServiceOverloadedException, TooManyRequestsException
+from ..utils.scheduler import BULK, INTERACTIVE, InferenceScheduler, LaneConfig
+
+def test_per_model_limit_serializes_jobs():
+    scheduler = InferenceScheduler(slots=4, limits={"model": 1}, deadline_ms=10000)
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def job(i):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.01)
+        with lock:
+            active[0] -= 1
+        return i
+
+    futures = [scheduler.submit("model", job, i) for i in range(5)]
+    assert [f.result(timeout=5) for f in futures] == [0, 1, 2, 3, 4]
+    assert peak[0] == 1
+
+def test_other_models_overtake_a_busy_model():
+    scheduler = InferenceScheduler(slots=2, limits={"slow": 1}, deadline_ms=10000)
+    release = threading.Event()
+    order = []
+
+    scheduler.submit("slow", release.wait, 5)
+    blocked = scheduler.submit("slow", order.append, "slow")
+    fast = scheduler.submit("fast", order.append, "fast")
+
+    fast.result(timeout=5)
+    assert order == ["fast"]
+    release.set()
+    blocked.result(timeout=5)
+    assert order == ["fast", "slow"]
+
+def test_full_queue_is_rejected_with_503():
+    scheduler = InferenceScheduler(slots=1, queue_size=1, deadline_ms=10000)
+    release = threading.Event()
+    scheduler.submit("model", release.wait, 5)
+    time.sleep(0.05)
+    scheduler.submit("model", lambda: None)
+
+    with pytest.raises(ServiceOverloadedException) as exc:
+        scheduler.submit("model", lambda: None)
+    assert exc.value.status_code == 503
+    assert "Retry-After" in exc.value.headers
+    release.set()
+
+def test_deadline_rejects_with_429_and_retry_after():
+    scheduler = InferenceScheduler(slots=1, deadline_ms=100)
+    scheduler.submit("model", time.sleep, 0.05).result(timeout=5)
+
+    # One job takes ~50 ms: 10 batches ahead can't be served within 100 ms
+    scheduler.check_admission("model", 1)
+    with pytest.raises(TooManyRequestsException) as exc:
+        scheduler.check_admission("model", 10)
+    assert exc.value.status_code == 429
+    assert int(exc.value.headers["Retry-After"]) >= 1
+    assert scheduler.stats()["rejected"] == 1
+
+def test_jobs_expired_in_queue_are_not_run():
+    scheduler = InferenceScheduler(slots=1, deadline_ms=50)
+    ran = []
+    scheduler.submit("model", time.sleep, 0.1)
+    expired = scheduler.submit("model", ran.append, 1)
+
+    with pytest.raises(ServiceOverloadedException):
+        expired.result(timeout=5)
+    assert ran == []
+    assert scheduler.stats()["expired"] == 1
+
+def test_jobs_of_abandoned_requests_are_not_run():
+    scheduler = InferenceScheduler(slots=1)
+    ran = []
+    budget = RequestBudget()
+    token = current_request.set(budget)
+    try:
+        scheduler.submit("model", time.sleep, 0.1)
+        abandoned = scheduler.submit("model", ran.append, 1)
+    finally:
+        current_request.reset(token)
+    budget.disconnected = True
+
+    with pytest.raises(RequestAbandonedException):
+        abandoned.result(timeout=5)
+    assert ran == []
+
+def test_batcher_runs_on_scheduler_and_rejects_backlog():
+    scheduler = InferenceScheduler(slots=1, deadline_ms=100)
+    batcher = MicroBatcher(
+        "model", lambda items: [i * 2 for i in items], max_batch_size=2, max_wait_ms=1, scheduler=scheduler
+    )
+
+    assert asyncio.run(batcher.submit_many([1, 2, 3])) == [2, 4, 6]
+
+    scheduler._durations["model"] = 0.05
+    with pytest.raises(TooManyRequestsException):
+        asyncio.run(batcher.submit_many(list(range(10))))
+
+def test_weights_share_slots_between_lanes():
+    scheduler = InferenceScheduler(slots=1, deadline_ms=10000, lanes={
+        INTERACTIVE: LaneConfig(weight=4), BULK: LaneConfig(weight=1),
+    })
+    release = threading.Event()
+    order = []
+    scheduler.submit("blocker", release.wait, 5, lane=INTERACTIVE)
+    time.sleep(0.05)
+    futures = [scheduler.submit("model", order.append, BULK, lane=BULK) for _ in range(3)]
+    futures += [scheduler.submit("model", order.append, INTERACTIVE, lane=INTERACTIVE) for _ in range(8)]
+    release.set()
+    for future in futures:
+        future.result(timeout=5)
+
+    # Interactive gets 4 slots for every bulk one (bulk goes first: the blocker was
+    # interactive), and bulk isn't starved
+    assert order == [BULK] + [INTERACTIVE] * 4 + [BULK] + [INTERACTIVE] * 4 + [BULK]
+
+def test_bulk_chunks_yield_to_interactive_work():
+    scheduler = InferenceScheduler(slots=1, deadline_ms=10000)
+    order = []
+    first_chunk = threading.Event()
+
+    def process(items):
+        order.append(list(items))
+        first_chunk.set()
+        time.sleep(0.05)
+        return items
+
+    bulk = scheduler.submit_batch("model", process, list(range(6)), lane=BULK, chunk_size=2)
+    first_chunk.wait(5)
+    interactive = scheduler.submit_batch("model", process, ["urgent"], lane=INTERACTIVE)
+
+    assert interactive.result(timeout=5) == ["urgent"]
+    assert bulk.result(timeout=5) == list(range(6))
+    assert order == [[0, 1], ["urgent"], [2, 3], [4, 5]]
+    assert scheduler.stats()["lanes"][BULK]["preempted"] == 1
+
+def test_priority_header_selects_the_bulk_batcher(monkeypatch):
+    from fastapi.testclient import TestClient
+    from ..api.app import create_app
+    from ..api.dependencies import get_sentiment_batcher
+
+    lanes = []
+    batchers = get_sentiment_batcher().batchers
+    for lane, batcher in batchers.items():
+        monkeypatch.setattr(batcher, "submit", lambda text, lane=lane: _record(lanes, lane))
+
+    client = TestClient(create_app())
+    client.post("/analyze/sentiment", json={"text": "Bon produit"})
+    client.post("/analyze/sentiment", json={"text": "Bon produit"}, headers={"X-Priority": "bulk"})
+    assert lanes == [INTERACTIVE, BULK]
+
+async def _record(lanes, lane):
+    lanes.append(lane)
+    return {
+        "sentiment": "POSITIVE",
+        "confidence": 1.0,
+        "scores": {"positive": 1.0, "negative": 0.0, "neutral": 0.0},
+        "processing_time_ms": 0.0,
+    }
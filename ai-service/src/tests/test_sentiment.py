@@ -1,6 +1,12 @@
 
+import numpy as np
 import pytest
+from ..config.settings import settings
+from ..models.fast_sentiment import FastSentimentModel
 from ..models.sentiment_analyzer import SentimentAnalyzer
+from ..utils.cache import CacheManager
+from ..utils.quantization import SAMPLE_PATH
+from ..utils.train_fast_sentiment import load_records, train
 
 # Mock the pipeline to avoid downloading models during tests if possible,
 # or use unit tests that don't rely on the heavy model logic.
@@ -22,3 +28,78 @@ def test_map_sentiment_negative(analyzer):
 def test_map_sentiment_neutral(analyzer):
     scores = {"positive": 0.1, "negative": 0.1, "neutral": 0.8}
     assert analyzer._determine_sentiment_label(scores) == "NEUTRAL"
+
+@pytest.fixture
+def fast_model():
+    return FastSentimentModel.load()
+
+def test_lexicon_handles_negations_and_accents(fast_model):
+    [(positive, confidence)] = fast_model.predict(["Service impeccable, très rapide, je recommande !"])
+    assert positive["positive"] > positive["negative"] and confidence > 0.85
+
+    [(negated, _)] = fast_model.predict(["Le produit n'est pas bon"])
+    assert negated["negative"] > negated["positive"]
+
+    assert fast_model.lexicon_masses("tres decu") == fast_model.lexicon_masses("Très déçu")
+
+def test_lexicon_escalates_texts_without_polarity(fast_model):
+    [(scores, confidence)] = fast_model.predict(["Le magasin est ouvert du lundi au samedi."])
+    assert scores["neutral"] == 1.0
+    assert confidence == 0.0
+
+def test_cascade_only_escalates_uncertain_texts(monkeypatch):
+    escalated = []
+
+    def fake_model(texts, batch_size, truncation):
+        escalated.extend(texts)
+        return [[{"label": "3 stars", "score": 0.9}, {"label": "5 stars", "score": 0.1}] for _ in texts]
+
+    monkeypatch.setattr(SentimentAnalyzer, "_model", fake_model)
+    monkeypatch.setattr(SentimentAnalyzer, "_initialized", True)
+    monkeypatch.setattr(settings, "SENTIMENT_CASCADE", True)
+    monkeypatch.setattr(settings, "SENTIMENT_FAST_MODEL_PATH", "")
+    monkeypatch.setattr(SentimentAnalyzer, "_fast_model", None)
+    CacheManager().clear()
+
+    results = SentimentAnalyzer().analyze_batch([
+        "Nul, à éviter absolument.",
+        "La réunion avec le fournisseur aura lieu jeudi.",
+    ])
+
+    assert results[0]["stage"] == "lexicon" and results[0]["sentiment"] == "NEGATIVE"
+    assert results[1]["stage"] == "transformer" and results[1]["sentiment"] == "NEUTRAL"
+    assert escalated == ["La réunion avec le fournisseur aura lieu jeudi."]
+
+def test_texts_answered_by_the_fast_stage_stay_out_of_the_dedup_index(monkeypatch):
+    from ..utils import dedup
+
+    monkeypatch.setattr(SentimentAnalyzer, "_model", lambda texts, batch_size, truncation: [
+        [{"label": "3 stars", "score": 0.9}, {"label": "5 stars", "score": 0.1}] for _ in texts
+    ])
+    monkeypatch.setattr(SentimentAnalyzer, "_initialized", True)
+    monkeypatch.setattr(settings, "SENTIMENT_CASCADE", True)
+    monkeypatch.setattr(settings, "SENTIMENT_FAST_MODEL_PATH", "")
+    monkeypatch.setattr(SentimentAnalyzer, "_fast_model", None)
+    monkeypatch.setattr(settings, "DEDUP_ENABLED", True)
+    monkeypatch.setattr(dedup, "_index", dedup.NearDuplicateIndex())
+    CacheManager().clear()
+
+    results = SentimentAnalyzer().analyze_batch([
+        "Nul, à éviter absolument, produit horrible et service client nul.",
+        "La réunion avec le fournisseur aura lieu jeudi prochain à Lyon.",
+    ])
+
+    assert [r["stage"] for r in results] == ["lexicon", "transformer"]
+    assert dedup.get_dedup_index().stats()["clusters"] == 1
+
+def test_trained_linear_stage_roundtrip(tmp_path):
+    records = load_records(SAMPLE_PATH)
+    texts = [record["text"] for record in records]
+    weights = train(texts, [record["sentiment"] for record in records])
+    path = tmp_path / "fast.npz"
+    np.savez_compressed(path, **weights)
+
+    model = FastSentimentModel.load(str(path))
+    assert model.stage == "linear"
+    predictions = model.predict(texts)
+    assert all(abs(sum(scores.values()) - 1.0) < 1e-3 for scores, _ in predictions)
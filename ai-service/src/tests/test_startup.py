@@ -0,0 +1,70 @@
+import os
+import subprocess
+import sys
+from fastapi.testclient import TestClient
+from ..api.app import create_app
+from ..config.settings import settings
+from ..models import model_state
+from ..models.warmup import PENDING, start_warm_up, warm_up_models, warmup_batches, warmup_lengths
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def test_importing_the_app_does_not_load_ml_stacks():
+    code = (
+        "import sys, src.main; "
+        "print(','.join(m for m in ('torch', 'transformers', 'spacy', 'sklearn', 'yake', 'langdetect') "
+        "if m in sys.modules))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=SERVICE_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    # The last line lists the loaded ML stacks; app start-up logs come before it
+    assert output.splitlines()[-1] == ""
+
+def test_only_enabled_analyzers_are_mounted(monkeypatch):
+    monkeypatch.setattr(settings, "ENABLED_ANALYZERS", "language")
+    paths = {route.path for route in create_app().routes}
+
+    assert "/detect/language" in paths
+    assert "/health" in paths
+    assert "/analyze/sentiment" not in paths
+    assert "/analyze/full" not in paths
+    assert "/analyze/stream" not in paths
+
+def test_stream_rejects_disabled_tasks(monkeypatch):
+    monkeypatch.setattr(settings, "ENABLED_ANALYZERS", "sentiment")
+    client = TestClient(create_app())
+    response = client.post("/analyze/stream?tasks=sentiment,emotions", content=b"")
+    assert response.status_code == 400
+
+def test_warm_up_falls_back_to_the_bundled_sample_without_text(monkeypatch, tmp_path):
+    samples = tmp_path / "samples.txt"
+    samples.write_text("\n  \n", encoding="utf-8")
+    monkeypatch.setattr(settings, "WARMUP_SAMPLES_PATH", str(samples))
+
+    batches = warmup_batches()
+    assert len(batches) == 1 + len(warmup_lengths())
+    assert all(text for batch in batches for text in batch)
+
+def test_ready_waits_for_models_to_be_warmed_up(monkeypatch):
+    monkeypatch.setattr(model_state, "models_progress", {})
+    monkeypatch.setattr(settings, "ENABLED_ANALYZERS", "language")
+    client = TestClient(create_app())
+
+    model_state.set_model_progress("language", PENDING)
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["progress"]["language"]["state"] == "pending"
+
+    warm_up_models(["language"])
+    response = client.get("/ready")
+    assert response.status_code == 200
+    progress = response.json()["progress"]["language"]
+    assert progress["state"] == "ready"
+    assert progress["batches_done"] == progress["batches_total"] == 1 + len(warmup_lengths())
+
+def test_preload_warms_up_in_the_background(monkeypatch):
+    monkeypatch.setattr(model_state, "models_progress", {})
+    monkeypatch.setattr(settings, "ENABLED_ANALYZERS", "language")
+    start_warm_up().join(timeout=60)
+    assert model_state.models_ready()
@@ -0,0 +1,68 @@
+import asyncio
+import json
+import pytest
+from fastapi.testclient import TestClient
+from ..api.app import create_app
+from ..api.routes.stream import ndjson_lines
+from ..config.settings import settings
+from ..models.sentiment_analyzer import SentimentAnalyzer
+from ..models.emotion_detector import EmotionDetector
+from ..utils.cache import CacheManager
+
+@pytest.fixture
+def client(monkeypatch):
+    def fake_sentiment(texts, batch_size, truncation):
+        return [[{"label": "5 stars", "score": 0.9}, {"label": "1 star", "score": 0.1}] for _ in texts]
+
+    def fake_emotions(texts, batch_size, truncation):
+        return [[{"label": "joy", "score": 0.8}, {"label": "anger", "score": 0.2}] for _ in texts]
+
+    monkeypatch.setattr(SentimentAnalyzer, "_model", fake_sentiment)
+    monkeypatch.setattr(SentimentAnalyzer, "_initialized", True)
+    monkeypatch.setattr(EmotionDetector, "_model", fake_emotions)
+    monkeypatch.setattr(EmotionDetector, "_initialized", True)
+    CacheManager().clear()
+    return TestClient(create_app())
+
+def _lines(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+def test_ndjson_lines_bounds_line_length():
+    async def chunks():
+        for chunk in [b'{"a": 1}\n{"b"', b': 2}\n', b"x" * 50, b"x" * 50 + b"\n", b'{"c": 3}']:
+            yield chunk
+
+    async def collect():
+        return [line async for line in ndjson_lines(chunks(), max_line_bytes=64)]
+
+    assert asyncio.run(collect()) == [b'{"a": 1}', b'{"b": 2}', None, b'{"c": 3}']
+
+def test_stream_returns_one_result_per_record(client, monkeypatch):
+    # A window smaller than the input exercises the backpressure path
+    monkeypatch.setattr(settings, "STREAM_MAX_IN_FLIGHT", 4)
+    records = [{"id": i, "text": f"Super produit numéro {i}"} for i in range(20)]
+    body = "\n".join(json.dumps(r) for r in records) + "\n"
+
+    response = client.post(
+        "/analyze/stream?tasks=sentiment,emotions,language", content=body.encode("utf-8")
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    results = _lines(response)
+    assert sorted(r["id"] for r in results) == list(range(20))
+    assert all(r["sentiment"]["sentiment"] == "POSITIVE" for r in results)
+    assert all(r["emotions"]["dominant_emotion"] == "joy" for r in results)
+    assert all("language" in r for r in results)
+
+def test_stream_reports_invalid_records_without_failing(client):
+    body = b'{"id": "ok", "text": "Bon service"}\nnot json\n{"id": "empty", "text": ""}\n'
+    results = {r["id"]: r for r in _lines(client.post("/analyze/stream?tasks=sentiment", content=body))}
+
+    assert results["ok"]["sentiment"]["sentiment"] == "POSITIVE"
+    assert "emotions" not in results["ok"]
+    assert "error" in results["empty"]
+    assert "error" in results[None]
+
+def test_stream_rejects_unknown_tasks(client):
+    assert client.post("/analyze/stream?tasks=topics", content=b"").status_code == 422
@@ -0,0 +1,91 @@
+
+import pytest
+from fastapi.testclient import TestClient
+from ..api.app import create_app
+from ..config.settings import settings
+from ..models.topic_tracker import BrandTopics, TopicTracker
+from ..utils.topic_store import SQLiteTopicStore
+
+def _phrases(*items):
+    return [set(item) for item in items]
+
+def test_heavy_hitters_survive_eviction():
+    topics = BrandTopics(capacity=3, half_life_seconds=0)
+    for i in range(50):
+        topics.update(_phrases({"battery life", f"noise {i}"}, {"battery life"}, {"customer service"}), now=0)
+
+    assert len(topics.counts) <= 3
+    top = topics.top(2, min_count=2, max_doc_ratio=1.0, now=0)
+    assert [t["label"] for t in top] == ["Battery Life", "Customer Service"]
+    assert top[0]["text_count"] == 100
+
+def test_old_mentions_decay():
+    topics = BrandTopics(capacity=10, half_life_seconds=3600)
+    topics.update(_phrases({"old topic"}, {"old topic"}, {"old topic"}, {"old topic"}), now=0)
+    topics.update(_phrases({"new topic"}, {"new topic"}, {"new topic"}), now=7200)
+
+    top = topics.top(2, min_count=0.5, max_doc_ratio=1.0, now=7200)
+    assert [t["label"] for t in top] == ["New Topic", "Old Topic"]
+    assert top[1]["text_count"] == 1
+
+def test_phrases_in_every_mention_are_not_topics():
+    topics = BrandTopics(capacity=10, half_life_seconds=0)
+    topics.update(_phrases({"acme phone", "screen"}, {"acme phone", "screen"}, {"acme phone"}), now=0)
+    assert [t["label"] for t in topics.top(5, min_count=2, max_doc_ratio=0.95, now=0)] == ["Screen"]
+
+@pytest.fixture
+def topic_store(tmp_path, monkeypatch):
+    path = str(tmp_path / "topics.sqlite3")
+    monkeypatch.setattr(settings, "TOPIC_STORE_PATH", path)
+    monkeypatch.setattr(TopicTracker, "_store", SQLiteTopicStore(path, max_brands=settings.TOPIC_MAX_BRANDS))
+    monkeypatch.setattr(TopicTracker, "_store_initialized", True)
+    yield path
+    TopicTracker()._brands.clear()
+    TopicTracker()._versions.clear()
+
+def test_brand_topics_endpoints(topic_store):
+    client = TestClient(create_app())
+    texts = [
+        "The battery life is terrible on this phone",
+        "Battery life could be better, screen is great",
+        "Great screen but the battery life is short",
+        "Delivery was fast",
+    ]
+    response = client.post("/topics/acme", json={"texts": texts})
+    assert response.status_code == 200
+    assert response.json()["documents"] == 4
+
+    response = client.get("/topics/acme", params={"num_topics": 3})
+    assert response.status_code == 200
+    assert response.json()["topics"][0]["label"] == "Battery Life"
+
+    assert client.delete("/topics/acme").status_code == 204
+    assert client.get("/topics/acme").status_code == 404
+    TopicTracker()._brands.clear()
+
+def test_brand_tables_are_shared_by_workers_and_survive_restarts(topic_store):
+    tracker = TopicTracker()
+    tracker.update("acme", ["The battery life is terrible", "Battery life could be better"])
+
+    # A restarted worker starts with nothing in memory
+    tracker._brands.clear()
+    tracker._versions.clear()
+    assert tracker.topics("acme")["documents"] == 2
+
+    # Another worker folds mentions in through the same file
+    def apply(version, load):
+        topics = BrandTopics.from_state(load())
+        topics.update(_phrases({"customer service"}, {"customer service"}, {"customer service"}))
+        return topics.to_state()
+
+    SQLiteTopicStore(topic_store, max_brands=10).update("acme", apply)
+    result = tracker.topics("acme")
+    assert result["documents"] == 5
+    assert result["topics"][0]["label"] == "Customer Service"
+
+def test_brand_routes_need_a_shared_store_with_several_workers(monkeypatch):
+    monkeypatch.setattr(settings, "TOPIC_STORE_PATH", "")
+    monkeypatch.setattr(settings, "WORKERS", 2)
+    paths = {route.path for route in create_app().routes}
+    assert "/analyze/topics" in paths
+    assert "/topics/{brand}" not in paths
@@ -0,0 +1,64 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from ..api.app import create_app
+from ..config.settings import settings
+from ..models.sentiment_analyzer import SentimentAnalyzer
+from ..utils.batching import MicroBatcher
+from ..utils.metrics import stage
+from ..utils.tracing import RequestTrace, current_trace
+
+def test_batch_stages_and_queue_wait_go_to_each_request_trace():
+    def process(items):
+        with stage("forward"):
+            return list(items)
+
+    batcher = MicroBatcher("test", process, max_batch_size=8, max_wait_ms=10)
+    traces = [RequestTrace(), RequestTrace()]
+
+    async def submit(item, trace):
+        current_trace.set(trace)
+        return await batcher.submit(item)
+
+    async def run():
+        return await asyncio.gather(*(submit(i, trace) for i, trace in enumerate(traces)))
+
+    assert asyncio.run(run()) == [0, 1]
+    for trace in traces:
+        assert set(trace.spans) == {"test.queue", "test.forward"}
+        # Both items waited for the batch window
+        assert trace.spans["test.queue"] >= 0.005
+
+@pytest.fixture
+def fake_sentiment(monkeypatch):
+    def fake_model(texts, batch_size, truncation):
+        return [[{"label": "5 stars", "score": 0.9}, {"label": "1 star", "score": 0.1}] for _ in texts]
+
+    monkeypatch.setattr(SentimentAnalyzer, "_model", fake_model)
+    monkeypatch.setattr(SentimentAnalyzer, "_model_name", "tracing-test")
+    monkeypatch.setattr(SentimentAnalyzer, "_initialized", True)
+    monkeypatch.setattr(settings, "SENTIMENT_CASCADE", False)
+
+def test_server_timing_header_breaks_the_request_down(fake_sentiment, monkeypatch):
+    monkeypatch.setattr(settings, "SERVER_TIMING_IN_BODY", False)
+    response = TestClient(create_app()).post("/analyze/sentiment", json={"text": "Livraison <b>rapide</b>"})
+
+    assert response.status_code == 200
+    spans = [entry.split(";dur=")[0] for entry in response.headers["Server-Timing"].split(", ")]
+    for name in ("validate", "preprocess", "sentiment.queue", "endpoint", "serialize", "total"):
+        assert name in spans
+    assert "server_timing" not in response.json()
+
+def test_server_timing_can_be_added_to_the_body(fake_sentiment, monkeypatch):
+    monkeypatch.setattr(settings, "SERVER_TIMING_IN_BODY", True)
+    response = TestClient(create_app()).post("/analyze/sentiment", json={"text": "Emballage soigné"})
+
+    timings = response.json()["server_timing"]
+    assert timings["total"] >= timings["validate"]
+    assert int(response.headers["content-length"]) == len(response.content)
+
+def test_server_timing_can_be_disabled(fake_sentiment, monkeypatch):
+    monkeypatch.setattr(settings, "SERVER_TIMING", False)
+    response = TestClient(create_app()).post("/analyze/sentiment", json={"text": "Produit conforme"})
+    assert response.status_code == 200
+    assert "Server-Timing" not in response.headers
@@ -1,4 +1,4 @@
 
 from .preprocessing import TextPreprocessor
-from .cache import simple_memory_cache
+from .cache import CacheManager, TTLCache, make_cache_key
 from .exceptions import AnalysisException, ModelLoadException
@@ -0,0 +1,327 @@
+
+import asyncio
+import copy
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+import structlog
+from .deadlines import CANCELLED, RequestBudget, count_abandoned, current_request
+from .exceptions import RequestAbandonedException
+from .metrics import BATCH_SIZE, collect_stages
+from .scheduler import INTERACTIVE, InferenceScheduler, current_lane
+from .tracing import RequestTrace, current_trace
+
+logger = structlog.get_logger()
+
+class _Waiter:
+    """A caller waiting for an item, with the budget and trace of its request."""
+
+    __slots__ = ("future", "budget", "trace", "enqueued_at")
+
+    def __init__(self, future: asyncio.Future):
+        self.future = future
+        self.budget: Optional[RequestBudget] = current_request.get()
+        self.trace: Optional[RequestTrace] = current_trace.get()
+        self.enqueued_at = time.perf_counter()
+
+class _BatchTiming:
+    """When a traced batch got its slot, and its inference stage totals."""
+
+    __slots__ = ("started", "stages")
+
+    def __init__(self):
+        self.started: Optional[float] = None
+        self.stages: Dict[str, float] = {}
+
+# Result placeholder of the items nobody waited for anymore when their turn came
+_DROPPED = object()
+
+class MicroBatcher:
+    """
+    Request-coalescing batcher.
+
+    Concurrent callers submit single items; items are collected for up to
+    `max_wait_ms` (or until `max_batch_size` items are pending) and handed to
+    `process_batch` in one call. Results are fanned back to the waiting callers
+    in submission order.
+
+    Batches are executed one at a time, so the wrapped model is never called
+    concurrently. Items arriving while a batch is running are flushed as soon as it
+    completes (continuous batching). With a `scheduler`, batches run on its inference
+    slots and new items are rejected (429/503) when the backlog can't be served
+    before the deadline; otherwise they run on a dedicated thread.
+
+    With a `key` function, an item whose key is already pending or running joins
+    that item instead of being queued again: it takes no batch slot and gets a
+    copy of the same result.
+
+    A batcher serves one priority `lane` of the scheduler. With a `chunk_size`,
+    its batches run chunk by chunk and yield their slot to higher-priority work
+    in between (bulk lane).
+
+    Items whose callers all went away (request expired or disconnected, or caller
+    cancelled) are dropped when their batch is flushed and again before each chunk
+    runs, so no inference is spent on results nobody will read.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        process_batch: Callable[[List[Any]], List[Any]],
+        max_batch_size: int,
+        max_wait_ms: float,
+        scheduler: Optional[InferenceScheduler] = None,
+        key: Optional[Callable[[Any], Hashable]] = None,
+        lane: str = INTERACTIVE,
+        chunk_size: int = 0,
+    ):
+        self.name = name
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.scheduler = scheduler
+        self.key = key
+        self.lane = lane
+        self.chunk_size = max(0, chunk_size)
+        self._executor = None if scheduler else ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=f"batcher-{name}"
+        )
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # One entry per distinct item: the futures of all the callers waiting for it
+        self._pending: List[Tuple[Any, List[_Waiter]]] = []
+        self._in_flight: Dict[Hashable, List[_Waiter]] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running = False
+        self.shared = 0  # Items that joined an identical pending or running item
+
+    def _bind(self, loop: asyncio.AbstractEventLoop):
+        # State is tied to one event loop (one per uvicorn worker). If the loop changes
+        # (e.g. test clients), anything pending belonged to a dead loop and is dropped.
+        if self._loop is not loop:
+            self._loop = loop
+            self._pending = []
+            self._in_flight = {}
+            self._timer = None
+            self._running = False
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def _admit(self, count: int):
+        # Rejects before queueing when the backlog (pending items plus the running
+        # batch) can't be served before the scheduler's deadline
+        if self.scheduler is not None:
+            # Chunked batches are scheduled (and timed) chunk by chunk
+            job_size = min(self.chunk_size or self.max_batch_size, self.max_batch_size)
+            batches_ahead = math.ceil((len(self._pending) + count) / job_size) + int(self._running)
+            self.scheduler.check_admission(self.name, batches_ahead, lane=self.lane)
+
+    def _new_items(self, items: List[Any]) -> int:
+        """How many of `items` would be queued rather than joined to an identical one."""
+        if self.key is None:
+            return len(items)
+        return len({self.key(item) for item in items} - self._in_flight.keys())
+
+    def _enqueue(self, loop: asyncio.AbstractEventLoop, item: Any) -> asyncio.Future:
+        future = loop.create_future()
+        waiter = _Waiter(future)
+        if self.key is not None:
+            key = self.key(item)
+            waiters = self._in_flight.get(key)
+            if waiters is not None:
+                waiters.append(waiter)
+                self.shared += 1
+                return future
+            waiters = self._in_flight[key] = [waiter]
+        else:
+            waiters = [waiter]
+        self._pending.append((item, waiters))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None and not self._running:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return future
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its result."""
+        loop = asyncio.get_running_loop()
+        self._bind(loop)
+        self._admit(self._new_items([item]))
+        return await self._enqueue(loop, item)
+
+    async def submit_many(self, items: List[Any]) -> List[Any]:
+        """Queue several items; they are coalesced with any other pending work."""
+        loop = asyncio.get_running_loop()
+        self._bind(loop)
+        # All or nothing: a rejected request doesn't leave part of its items queued
+        self._admit(self._new_items(items))
+        futures = [self._enqueue(loop, item) for item in items]
+        return list(await asyncio.gather(*futures))
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._running or not self._pending:
+            return
+
+        batch = self._pending[:self.max_batch_size]
+        del self._pending[:self.max_batch_size]
+
+        # Items whose callers all gave up don't need inference
+        live = []
+        for item, waiters in batch:
+            if self._settle(waiters):
+                live.append((item, waiters))
+            else:
+                self._drop(item, waiters)
+        batch = live
+        if not batch:
+            self._flush()
+            return
+
+        self._running = True
+        self._loop.create_task(self._run(batch))
+
+    @staticmethod
+    def _waiting(waiters: List[_Waiter]) -> bool:
+        """Whether a caller still waits for the item (safe to call from the slot threads)."""
+        return any(
+            not waiter.future.done() and (waiter.budget is None or not waiter.budget.abandoned())
+            for waiter in waiters
+        )
+
+    def _settle(self, waiters: List[_Waiter]) -> bool:
+        """Fails the callers whose request was abandoned. True if a caller still waits."""
+        waiting = False
+        for waiter in waiters:
+            if waiter.future.done():
+                continue
+            reason = waiter.budget.abandoned() if waiter.budget is not None else None
+            if reason:
+                waiter.future.set_exception(RequestAbandonedException(reason))
+                count_abandoned(self.name, reason)
+            else:
+                waiting = True
+        return waiting
+
+    def _drop(self, item: Any, waiters: List[_Waiter]):
+        count_abandoned(self.name, CANCELLED, sum(waiter.future.cancelled() for waiter in waiters))
+        self._forget(item, waiters)
+
+    def _forget(self, item: Any, waiters: List[_Waiter]):
+        # Once an item has completed, an identical one starts a new computation
+        if self.key is not None and self._in_flight.get(self.key(item)) is waiters:
+            del self._in_flight[self.key(item)]
+
+    def _process_live(
+        self, batch: List[Tuple[Any, List[_Waiter]]], timing: Optional[_BatchTiming] = None
+    ) -> List[Any]:
+        # Runs on the slot, right before inference: callers may have gone away since
+        # the flush (or since the previous chunk of a long bulk batch)
+        live = [index for index, (_, waiters) in enumerate(batch) if self._waiting(waiters)]
+        results: List[Any] = [_DROPPED] * len(batch)
+        if live:
+            live_items = [batch[index][0] for index in live]
+            if timing is None:
+                computed = self.process_batch(live_items)
+            else:
+                if timing.started is None:
+                    timing.started = time.perf_counter()
+                with collect_stages() as stages:
+                    computed = self.process_batch(live_items)
+                for stage_name, seconds in stages.items():
+                    timing.stages[stage_name] = timing.stages.get(stage_name, 0.0) + seconds
+            if len(computed) != len(live):
+                raise RuntimeError(
+                    f"Batcher '{self.name}' got {len(computed)} results for {len(live)} items"
+                )
+            for index, result in zip(live, computed):
+                results[index] = result
+        return results
+
+    def _record_timing(self, waiters: List[_Waiter], timing: _BatchTiming):
+        for waiter in waiters:
+            if waiter.trace is not None and timing.started is not None:
+                waiter.trace.add(f"{self.name}.queue", max(0.0, timing.started - waiter.enqueued_at))
+                waiter.trace.add_stages(self.name, timing.stages)
+
+    async def _run(self, batch: List[Tuple[Any, List[_Waiter]]]):
+        # The flush ran in some caller's context: the batch must not inherit its
+        # budget or trace (each waiter has its own)
+        current_request.set(None)
+        current_trace.set(None)
+        items = [item for item, _ in batch]
+        BATCH_SIZE.labels(self.name, self.lane).observe(len(items))
+        traced = any(waiter.trace is not None for _, waiters in batch for waiter in waiters)
+        timing = _BatchTiming() if traced else None
+        process = partial(self._process_live, timing=timing)
+        try:
+            if self.scheduler is not None:
+                results = await self.scheduler.run_batch(
+                    self.name, process, batch, lane=self.lane, chunk_size=self.chunk_size
+                )
+            else:
+                results = await self._loop.run_in_executor(self._executor, process, batch)
+            if len(results) != len(items):
+                raise RuntimeError(
+                    f"Batcher '{self.name}' got {len(results)} results for {len(items)} items"
+                )
+        except Exception as e:
+            logger.error("Batch processing failed", batcher=self.name, size=len(items), error=str(e))
+            for _, waiters in batch:
+                for waiter in waiters:
+                    if not waiter.future.done():
+                        waiter.future.set_exception(e)
+        else:
+            requeued = []
+            for (item, waiters), result in zip(batch, results):
+                if result is _DROPPED:
+                    if self._settle(waiters):
+                        # A caller joined after the item was dropped on the slot: it
+                        # goes back to the front of the queue instead of being lost
+                        requeued.append((item, waiters))
+                    else:
+                        self._drop(item, waiters)
+                    continue
+                if timing is not None:
+                    self._record_timing(waiters, timing)
+                for index, waiter in enumerate(waiters):
+                    if not waiter.future.done():
+                        # Callers may annotate their result: joined callers get their own copy
+                        waiter.future.set_result(result if index == 0 else copy.deepcopy(result))
+            self._pending[:0] = requeued
+            # Requeued items stay in flight
+            batch = [entry for entry in batch if not any(entry is kept for kept in requeued)]
+        finally:
+            for item, waiters in batch:
+                self._forget(item, waiters)
+            self._running = False
+            if self._pending:
+                self._flush()
+
+class LanedBatcher:
+    """
+    The batchers of one model, one per priority lane. Callers are routed to the
+    batcher of their request's lane (see scheduler.current_lane).
+    """
+
+    def __init__(self, batchers: Dict[str, MicroBatcher]):
+        self.batchers = batchers
+
+    def for_lane(self, lane: Optional[str] = None) -> MicroBatcher:
+        return self.batchers.get(lane or current_lane.get(), self.batchers[INTERACTIVE])
+
+    @property
+    def pending(self) -> int:
+        return sum(batcher.pending for batcher in self.batchers.values())
+
+    async def submit(self, item: Any) -> Any:
+        return await self.for_lane().submit(item)
+
+    async def submit_many(self, items: List[Any]) -> List[Any]:
+        return await self.for_lane().submit_many(items)
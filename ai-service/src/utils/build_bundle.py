@@ -0,0 +1,59 @@
+
+"""
+Builds the pre-converted model bundle loaded with MODEL_BUNDLE_DIR.
+
+    PYTHONPATH=. python -m src.utils.build_bundle [--output DIR] [--quantize]
+
+Each transformer model is written to <output>/<model name> as safetensors weights
+(memory-mapped read-only by the workers, see load_bundled_model), its config and
+its serialized fast tokenizer (tokenizer.json). With --quantize, the ONNX graph and
+its int8 dynamically quantized variant are written alongside: set ONNX_MODEL_DIR
+to the bundle directory to serve them with INFERENCE_BACKEND=onnx.
+"""
+import argparse
+import os
+from ..config.settings import settings
+from ..models.inference_backend import BUNDLE_WEIGHTS_FILE
+from .download_models import get_logger
+
+def build_model_bundle(model_name: str, output_dir: str, quantize: bool = False):
+    from safetensors.torch import save_model
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    logger = get_logger()
+    os.makedirs(output_dir, exist_ok=True)
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=True)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+
+    weights_path = os.path.join(output_dir, BUNDLE_WEIGHTS_FILE)
+    logger.info(f"Writing {model_name} to {weights_path}...")
+    # Contiguous tensors, shared ones stored once: loadable with assign=True as is
+    save_model(model, weights_path, metadata={"format": "pt", "source": model_name})
+    tokenizer.save_pretrained(output_dir)
+    model.config.save_pretrained(output_dir)
+
+    if quantize:
+        from .export_onnx import export_model
+        export_model(model_name, output_dir, quantize=True)
+
+    logger.info(f"Successfully bundled {model_name}")
+
+def build_bundle(output: str, quantize: bool = False):
+    logger = get_logger()
+
+    for model_name in (settings.SENTIMENT_MODEL, settings.EMOTION_MODEL):
+        try:
+            build_model_bundle(model_name, os.path.join(output, model_name.replace("/", "--")), quantize=quantize)
+        except Exception as e:
+            logger.error(f"Failed to bundle {model_name}", error=str(e))
+            raise e
+
+    logger.info("Model bundle built.", path=output)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert the transformer analyzers to a memory-mapped bundle")
+    parser.add_argument("--output", default=settings.MODEL_BUNDLE_DIR or "models/bundle", help="Bundle directory")
+    parser.add_argument("--quantize", action="store_true", help="Also write the ONNX graph and its int8 variant")
+    args = parser.parse_args()
+    build_bundle(args.output, quantize=args.quantize)
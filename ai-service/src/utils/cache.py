@@ -1,17 +1,230 @@
 
-from functools import lru_cache
-from typing import Callable, Any
+import copy
+import hashlib
+import json
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+import structlog
 from ..config.settings import settings
+from .result_store import create_result_store
+from .singleflight import SingleFlight
 
-def simple_memory_cache():
+logger = structlog.get_logger()
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for cache keys (unicode NFC, collapsed whitespace)."""
+    return unicodedata.normalize("NFC", " ".join(text.split()))
+
+def content_hash(text: str) -> str:
+    """Hash of a text's normalized form: what cache keys identify a text by."""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+def make_cache_key(text: str, model: str, **params: Any) -> str:
+    """
+    Content hash of an analysis request: normalized text + model name/version + parameters.
+    Identical texts re-delivered by different sources map to the same key.
+    """
+    return content_cache_key(content_hash(text), model, **params)
+
+def content_cache_key(content: str, model: str, **params: Any) -> str:
+    """Same as make_cache_key, for a text known by its content_hash()."""
+    payload = json.dumps([model, sorted(params.items()), content], default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class TTLCache:
     """
-    Decorator for simple LRU caching in memory.
-    Wraps functools.lru_cache using settings.
+    Bounded LRU cache with a time-to-live per entry. Thread-safe.
+    Values are deep-copied in and out so callers can't mutate cached results.
     """
-    if settings.ENABLE_CACHE:
-        return lru_cache(maxsize=settings.CACHE_SIZE)
-    return lambda func: func
+
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self.maxsize = max(1, maxsize)
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(value)
+
+    def set(self, key: str, value: Any):
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
 
 class CacheManager:
-    """Interface for more complex caching (Redis) in future."""
-    pass
+    """
+    Result caches shared by the analyzers (one named cache per analyzer).
+
+    Two tiers: a per-process TTLCache, backed by an optional on-disk store shared by
+    all workers of the node (RESULT_STORE_ENABLED). Memory misses are looked up in
+    the store before running inference, and fresh results are written to both.
+    With SINGLE_FLIGHT, a miss already being computed by another request is waited
+    for instead of computed again (even with the cache disabled).
+    """
+
+    _instance = None
+    _caches: Dict[str, TTLCache] = {}
+    _flights: Dict[str, SingleFlight] = {}
+    _store = None
+    _store_initialized = False
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(CacheManager, cls).__new__(cls)
+        return cls._instance
+
+    @property
+    def enabled(self) -> bool:
+        return settings.ENABLE_CACHE
+
+    @property
+    def store(self):
+        if not self.__class__._store_initialized:
+            with self.__class__._lock:
+                if not self.__class__._store_initialized:
+                    self.__class__._store = create_result_store()
+                    self.__class__._store_initialized = True
+        return self.__class__._store
+
+    def get_cache(self, name: str) -> TTLCache:
+        with self.__class__._lock:
+            if name not in self.__class__._caches:
+                self.__class__._caches[name] = TTLCache(settings.CACHE_SIZE, settings.CACHE_TTL_SECONDS)
+            return self.__class__._caches[name]
+
+    def get_flight(self, name: str) -> SingleFlight:
+        with self.__class__._lock:
+            if name not in self.__class__._flights:
+                self.__class__._flights[name] = SingleFlight(name)
+            return self.__class__._flights[name]
+
+    def get_or_compute(self, name: str, key: str, compute: Callable[[], Any]) -> Any:
+        """Returns the cached value for `key`, computing and storing it on a miss."""
+        if not self.enabled and not settings.SINGLE_FLIGHT:
+            return compute()
+        return self.get_or_compute_many(name, [key], [None], lambda _: [compute()])[0]
+
+    def get_or_compute_many(
+        self,
+        name: str,
+        keys: List[str],
+        items: List[Any],
+        compute: Callable[[List[Any]], List[Any]],
+    ) -> List[Any]:
+        """
+        Batch variant: only the items whose key is missing from both tiers are passed
+        to `compute` (each distinct key once, and not at all if another caller is
+        already computing it). Results are returned in input order.
+        """
+        if not self.enabled and not settings.SINGLE_FLIGHT:
+            return compute(items)
+
+        cache = self.get_cache(name) if self.enabled else None
+        results: List[Any] = [cache.get(key) if cache is not None else None for key in keys]
+
+        missing: Dict[str, List[int]] = {}
+        for index, (key, result) in enumerate(zip(keys, results)):
+            if result is None:
+                missing.setdefault(key, []).append(index)
+
+        if missing and cache is not None and self.store is not None:
+            for key, value in self.store.get_many(list(missing)).items():
+                cache.set(key, value)
+                for index in missing.pop(key):
+                    results[index] = copy.deepcopy(value)
+
+        def compute_fresh(fresh_keys: List[str]) -> List[Any]:
+            values = compute([items[missing[key][0]] for key in fresh_keys])
+            if cache is not None:
+                for key, value in zip(fresh_keys, values):
+                    cache.set(key, value)
+                if self.store is not None:
+                    self.store.set_many(name, dict(zip(fresh_keys, values)))
+            return values
+
+        if missing:
+            if settings.SINGLE_FLIGHT:
+                computed = self.get_flight(name).run(list(missing), compute_fresh)
+            else:
+                computed = compute_fresh(list(missing))
+            for indexes, value in zip(missing.values(), computed):
+                for index in indexes:
+                    results[index] = copy.deepcopy(value)
+
+        return results
+
+    def warm(self, names: List[str]):
+        """Loads the most recently used stored results into the memory caches."""
+        if not self.enabled or self.store is None:
+            return
+
+        for name in names:
+            cache = self.get_cache(name)
+            entries = self.store.recent(name, limit=cache.maxsize)
+            # Oldest first, so the most recent entries end up most recently used
+            for key, value in reversed(entries):
+                cache.set(key, value)
+            logger.info("Cache warmed from result store", cache=name, entries=len(entries))
+
+    def stats(self) -> Dict[str, Dict]:
+        with self.__class__._lock:
+            return {name: cache.stats() for name, cache in self.__class__._caches.items()}
+
+    def flight_stats(self) -> Dict[str, int]:
+        """Items per cache that waited for an identical in-flight computation."""
+        with self.__class__._lock:
+            return {name: flight.shared for name, flight in self.__class__._flights.items()}
+
+    def store_stats(self) -> Optional[Dict]:
+        return self.store.stats() if self.store is not None else None
+
+    def clear(self):
+        with self.__class__._lock:
+            for cache in self.__class__._caches.values():
+                cache.clear()
@@ -0,0 +1,95 @@
+
+"""
+Agreement and throughput of the sentiment cascade against the transformer alone.
+
+For each confidence threshold, reports the share of texts the fast stage answers,
+how often its answers agree with the transformer's, the agreement and accuracy
+(when the input is labelled) of the whole cascade, and its throughput. The fast
+stage is the one configured by SENTIMENT_FAST_MODEL_PATH (lexicon only if empty).
+
+    PYTHONPATH=. python -m src.utils.cascade_benchmark [--input reviews.jsonl] [--thresholds 0.7,0.8,0.9]
+"""
+import argparse
+import json
+import time
+from typing import Dict, List, Optional
+from ..config.settings import settings
+from .quantization import SAMPLE_PATH
+from .train_fast_sentiment import load_records
+
+def _rate(matches: List[bool]) -> Optional[float]:
+    return round(sum(matches) / len(matches), 4) if matches else None
+
+def benchmark(records: List[Dict], thresholds: List[float]) -> Dict:
+    from ..models.sentiment_analyzer import SentimentAnalyzer
+
+    analyzer = SentimentAnalyzer()
+    analyzer.initialize()
+    fast_model = analyzer.fast_model
+    texts = [record["text"] for record in records]
+    expected = [record.get("sentiment") for record in records]
+    labelled = all(label is not None for label in expected)
+
+    analyzer._analyze_uncached(texts[:1])  # warm-up, so first-call costs don't skew the timing
+    start = time.perf_counter()
+    transformer = [result["sentiment"] for result in analyzer._analyze_uncached(texts)]
+    transformer_seconds = time.perf_counter() - start
+
+    report = {
+        "texts": len(texts),
+        "fast_stage": fast_model.stage,
+        "transformer": {
+            "texts_per_second": round(len(texts) / transformer_seconds, 1),
+            "accuracy": _rate([a == b for a, b in zip(transformer, expected)]) if labelled else None,
+        },
+        "thresholds": [],
+    }
+    for threshold in thresholds:
+        start = time.perf_counter()
+        fast = fast_model.predict(texts)
+        escalated = [i for i, (_, confidence) in enumerate(fast) if confidence < threshold]
+        escalated_results = analyzer._analyze_uncached([texts[i] for i in escalated]) if escalated else []
+        seconds = time.perf_counter() - start
+
+        cascade = [analyzer._determine_sentiment_label(scores) for scores, _ in fast]
+        for i, result in zip(escalated, escalated_results):
+            cascade[i] = result["sentiment"]
+        answered = sorted(set(range(len(texts))) - set(escalated))
+        report["thresholds"].append({
+            "threshold": threshold,
+            "fast_share": round(len(answered) / len(texts), 4),
+            "fast_agreement": _rate([cascade[i] == transformer[i] for i in answered]),
+            "agreement": _rate([a == b for a, b in zip(cascade, transformer)]),
+            "accuracy": _rate([a == b for a, b in zip(cascade, expected)]) if labelled else None,
+            "texts_per_second": round(len(texts) / seconds, 1),
+        })
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Sentiment cascade vs transformer: agreement and throughput")
+    parser.add_argument("--input", default=SAMPLE_PATH, help="JSON list, JSON lines or text lines")
+    parser.add_argument(
+        "--thresholds", default=f"0.6,0.7,0.8,{settings.SENTIMENT_CASCADE_THRESHOLD},0.95",
+        help="Comma-separated confidence thresholds"
+    )
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    thresholds = sorted({float(value) for value in args.thresholds.split(",")})
+    report = benchmark(load_records(args.input), thresholds)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    transformer = report["transformer"]
+    print(f"{report['texts']} texts, fast stage: {report['fast_stage']}")
+    print(f"transformer alone: {transformer['texts_per_second']} texts/s, accuracy {transformer['accuracy']}")
+    print(f"{'threshold':>10}{'fast share':>12}{'fast agree':>12}{'agreement':>11}{'accuracy':>10}{'texts/s':>10}")
+    for row in report["thresholds"]:
+        print(
+            f"{row['threshold']:>10}{row['fast_share']:>12}{str(row['fast_agreement']):>12}"
+            f"{row['agreement']:>11}{str(row['accuracy']):>10}{row['texts_per_second']:>10}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+
+"""
+Token-aware handling of texts longer than a model's input window.
+
+Long texts are split into windows of at most `max_tokens` tokens (cut on token
+boundaries, with an optional overlap). The windows of every text in a batch go
+through the model in one batched call, and the per-window scores are aggregated
+back into one score list per text, in the same `[{"label", "score"}, ...]` shape
+the model returns for a short text.
+"""
+from typing import Callable, Dict, List, Sequence, Tuple
+from .metrics import stage
+
+STRATEGIES = ("weighted_mean", "mean", "head_tail")
+
+# (char_start, char_end, token_count)
+Window = Tuple[int, int, int]
+
+def plan_windows(offsets: Sequence[Tuple[int, int]], window_tokens: int, overlap_tokens: int = 0) -> List[Window]:
+    """Splits a token sequence (given by its char offsets) into windows of `window_tokens` tokens."""
+    if not offsets:
+        return []
+
+    window_tokens = max(1, window_tokens)
+    step = max(1, window_tokens - max(0, overlap_tokens))
+    windows = []
+    start = 0
+    while True:
+        end = min(start + window_tokens, len(offsets))
+        windows.append((offsets[start][0], offsets[end - 1][1], end - start))
+        if end == len(offsets):
+            break
+        start += step
+    return windows
+
+def select_windows(windows: List[Window], strategy: str, max_windows: int) -> List[Window]:
+    """Windows that need inference for a strategy (head_tail only looks at both ends)."""
+    if strategy == "head_tail":
+        return windows[:1] + windows[-1:] if len(windows) > 1 else windows
+
+    if len(windows) <= max_windows:
+        return windows
+    # Keep the beginning and the end, where the verdict of a review usually is
+    head = (max_windows + 1) // 2
+    return windows[:head] + windows[len(windows) - (max_windows - head):]
+
+def aggregate_scores(score_lists: List[List[Dict]], weights: List[int], strategy: str) -> List[Dict]:
+    """Combines per-window scores into one score list, sorted by descending score."""
+    if len(score_lists) == 1:
+        return score_lists[0]
+
+    if strategy != "weighted_mean":
+        weights = [1] * len(score_lists)
+
+    total_weight = sum(weights) or 1
+    combined: Dict[str, float] = {}
+    for scores, weight in zip(score_lists, weights):
+        for item in scores:
+            combined[item["label"]] = combined.get(item["label"], 0.0) + item["score"] * weight / total_weight
+
+    aggregated = [{"label": label, "score": score} for label, score in combined.items()]
+    aggregated.sort(key=lambda item: item["score"], reverse=True)
+    return aggregated
+
+class ChunkedClassifier:
+    """
+    Wraps an inference backend (see models/inference_backend.py) so texts longer
+    than `max_tokens` are classified window by window instead of being truncated.
+    """
+
+    # [CLS]/[SEP] or <s>/</s> added by the tokenizer around each window
+    SPECIAL_TOKENS = 2
+
+    def __init__(
+        self,
+        backend: Callable,
+        token_offsets: Callable[[List[str]], List[List[Tuple[int, int]]]],
+        max_tokens: int,
+        strategy: str,
+        overlap_tokens: int = 0,
+        max_windows: int = 8,
+        batch_size: int = 16,
+    ):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown long text strategy '{strategy}' ({', '.join(STRATEGIES)})")
+        self.backend = backend
+        self.token_offsets = token_offsets
+        self.window_tokens = max(1, max_tokens - self.SPECIAL_TOKENS)
+        self.strategy = strategy
+        self.overlap_tokens = min(overlap_tokens, self.window_tokens // 2)
+        self.max_windows = max(2, max_windows)
+        self.batch_size = batch_size
+
+    def _fits(self, text: str) -> bool:
+        # Every token covers at least one byte, so this never underestimates
+        return len(text.encode("utf-8")) <= self.window_tokens
+
+    def _windows(self, texts: List[str]) -> List[List[Window]]:
+        plans: List[List[Window]] = [[(0, len(text), 1)] for text in texts]
+
+        long_indexes = [i for i, text in enumerate(texts) if not self._fits(text)]
+        if long_indexes:
+            offsets = self.token_offsets([texts[i] for i in long_indexes])
+            for i, text_offsets in zip(long_indexes, offsets):
+                windows = plan_windows(text_offsets, self.window_tokens, self.overlap_tokens)
+                if windows:
+                    plans[i] = select_windows(windows, self.strategy, self.max_windows)
+        return plans
+
+    def __call__(self, texts: List[str]) -> List[List[Dict]]:
+        with stage("preprocess"):
+            plans = self._windows(texts)
+
+        # Flatten every window of every text into one batch
+        window_texts: List[str] = []
+        owners: List[int] = []
+        weights: List[int] = []
+        for index, (text, windows) in enumerate(zip(texts, plans)):
+            for char_start, char_end, token_count in windows:
+                window_texts.append(text[char_start:char_end])
+                owners.append(index)
+                weights.append(token_count)
+
+        # Sort by length so each forward pass pads to similar lengths
+        order = sorted(range(len(window_texts)), key=lambda i: len(window_texts[i]))
+        outputs = self.backend(
+            [window_texts[i] for i in order],
+            batch_size=self.batch_size,
+            truncation=True
+        )
+
+        with stage("postprocess"):
+            window_scores: List[List[Dict]] = [[] for _ in window_texts]
+            for position, scores in zip(order, outputs):
+                window_scores[position] = scores
+
+            per_text_scores: List[List[List[Dict]]] = [[] for _ in texts]
+            per_text_weights: List[List[int]] = [[] for _ in texts]
+            for owner, scores, weight in zip(owners, window_scores, weights):
+                per_text_scores[owner].append(scores)
+                per_text_weights[owner].append(weight)
+
+            return [
+                aggregate_scores(scores, text_weights, self.strategy)
+                for scores, text_weights in zip(per_text_scores, per_text_weights)
+            ]
@@ -0,0 +1,52 @@
+
+"""
+Per-request deadlines and cancellation.
+
+Each request gets a RequestBudget (deadline from the X-Request-Timeout-Ms header or
+REQUEST_TIMEOUT_MS, and a disconnected flag set by the API middleware), held in a
+context variable. Batchers and the scheduler capture it when work is queued and
+drop the work of abandoned requests before running inference on it.
+"""
+import time
+from contextvars import ContextVar
+from typing import Optional
+from .metrics import ABANDONED_ITEMS
+
+EXPIRED = "expired"
+DISCONNECTED = "disconnected"
+CANCELLED = "cancelled"
+
+class RequestBudget:
+    """Deadline (time.monotonic() based, None = none) and liveness of one request."""
+
+    __slots__ = ("deadline", "disconnected")
+
+    def __init__(self, deadline: Optional[float] = None):
+        self.deadline = deadline
+        self.disconnected = False
+
+    @classmethod
+    def from_timeout_ms(cls, timeout_ms: Optional[float]) -> "RequestBudget":
+        if not timeout_ms or timeout_ms <= 0:
+            return cls()
+        return cls(time.monotonic() + timeout_ms / 1000)
+
+    def remaining(self) -> Optional[float]:
+        return None if self.deadline is None else self.deadline - time.monotonic()
+
+    def abandoned(self) -> Optional[str]:
+        """Why nobody waits for this request's results anymore, or None if somebody does."""
+        if self.disconnected:
+            return DISCONNECTED
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            return EXPIRED
+        return None
+
+# Budget of the request being served; None outside requests (and for streams, whose
+# records have no deadline and whose disconnects are handled by the stream itself)
+current_request: ContextVar[Optional[RequestBudget]] = ContextVar("current_request", default=None)
+
+def count_abandoned(name: str, reason: str, count: int = 1):
+    """Counts `count` items of batcher or model `name` dropped for `reason`."""
+    if count:
+        ABANDONED_ITEMS.labels(name, reason).inc(count)
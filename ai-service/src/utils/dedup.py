@@ -0,0 +1,182 @@
+
+"""
+Near-duplicate detection with MinHash signatures and LSH banding.
+
+Reposts, syndicated articles and templated reviews differ by a few characters
+(a mention, a link, a signature) and miss the exact-text cache. The index clusters
+them: the first text of a cluster is its representative, and the analyzers cache
+the results of every member under the representative's content hash (see
+DEDUP_ENABLED), so the models run once per cluster. Only signatures and content
+hashes are kept, never the texts.
+"""
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+import threading
+import zlib
+import numpy as np
+from ..config.settings import settings
+from .cache import content_hash, normalize_text
+
+# Mersenne prime for the (a * x + b) mod p hash family
+_PRIME = np.uint64((1 << 61) - 1)
+
+class NearDuplicateIndex:
+    """
+    Bounded, thread-safe MinHash/LSH index of cluster representatives.
+
+    Signatures are split into `bands` bands; texts sharing a band bucket are
+    candidates, confirmed when their estimated Jaccard similarity (fraction of equal
+    signature values) reaches `threshold`. When full, the least recently matched
+    clusters are dropped.
+    """
+
+    SHINGLE_SIZE = 5
+
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        num_perm: int = 64,
+        bands: int = 16,
+        max_entries: int = 50000,
+        min_length: int = 30,
+        seed: int = 1
+    ):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.max_entries = max_entries
+        self.min_length = min_length
+
+        rng = np.random.RandomState(seed)
+        # a, b < 2^32 and 32-bit shingle hashes: a * x + b can't overflow uint64
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+        self._lock = threading.Lock()
+        self._next_id = 0
+        # cluster id -> (signature, representative's content hash), in LRU order
+        self._entries: "OrderedDict[int, Tuple[np.ndarray, str]]" = OrderedDict()
+        self._buckets: Dict[bytes, Set[int]] = {}
+        self.matches = 0
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash signature of a text's character shingles (None for texts too short to compare)."""
+        normalized = normalize_text(text).lower()
+        if len(normalized) < self.min_length:
+            return None
+        shingles = {normalized[i:i + self.SHINGLE_SIZE] for i in range(len(normalized) - self.SHINGLE_SIZE + 1)}
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles)
+        )
+        permuted = (hashes[:, None] * self._a + self._b) % _PRIME
+        return (permuted.min(axis=0) & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [
+            bytes([band]) + signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+
+    def _find(self, signature: np.ndarray, band_keys: List[bytes]) -> Tuple[Optional[int], float]:
+        candidates: Set[int] = set()
+        for key in band_keys:
+            candidates.update(self._buckets.get(key, ()))
+
+        best_id, best_similarity = None, 0.0
+        for cluster_id in candidates:
+            similarity = float(np.mean(self._entries[cluster_id][0] == signature))
+            if similarity > best_similarity:
+                best_id, best_similarity = cluster_id, similarity
+        if best_similarity >= self.threshold:
+            return best_id, best_similarity
+        return None, best_similarity
+
+    def _add(self, signature: np.ndarray, band_keys: List[bytes], content: str) -> int:
+        cluster_id = self._next_id
+        self._next_id += 1
+        self._entries[cluster_id] = (signature, content)
+        for key in band_keys:
+            self._buckets.setdefault(key, set()).add(cluster_id)
+
+        while len(self._entries) > self.max_entries:
+            evicted_id, (evicted_signature, _) = self._entries.popitem(last=False)
+            for key in self._band_keys(evicted_signature):
+                bucket = self._buckets.get(key)
+                if bucket is not None:
+                    bucket.discard(evicted_id)
+                    if not bucket:
+                        del self._buckets[key]
+        return cluster_id
+
+    def assign(self, texts: List[str]) -> List[Dict]:
+        """
+        Cluster of each text: {"cluster_id", "representative" (its content_hash()),
+        "is_representative", "similarity"}. Texts too short to compare are their own cluster (cluster_id -1).
+        Earlier texts of the same call count, so duplicates within a batch are grouped too.
+        """
+        signatures = [self.signature(text) for text in texts]
+
+        assignments = []
+        with self._lock:
+            for text, signature in zip(texts, signatures):
+                content = content_hash(text)
+                if signature is None:
+                    assignments.append({
+                        "cluster_id": -1, "representative": content,
+                        "is_representative": True, "similarity": 1.0
+                    })
+                    continue
+
+                band_keys = self._band_keys(signature)
+                cluster_id, similarity = self._find(signature, band_keys)
+                if cluster_id is None:
+                    cluster_id = self._add(signature, band_keys, content)
+                    assignments.append({
+                        "cluster_id": cluster_id, "representative": content,
+                        "is_representative": True, "similarity": 1.0
+                    })
+                else:
+                    self.matches += 1
+                    self._entries.move_to_end(cluster_id)
+                    assignments.append({
+                        "cluster_id": cluster_id, "representative": self._entries[cluster_id][1],
+                        "is_representative": False, "similarity": round(similarity, 4)
+                    })
+        return assignments
+
+    def representatives(self, texts: List[str]) -> List[str]:
+        """Content hash of each text's cluster representative."""
+        return [assignment["representative"] for assignment in self.assign(texts)]
+
+    def stats(self) -> Dict:
+        return {"clusters": len(self._entries), "matches": self.matches}
+
+_index: Optional[NearDuplicateIndex] = None
+_index_lock = threading.Lock()
+
+def get_dedup_index() -> NearDuplicateIndex:
+    """Process-wide index shared by the analyzers and the /analyze/duplicates endpoint."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = NearDuplicateIndex(
+                    threshold=settings.DEDUP_THRESHOLD,
+                    num_perm=settings.DEDUP_NUM_PERM,
+                    bands=settings.DEDUP_BANDS,
+                    max_entries=settings.DEDUP_MAX_ENTRIES,
+                    min_length=settings.DEDUP_MIN_LENGTH
+                )
+    return _index
+
+def cache_contents(texts: List[str]) -> List[str]:
+    """
+    Content hash each text's results are cached under (see cache.content_cache_key):
+    its cluster representative's when DEDUP_ENABLED, so near-duplicates share a result.
+    """
+    if not settings.DEDUP_ENABLED:
+        return [content_hash(text) for text in texts]
+    return get_dedup_index().representatives(texts)
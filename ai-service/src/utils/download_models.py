@@ -1,6 +1,4 @@
 
-from transformers import pipeline
-import spacy
 from ..config.settings import settings
 import structlog
 
@@ -21,6 +19,10 @@ def get_logger():
     return structlog.get_logger()
 
 def download_models():
+    # Only fills the Hugging Face cache: no need to build the models. Use
+    # src.utils.build_bundle for a bundle the workers can memory-map
+    from huggingface_hub import snapshot_download
+
     logger = get_logger()
     
     models = [
@@ -31,7 +33,10 @@ def download_models():
     for task, model_name in models:
         logger.info(f"Downloading {task} model: {model_name}...")
         try:
-            pipeline(task, model=model_name)
+            snapshot_download(
+                model_name,
+                allow_patterns=["*.json", "*.safetensors", "*.bin", "*.txt", "*.model"]
+            )
             logger.info(f"Successfully downloaded {model_name}")
         except Exception as e:
             logger.error(f"Failed to download {model_name}", error=str(e))
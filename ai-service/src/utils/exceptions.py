@@ -1,9 +1,10 @@
 
+from typing import Dict, Optional
 from fastapi import HTTPException
 
 class BaseAIException(HTTPException):
-    def __init__(self, status_code: int, detail: str):
-        super().__init__(status_code=status_code, detail=detail)
+    def __init__(self, status_code: int, detail: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(status_code=status_code, detail=detail, headers=headers)
 
 class ModelLoadException(BaseAIException):
     def __init__(self, model_name: str, error: str):
@@ -22,3 +23,61 @@ class LanguageNotSupportedException(BaseAIException):
             status_code=400,
             detail=f"Langue non supportée: {lang}"
         )
+
+class BrandNotFoundException(BaseAIException):
+    def __init__(self, brand: str):
+        super().__init__(
+            status_code=404,
+            detail=f"Aucun sujet suivi pour la marque: {brand}"
+        )
+
+class TooManyRequestsException(BaseAIException):
+    def __init__(self, retry_after: int):
+        super().__init__(
+            status_code=429,
+            detail="Trop de requêtes en attente, réessayez plus tard",
+            headers={"Retry-After": str(max(1, retry_after))}
+        )
+
+class ServiceOverloadedException(BaseAIException):
+    def __init__(self, retry_after: int):
+        super().__init__(
+            status_code=503,
+            detail="Service surchargé: file d'inférence pleine",
+            headers={"Retry-After": str(max(1, retry_after))}
+        )
+
+class AnalyzerDisabledException(BaseAIException):
+    def __init__(self, analyzer: str):
+        super().__init__(
+            status_code=400,
+            detail=f"Analyseur désactivé sur ce service: {analyzer}"
+        )
+
+class RequestAbandonedException(BaseAIException):
+    def __init__(self, reason: str):
+        # 499 (nginx's "client closed request"): nobody is left to read the response
+        expired = reason == "expired"
+        super().__init__(
+            status_code=504 if expired else 499,
+            detail="Délai de la requête dépassé" if expired else "Requête abandonnée par le client"
+        )
+
+class AdminAccessDeniedException(BaseAIException):
+    def __init__(self):
+        super().__init__(status_code=403, detail="Clé d'administration invalide")
+
+class ModelSwapInProgressException(BaseAIException):
+    def __init__(self, analyzer: str):
+        super().__init__(
+            status_code=409,
+            detail=f"Changement de modèle déjà en cours: {analyzer}"
+        )
+
+class TopicStoreException(BaseAIException):
+    def __init__(self):
+        super().__init__(status_code=503, detail="Suivi des sujets indisponible: erreur de stockage")
+
+class ProfileInProgressException(BaseAIException):
+    def __init__(self):
+        super().__init__(status_code=409, detail="Un profilage est déjà en cours")
@@ -0,0 +1,83 @@
+
+"""
+Exports the sentiment and emotion models to ONNX for INFERENCE_BACKEND=onnx.
+
+    PYTHONPATH=. python -m src.utils.export_onnx [--quantize]
+
+Each model is written to ONNX_MODEL_DIR/<model name> with its tokenizer and config.
+With --quantize, an int8 dynamically quantized graph is written next to it and used
+when MODEL_QUANTIZATION=true.
+"""
+import argparse
+import inspect
+import os
+from ..config.settings import settings
+from ..models.inference_backend import onnx_model_dir, ONNX_MODEL_FILE, ONNX_QUANTIZED_MODEL_FILE
+from .download_models import get_logger
+
+ONNX_OPSET = 14
+
+def export_model(model_name: str, output_dir: str, quantize: bool = False):
+    import torch
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    logger = get_logger()
+    os.makedirs(output_dir, exist_ok=True)
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+
+    sample = tokenizer(["Exemple de texte", "Sample text"], padding=True, return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    export_kwargs = {}
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        # Recent torch versions default to the dynamo exporter; keep the TorchScript one
+        export_kwargs["dynamo"] = False
+
+    model_path = os.path.join(output_dir, ONNX_MODEL_FILE)
+    logger.info(f"Exporting {model_name} to {model_path}...")
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            ({name: sample[name] for name in input_names},),
+            model_path,
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=ONNX_OPSET,
+            **export_kwargs
+        )
+
+    # The ONNX backend reads tokenizer.json (fast tokenizer) and config.json (labels)
+    tokenizer.save_pretrained(output_dir)
+    model.config.save_pretrained(output_dir)
+
+    if quantize:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+
+        quantized_path = os.path.join(output_dir, ONNX_QUANTIZED_MODEL_FILE)
+        logger.info(f"Quantizing {model_name} to {quantized_path}...")
+        quantize_dynamic(model_path, quantized_path, weight_type=QuantType.QInt8)
+
+    logger.info(f"Successfully exported {model_name}")
+
+def export_models(quantize: bool = False):
+    logger = get_logger()
+
+    for model_name in (settings.SENTIMENT_MODEL, settings.EMOTION_MODEL):
+        try:
+            export_model(model_name, onnx_model_dir(model_name), quantize=quantize)
+        except Exception as e:
+            logger.error(f"Failed to export {model_name}", error=str(e))
+            raise e
+
+    logger.info("All transformer models exported to ONNX.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the transformer analyzers to ONNX")
+    parser.add_argument("--quantize", action="store_true", help="Also write int8 quantized graphs")
+    args = parser.parse_args()
+    export_models(quantize=args.quantize)
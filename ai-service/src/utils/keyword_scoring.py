@@ -0,0 +1,31 @@
+
+"""
+YAKE keyword scoring, kept in a light module so process-pool workers can import it
+without loading spaCy or the transformer models.
+"""
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Tuple
+
+if TYPE_CHECKING:
+    import yake
+
+@lru_cache(maxsize=32)
+def get_yake_extractor(lang: str, top: int) -> "yake.KeywordExtractor":
+    """One extractor per (language, top): building one loads its stopword list."""
+    import yake
+
+    return yake.KeywordExtractor(
+        lan=lang,
+        n=2,              # Bigrams max
+        dedupLim=0.9,
+        top=top,
+        features=None
+    )
+
+def yake_keywords(text: str, lang: str, top: int) -> List[Tuple[str, float]]:
+    """(keyword, score) pairs, lower score = more relevant."""
+    return get_yake_extractor(lang, top).extract_keywords(text)
+
+def yake_keywords_many(items: List[Tuple[str, str]], top: int) -> List[List[Tuple[str, float]]]:
+    """Scores several (text, lang) items; a whole chunk is sent to a pool worker at once."""
+    return [yake_keywords(text, lang, top) for text, lang in items]
@@ -0,0 +1,92 @@
+
+"""
+Shared vs private memory of the service processes.
+
+With the preload-then-fork server (PREFORK=true), model weights loaded by the parent
+are shared copy-on-write by the workers: they show up in each worker's RSS but not
+in its USS (private pages). PSS splits shared pages between the processes sharing
+them, so the sum of PSS is the real footprint of the pod.
+
+Usage: python -m src.utils.memory_report --pid <parent pid> [--json]
+"""
+import argparse
+import json
+import os
+from typing import Dict, List
+import psutil
+
+MB = 1024 * 1024
+
+def _smaps_rollup(pid: int) -> Dict[str, int]:
+    """Page categories of /proc/<pid>/smaps_rollup, in bytes (empty if unavailable)."""
+    values = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == "kB":
+                    values[parts[0].rstrip(":")] = int(parts[1]) * 1024
+    except OSError:
+        pass
+    return values
+
+def process_memory(pid: int) -> Dict:
+    process = psutil.Process(pid)
+    info = process.memory_full_info()
+    smaps = _smaps_rollup(pid)
+
+    if smaps:
+        shared = smaps.get("Shared_Clean", 0) + smaps.get("Shared_Dirty", 0)
+        private = smaps.get("Private_Clean", 0) + smaps.get("Private_Dirty", 0)
+    else:
+        private = info.uss
+        shared = info.rss - info.uss
+
+    return {
+        "pid": pid,
+        "name": " ".join(process.cmdline()[:3]) or process.name(),
+        "rss_mb": round(info.rss / MB, 1),
+        "pss_mb": round(getattr(info, "pss", 0) / MB, 1),
+        "uss_mb": round(info.uss / MB, 1),
+        "shared_mb": round(shared / MB, 1),
+        "private_mb": round(private / MB, 1),
+    }
+
+def memory_report(pid: int) -> Dict:
+    """Memory of a process (the prefork parent) and of its children (the workers)."""
+    parent = psutil.Process(pid)
+    processes: List[Dict] = [{**process_memory(pid), "role": "parent"}]
+    for child in parent.children():
+        try:
+            processes.append({**process_memory(child.pid), "role": "worker"})
+        except psutil.NoSuchProcess:
+            continue
+
+    return {
+        "processes": processes,
+        "total_rss_mb": round(sum(p["rss_mb"] for p in processes), 1),
+        # What the pod really uses: shared pages are only counted once
+        "total_pss_mb": round(sum(p["pss_mb"] for p in processes), 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared vs private memory per worker")
+    parser.add_argument("--pid", type=int, default=os.getpid(), help="PID of the prefork parent")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    report = memory_report(args.pid)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{'role':<8}{'pid':>8}{'rss':>10}{'pss':>10}{'uss':>10}{'shared':>10}{'private':>10}  (MB)")
+    for p in report["processes"]:
+        print(
+            f"{p['role']:<8}{p['pid']:>8}{p['rss_mb']:>10}{p['pss_mb']:>10}"
+            f"{p['uss_mb']:>10}{p['shared_mb']:>10}{p['private_mb']:>10}"
+        )
+    print(f"Total RSS: {report['total_rss_mb']} MB, total PSS (actual footprint): {report['total_pss_mb']} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+
+"""
+Prometheus metrics, served on METRICS_PORT when ENABLE_METRICS is set.
+
+Hot-path metrics are plain histograms observed once per batch. Inference time is
+split into stages (preprocess = window planning, tokenize, forward, postprocess),
+accumulated over a whole batch through a context variable so the backends don't
+need to know which model they serve. Queue depths and cache counters are read
+from the scheduler, batchers and caches at scrape time by custom collectors,
+so they cost nothing between scrapes.
+"""
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional
+import psutil
+import structlog
+from prometheus_client import REGISTRY, Counter, Gauge, Histogram, start_http_server
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from ..config.settings import settings
+
+logger = structlog.get_logger()
+
+STAGES = ("preprocess", "tokenize", "forward", "postprocess")
+
+INFERENCE_STAGE_SECONDS = Histogram(
+    "ai_inference_stage_seconds",
+    "Time spent per inference stage, per batch",
+    ["model", "stage"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+BATCH_SIZE = Histogram(
+    "ai_batch_size",
+    "Number of items per model batch",
+    ["batcher", "lane"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+QUEUE_WAIT_SECONDS = Histogram(
+    "ai_queue_wait_seconds",
+    "Time jobs wait for an inference slot",
+    ["model", "lane"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+SENTIMENT_STAGE_TEXTS = Counter(
+    "ai_sentiment_stage_texts",
+    "Texts answered per stage of the sentiment cascade",
+    ["stage"],
+)
+ABANDONED_ITEMS = Counter(
+    "ai_abandoned_items",
+    "Queued work dropped before inference because its request expired, disconnected or was cancelled",
+    ["name", "reason"],
+)
+MODEL_LOAD_SECONDS = Gauge("ai_model_load_seconds", "Duration of the last model load", ["model"])
+MODEL_RSS_BYTES = Gauge("ai_model_rss_bytes", "Growth of the process RSS while loading the model", ["model"])
+
+_stage_totals: ContextVar[Optional[Dict[str, float]]] = ContextVar("stage_totals", default=None)
+# Same totals for the request traces (see tracing.py), collected whatever ENABLE_METRICS
+_stage_collector: ContextVar[Optional[Dict[str, float]]] = ContextVar("stage_collector", default=None)
+
+@contextmanager
+def record_stages(model: str) -> Iterator[None]:
+    """Collects the stage() timings of the enclosed batch and observes them once per stage."""
+    if not settings.ENABLE_METRICS:
+        yield
+        return
+    totals: Dict[str, float] = defaultdict(float)
+    token = _stage_totals.set(totals)
+    try:
+        yield
+    finally:
+        _stage_totals.reset(token)
+        for stage_name, seconds in totals.items():
+            INFERENCE_STAGE_SECONDS.labels(model, stage_name).observe(seconds)
+
+@contextmanager
+def collect_stages() -> Iterator[Dict[str, float]]:
+    """Yields the stage() totals of the enclosed calls, once they are done."""
+    totals: Dict[str, float] = defaultdict(float)
+    token = _stage_collector.set(totals)
+    try:
+        yield totals
+    finally:
+        _stage_collector.reset(token)
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Adds the enclosed time to stage `name` of the current batch (no-op outside record_stages)."""
+    totals = _stage_totals.get()
+    collector = _stage_collector.get()
+    if totals is None and collector is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        if totals is not None:
+            totals[name] += elapsed
+        if collector is not None:
+            collector[name] += elapsed
+
+def record_cascade(stage_name: str, count: int):
+    """Counts `count` texts answered by `stage_name` of the sentiment cascade."""
+    if settings.ENABLE_METRICS and count:
+        SENTIMENT_STAGE_TEXTS.labels(stage_name).inc(count)
+
+def timed_stage(name: str, fn: Callable) -> Callable:
+    """Wraps `fn` so each call counts towards stage `name` (used on transformers pipelines)."""
+    def wrapper(*args, **kwargs):
+        with stage(name):
+            return fn(*args, **kwargs)
+    return wrapper
+
+@contextmanager
+def track_model_load(model: str) -> Iterator[None]:
+    """Records load time and RSS growth of a model (approximate when models load concurrently)."""
+    process = psutil.Process()
+    rss_before = process.memory_info().rss
+    start = time.perf_counter()
+    yield
+    MODEL_LOAD_SECONDS.labels(model).set(time.perf_counter() - start)
+    MODEL_RSS_BYTES.labels(model).set(max(0, process.memory_info().rss - rss_before))
+
+class _ServiceCollector:
+    """Scrape-time view of the inference queues and result caches."""
+
+    def __init__(self):
+        self.schedulers: List = []
+        self.batchers: List = []
+
+    def collect(self):
+        queued = GaugeMetricFamily(
+            "ai_inference_queue_depth", "Jobs waiting for an inference slot", labels=["model", "lane"]
+        )
+        running = GaugeMetricFamily("ai_inference_running", "Jobs running on inference slots", labels=["model"])
+        lane_running = GaugeMetricFamily(
+            "ai_lane_running", "Inference slots used by each priority lane", labels=["lane"]
+        )
+        rejected = CounterMetricFamily(
+            "ai_inference_rejected", "Jobs rejected by admission control", labels=["lane"]
+        )
+        expired = CounterMetricFamily(
+            "ai_inference_expired", "Jobs dropped after outliving the deadline in queue", labels=["lane"]
+        )
+        preempted = CounterMetricFamily(
+            "ai_inference_preempted", "Chunked jobs that gave their slot to higher-priority work", labels=["lane"]
+        )
+        for scheduler in self.schedulers:
+            stats = scheduler.stats()
+            for model, count in stats["running"].items():
+                running.add_metric([model], count)
+            for lane, lane_stats in stats["lanes"].items():
+                for model, count in lane_stats["queued_by_model"].items():
+                    queued.add_metric([model, lane], count)
+                lane_running.add_metric([lane], lane_stats["running"])
+                rejected.add_metric([lane], lane_stats["rejected"])
+                expired.add_metric([lane], lane_stats["expired"])
+                preempted.add_metric([lane], lane_stats["preempted"])
+
+        pending = GaugeMetricFamily(
+            "ai_batcher_pending_items", "Items waiting to be batched", labels=["batcher", "lane"]
+        )
+        shared = CounterMetricFamily(
+            "ai_single_flight_shared", "Items served by an identical computation already in flight",
+            labels=["layer", "name"]
+        )
+        for batcher in self.batchers:
+            pending.add_metric([batcher.name, batcher.lane], batcher.pending)
+            shared.add_metric(["batcher", batcher.name], batcher.shared)
+
+        from .cache import CacheManager
+        hits = CounterMetricFamily("ai_cache_hits", "Result cache hits", labels=["cache"])
+        misses = CounterMetricFamily("ai_cache_misses", "Result cache misses", labels=["cache"])
+        ratio = GaugeMetricFamily("ai_cache_hit_ratio", "Result cache hit ratio", labels=["cache"])
+        entries = GaugeMetricFamily("ai_cache_entries", "Result cache size", labels=["cache"])
+        for name, stats in CacheManager().stats().items():
+            hits.add_metric([name], stats["hits"])
+            misses.add_metric([name], stats["misses"])
+            ratio.add_metric([name], stats["hit_ratio"])
+            entries.add_metric([name], stats["size"])
+        for name, count in CacheManager().flight_stats().items():
+            shared.add_metric(["cache", name], count)
+
+        return [
+            queued, running, lane_running, rejected, expired, preempted, pending, shared,
+            hits, misses, ratio, entries,
+        ]
+
+_collector = _ServiceCollector()
+REGISTRY.register(_collector)
+
+def track_scheduler(scheduler):
+    _collector.schedulers.append(scheduler)
+
+def track_batcher(batcher):
+    _collector.batchers.append(batcher)
+
+def metrics_ports() -> List[int]:
+    """
+    Ports this worker may serve /metrics on. uvicorn workers share one configuration,
+    so each takes the first free one of METRICS_PORT .. METRICS_PORT + WORKERS - 1;
+    prefork workers were given their own METRICS_PORT (see prefork.py).
+    """
+    if settings.PREFORK:
+        return [settings.METRICS_PORT]
+    return list(range(settings.METRICS_PORT, settings.METRICS_PORT + max(1, settings.WORKERS)))
+
+def start_metrics_server(port: Optional[int] = None) -> Optional[int]:
+    """Serves /metrics in a daemon thread, on `port` or a free one of metrics_ports(); returns it."""
+    ports = [port] if port is not None else metrics_ports()
+    for candidate in ports:
+        try:
+            start_http_server(candidate)
+        except OSError:
+            # Taken by another worker
+            continue
+        logger.info("Metrics server started", port=candidate)
+        return candidate
+    logger.warning("Metrics server not started: no free port", ports=ports)
+    return None
@@ -3,11 +3,13 @@ import re
 import html
 from typing import Optional
 from ..config.settings import settings
+from .tracing import traced
 
 class TextPreprocessor:
     """Utility class for cleaning text before analysis."""
 
     @staticmethod
+    @traced("preprocess")
     def clean_text(text: str, language: Optional[str] = None) -> str:
         """
         Cleans the input text based on configuration settings.
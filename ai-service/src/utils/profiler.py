@@ -0,0 +1,157 @@
+"""
+On-demand sampling profiler (PROFILER_ENABLED, see POST /admin/profile).
+
+A background thread reads the stack of every thread of the worker process with
+sys._current_frames() every PROFILER_INTERVAL_MS, either for a given duration or,
+in request mode, only while requests carrying the `X-Profile` header are in flight
+(until K of them have finished). Nothing is instrumented: requests never wait on
+the profiler, and between profiles it costs nothing.
+
+The result is collapsed-stack text, one `thread;outer;...;inner count` line per
+distinct stack, as read by flamegraph.pl, speedscope or inferno. Frames are
+`function (file:first line)`, so the Python code around the model calls
+(preprocessing regexes, score normalization, pydantic validation) shows up next to
+the inference itself. Threads waiting for work (idle slots, the event loop in
+select) are left out unless asked for.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from contextlib import contextmanager
+from types import CodeType, FrameType
+from typing import Dict, Iterator, Optional, Tuple
+from .exceptions import ProfileInProgressException
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MAX_STACK_DEPTH = 128
+
+# Innermost Python frames of threads blocked waiting for work: (file name, function)
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),  # concurrent.futures pool thread waiting on its queue
+    ("selectors.py", "select"),  # event loop with nothing to do
+}
+
+def _short_path(filename: str) -> str:
+    if filename.startswith(SERVICE_DIR + os.sep):
+        return os.path.relpath(filename, SERVICE_DIR)
+    _, sep, package_path = filename.rpartition("site-packages" + os.sep)
+    return package_path if sep else os.path.basename(filename)
+
+class ProfileSession:
+    """One profile: its sampling thread, the stacks counted so far and its result."""
+
+    def __init__(self, seconds: float, interval: float, requests: Optional[int] = None, idle: bool = False):
+        self.seconds = seconds
+        self.interval = interval
+        self.requests = requests
+        self.idle = idle
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self.requests_done = 0
+        self.in_flight = 0
+        self.result: Future = Future()  # Collapsed stacks, once the profile is over
+        self._labels: Dict[CodeType, str] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self._run, name="sampling-profiler", daemon=True).start()
+
+    def request_started(self) -> bool:
+        """Counts a marked request in; False once the session has its K requests."""
+        with self._lock:
+            if self.requests is None or self.requests_done + self.in_flight >= self.requests:
+                return False
+            self.in_flight += 1
+            return True
+
+    def request_finished(self):
+        with self._lock:
+            self.in_flight -= 1
+            self.requests_done += 1
+            if self.requests_done >= self.requests:
+                self._stop.set()
+
+    def _label(self, code: CodeType) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            # `;` separates frames in the collapsed format
+            label = f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+            self._labels[code] = label
+        return label
+
+    def _is_idle(self, frame: FrameType) -> bool:
+        code = frame.f_code
+        return (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES
+
+    def _stack(self, frame: FrameType) -> Tuple[str, ...]:
+        stack = []
+        while frame is not None and len(stack) < MAX_STACK_DEPTH:
+            stack.append(self._label(frame.f_code))
+            frame = frame.f_back
+        stack.reverse()
+        return tuple(stack)
+
+    def _sample(self, own_ident: int):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident or (not self.idle and self._is_idle(frame)):
+                continue
+            self.samples[(names.get(ident, str(ident)),) + self._stack(frame)] += 1
+        self.sample_count += 1
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        deadline = time.monotonic() + self.seconds
+        try:
+            while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+                # Request mode: only sample while marked requests are being served
+                if self.requests is None or self.in_flight:
+                    self._sample(own_ident)
+            self.result.set_result(self.collapsed())
+        except Exception as e:
+            self.result.set_exception(e)
+
+    def collapsed(self) -> str:
+        lines = [f"{';'.join(stack)} {count}" for stack, count in self.samples.most_common()]
+        return "\n".join(lines) + "\n" if lines else ""
+
+class SamplingProfiler:
+    """Runs the profiles of the worker process, one at a time."""
+
+    _instance = None
+    _session: Optional[ProfileSession] = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(SamplingProfiler, cls).__new__(cls)
+        return cls._instance
+
+    def start(self, seconds: float, interval: float, requests: Optional[int] = None, idle: bool = False) -> ProfileSession:
+        """Starts a profile of `seconds` (at most, with `requests`); 409 while another one runs."""
+        with self.__class__._lock:
+            running = self.__class__._session
+            if running is not None and not running.result.done():
+                raise ProfileInProgressException()
+            session = self.__class__._session = ProfileSession(seconds, interval, requests, idle)
+        session.start()
+        return session
+
+    @contextmanager
+    def marked_request(self) -> Iterator[None]:
+        """Wraps the handling of a request carrying the `X-Profile` header."""
+        session = self.__class__._session
+        counted = session is not None and not session.result.done() and session.request_started()
+        try:
+            yield
+        finally:
+            if counted:
+                session.request_finished()
@@ -0,0 +1,138 @@
+
+"""
+Int8 dynamic quantization helpers for the transformer analyzers.
+
+Run as a script to measure the accuracy drift of the quantized models against
+fp32 on the bundled labelled sample:
+
+    PYTHONPATH=. python -m src.utils.quantization
+"""
+import json
+import os
+import time
+from typing import Dict, List
+import structlog
+
+logger = structlog.get_logger()
+
+SAMPLE_PATH = os.path.join(os.path.dirname(__file__), "data", "labelled_sample.json")
+
+def _select_quantized_engine():
+    import torch
+    engines = torch.backends.quantized.supported_engines
+    # fbgemm on x86, qnnpack on ARM
+    for engine in ("fbgemm", "x86", "qnnpack"):
+        if engine in engines:
+            torch.backends.quantized.engine = engine
+            return engine
+    return torch.backends.quantized.engine
+
+def quantize_dynamic_int8(model):
+    """Returns a copy of `model` with its Linear layers dynamically quantized to int8 (CPU only)."""
+    import torch
+    _select_quantized_engine()
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+def model_memory_mb(model) -> float:
+    """Size of the weights held by a torch model (quantized weights included), in MB."""
+    import torch
+
+    def tensor_bytes(value) -> int:
+        if isinstance(value, torch.Tensor):
+            return value.nelement() * value.element_size()
+        # Dynamic-quantized Linear layers keep their int8 weight and bias in a
+        # `_packed_params._packed_params` (weight, bias) tuple
+        if isinstance(value, (tuple, list)):
+            return sum(tensor_bytes(item) for item in value)
+        return 0
+
+    total_bytes = sum(tensor_bytes(value) for value in model.state_dict().values())
+    return round(total_bytes / 1024 / 1024, 2)
+
+def load_labelled_sample() -> List[Dict]:
+    with open(SAMPLE_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+def _evaluate(pipe, texts: List[str], to_label) -> Dict:
+    pipe(texts[:1])  # warm-up, so first-call costs don't skew the timing
+    start = time.time()
+    outputs = pipe(texts, batch_size=16, truncation=True)
+    elapsed_ms = (time.time() - start) * 1000
+    return {
+        "labels": [to_label(scores) for scores in outputs],
+        "scores": [{item["label"]: item["score"] for item in scores} for scores in outputs],
+        "ms_per_text": round(elapsed_ms / len(texts), 2),
+    }
+
+def compare_fp32_int8(task: str, model_name: str, texts: List[str], expected: List[str], to_label) -> Dict:
+    """Runs the fp32 and int8 versions of a model on `texts` and reports the drift."""
+    from transformers import pipeline
+
+    pipe = pipeline(task, model=model_name, device=-1, top_k=None)
+    fp32_memory = model_memory_mb(pipe.model)
+    fp32 = _evaluate(pipe, texts, to_label)
+
+    pipe.model = quantize_dynamic_int8(pipe.model)
+    int8_memory = model_memory_mb(pipe.model)
+    int8 = _evaluate(pipe, texts, to_label)
+
+    def accuracy(labels):
+        return round(sum(a == b for a, b in zip(labels, expected)) / len(expected), 4)
+
+    score_diffs = [
+        abs(fp32_scores[label] - int8_scores.get(label, 0.0))
+        for fp32_scores, int8_scores in zip(fp32["scores"], int8["scores"])
+        for label in fp32_scores
+    ]
+
+    return {
+        "model": model_name,
+        "samples": len(texts),
+        "fp32_accuracy": accuracy(fp32["labels"]),
+        "int8_accuracy": accuracy(int8["labels"]),
+        "label_agreement": round(
+            sum(a == b for a, b in zip(fp32["labels"], int8["labels"])) / len(texts), 4
+        ),
+        "max_score_diff": round(max(score_diffs), 4),
+        "mean_score_diff": round(sum(score_diffs) / len(score_diffs), 4),
+        "fp32_memory_mb": fp32_memory,
+        "int8_memory_mb": int8_memory,
+        "fp32_ms_per_text": fp32["ms_per_text"],
+        "int8_ms_per_text": int8["ms_per_text"],
+    }
+
+def quantization_report() -> Dict:
+    from ..config.settings import settings
+    from ..models.sentiment_analyzer import SentimentAnalyzer
+
+    sample = load_labelled_sample()
+    analyzer = SentimentAnalyzer()
+
+    def sentiment_label(scores):
+        return analyzer._determine_sentiment_label(analyzer._normalize_scores(scores))
+
+    def emotion_label(scores):
+        return max(scores, key=lambda item: item["score"])["label"]
+
+    sentiment_items = [item for item in sample if item.get("sentiment")]
+    emotion_items = [item for item in sample if item.get("emotion")]
+
+    return {
+        "sentiment": compare_fp32_int8(
+            "sentiment-analysis",
+            settings.SENTIMENT_MODEL,
+            [item["text"] for item in sentiment_items],
+            [item["sentiment"] for item in sentiment_items],
+            sentiment_label,
+        ),
+        "emotions": compare_fp32_int8(
+            "text-classification",
+            settings.EMOTION_MODEL,
+            [item["text"] for item in emotion_items],
+            [item["emotion"] for item in emotion_items],
+            emotion_label,
+        ),
+    }
+
+if __name__ == "__main__":
+    print(json.dumps(quantization_report(), indent=2))
@@ -0,0 +1,201 @@
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import structlog
+from ..config.settings import settings
+
+logger = structlog.get_logger()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    namespace TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_accessed ON results (accessed_at);
+CREATE INDEX IF NOT EXISTS idx_results_namespace ON results (namespace, accessed_at);
+"""
+
+class SQLiteResultStore:
+    """
+    Second cache tier: analysis results persisted in a SQLite file.
+
+    All uvicorn workers of a node open the same file (WAL mode allows concurrent
+    readers alongside a writer), so a result computed by one worker is reused by the
+    others and survives restarts and deploys. When the database grows past
+    `max_size_mb`, the least recently accessed entries are evicted.
+
+    Storage errors are logged and treated as misses: the store never fails a request.
+    """
+
+    # Fraction of entries removed when the size limit is hit
+    EVICTION_FRACTION = 0.1
+    QUERY_CHUNK = 500
+    # Reads refresh `accessed_at` (LRU order) at most this often per entry, so cache
+    # hits rarely need the write lock the workers share
+    ACCESS_RESOLUTION_SECONDS = 300
+
+    def __init__(self, path: str, max_size_mb: float, ttl_seconds: float):
+        self.path = path
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.evictions = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connect().executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 connections can't be shared across threads: one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Returns the stored values found for `keys` (missing or expired keys are omitted)."""
+        if not keys:
+            return {}
+
+        now = time.time()
+        rows: List[Tuple[str, str]] = []
+        try:
+            conn = self._connect()
+            # Stay under SQLite's bound-parameter limit
+            for i in range(0, len(keys), self.QUERY_CHUNK):
+                chunk = keys[i:i + self.QUERY_CHUNK]
+                chunk_rows = conn.execute(
+                    f"SELECT key, value, accessed_at FROM results WHERE key IN ({','.join('?' * len(chunk))}) "
+                    "AND created_at > ?",
+                    [*chunk, now - self.ttl_seconds]
+                ).fetchall()
+                stale = [key for key, _, accessed_at in chunk_rows
+                         if accessed_at < now - self.ACCESS_RESOLUTION_SECONDS]
+                if stale:
+                    conn.execute(
+                        f"UPDATE results SET accessed_at = ? "
+                        f"WHERE key IN ({','.join('?' * len(stale))})",
+                        [now, *stale]
+                    )
+                rows.extend((key, value) for key, value, _ in chunk_rows)
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning("Result store read failed", error=str(e))
+            return {}
+
+        found = {key: json.loads(value) for key, value in rows}
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def set_many(self, namespace: str, items: Dict[str, Any]):
+        if not items:
+            return
+
+        now = time.time()
+        try:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR REPLACE INTO results (key, namespace, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (key, namespace, json.dumps(value, ensure_ascii=False), now, now)
+                    for key, value in items.items()
+                ]
+            )
+            if self.size_bytes() > self.max_size_bytes:
+                self.evict()
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning("Result store write failed", error=str(e))
+
+    def recent(self, namespace: str, limit: int) -> List[Tuple[str, Any]]:
+        """Most recently accessed, non-expired entries of a namespace (used to warm memory caches)."""
+        try:
+            rows = self._connect().execute(
+                "SELECT key, value FROM results WHERE namespace = ? AND created_at > ? "
+                "ORDER BY accessed_at DESC LIMIT ?",
+                (namespace, time.time() - self.ttl_seconds, limit)
+            ).fetchall()
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning("Result store read failed", error=str(e))
+            return []
+        return [(key, json.loads(value)) for key, value in rows]
+
+    def size_bytes(self) -> int:
+        """Bytes used by live pages (freed pages are reused, so the file itself doesn't shrink)."""
+        conn = self._connect()
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return (page_count - free_pages) * page_size
+
+    def evict(self):
+        """Removes expired entries, then the least recently accessed ones while still over the size limit."""
+        conn = self._connect()
+        conn.execute("DELETE FROM results WHERE created_at <= ?", (time.time() - self.ttl_seconds,))
+        while self.size_bytes() > self.max_size_bytes:
+            count = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            if not count:
+                break
+            to_remove = max(1, int(count * self.EVICTION_FRACTION))
+            conn.execute(
+                "DELETE FROM results WHERE key IN "
+                "(SELECT key FROM results ORDER BY accessed_at LIMIT ?)",
+                (to_remove,)
+            )
+            self.evictions += to_remove
+            logger.info("Result store evicted entries", removed=to_remove, remaining=count - to_remove)
+
+    def clear(self):
+        try:
+            self._connect().execute("DELETE FROM results")
+        except sqlite3.Error as e:
+            logger.warning("Result store clear failed", error=str(e))
+
+    def stats(self) -> Dict:
+        try:
+            entries = self._connect().execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            size_mb = round(self.size_bytes() / 1024 / 1024, 2)
+        except sqlite3.Error:
+            entries, size_mb = -1, -1.0
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "entries": entries,
+            "size_mb": size_mb,
+            "max_size_mb": round(self.max_size_bytes / 1024 / 1024, 2),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "errors": self.errors,
+        }
+
+def create_result_store() -> Optional[SQLiteResultStore]:
+    """Builds the store configured in settings, or None when disabled or unavailable."""
+    if not settings.RESULT_STORE_ENABLED:
+        return None
+    try:
+        return SQLiteResultStore(
+            settings.RESULT_STORE_PATH,
+            max_size_mb=settings.RESULT_STORE_MAX_MB,
+            ttl_seconds=settings.RESULT_STORE_TTL_SECONDS
+        )
+    except (sqlite3.Error, OSError) as e:
+        logger.error("Result store unavailable, running with memory cache only", error=str(e))
+        return None
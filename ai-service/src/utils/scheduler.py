@@ -0,0 +1,356 @@
+
+"""
+Dedicated inference scheduler.
+
+CPU-heavy work (transformer batches, keyword extraction) runs on a fixed number of
+slots instead of FastAPI's 40-thread pool, with explicit torch/onnxruntime thread
+counts per slot (see inference_threads()), so the cores are partitioned instead of
+oversubscribed. Each model has a concurrency limit, and requests are rejected early
+(429/503 with Retry-After) when the estimated queueing delay exceeds the deadline,
+so latency stays bounded under load instead of every request timing out.
+
+Work is split into priority lanes (interactive, bulk), each with its own queue,
+queue size and deadline. Free slots go to the lanes in proportion to their weights
+(stride scheduling), and batches submitted with a chunk size run chunk by chunk,
+giving their slot back between two chunks when a higher-priority job is waiting.
+Jobs of requests that expired or disconnected while queued are dropped unrun.
+"""
+import asyncio
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional
+import structlog
+from .deadlines import count_abandoned, current_request
+from .exceptions import RequestAbandonedException, ServiceOverloadedException, TooManyRequestsException
+from .metrics import QUEUE_WAIT_SECONDS, collect_stages
+from .tracing import current_trace
+
+logger = structlog.get_logger()
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+LANES = (INTERACTIVE, BULK)
+
+# Lane of the request being served (set from the X-Priority header by the API middleware)
+current_lane: ContextVar[str] = ContextVar("current_lane", default=INTERACTIVE)
+
+@dataclass
+class LaneConfig:
+    weight: int = 1
+    queue_size: int = 256
+    deadline_ms: float = 2000.0
+
+class _Job:
+    __slots__ = (
+        "model", "lane", "fn", "args", "items", "chunk_size", "position", "results",
+        "future", "enqueued_at", "started", "budget", "trace",
+    )
+
+    def __init__(self, model: str, lane: str, fn: Callable, args: tuple,
+                 items: Optional[List] = None, chunk_size: int = 0):
+        self.model = model
+        self.lane = lane
+        self.fn = fn
+        self.args = args
+        # Chunked jobs run fn(items[i:i + chunk_size]) and can be preempted in between
+        self.items = items
+        self.chunk_size = chunk_size
+        self.position = 0
+        self.results: List = []
+        self.future: Future = Future()
+        self.enqueued_at = time.monotonic()
+        self.started = False
+        # Budget of the submitting request (None for work no single request waits for)
+        self.budget = current_request.get()
+        self.trace = current_trace.get()
+
+class InferenceScheduler:
+    """
+    Bounded per-lane FIFO queues served by `slots` threads. A job only starts when
+    its model runs fewer than `limits[model]` jobs (default `default_limit`); other
+    models' jobs can overtake it meanwhile. `queue_size` and `deadline_ms` configure
+    the interactive lane unless `lanes` is given.
+    """
+
+    # Weight of the latest job in the per-model duration average
+    EWMA_ALPHA = 0.2
+
+    def __init__(
+        self,
+        slots: int,
+        limits: Optional[Dict[str, int]] = None,
+        queue_size: int = 256,
+        deadline_ms: float = 2000.0,
+        default_limit: int = 1,
+        lanes: Optional[Dict[str, LaneConfig]] = None,
+    ):
+        self.slots = max(1, slots)
+        self.limits = dict(limits or {})
+        self.default_limit = max(1, default_limit)
+        self.lanes = lanes or {
+            INTERACTIVE: LaneConfig(weight=4, queue_size=queue_size, deadline_ms=deadline_ms),
+            BULK: LaneConfig(weight=1, queue_size=queue_size, deadline_ms=deadline_ms),
+        }
+
+        self._cond = threading.Condition()
+        self._queues: Dict[str, Deque[_Job]] = {lane: deque() for lane in self.lanes}
+        self._running: Dict[str, int] = defaultdict(int)
+        self._running_by_lane: Dict[str, int] = defaultdict(int)
+        self._durations: Dict[str, float] = {}
+        # Stride scheduling: each job advances its lane's pass by 1 / weight
+        self._pass: Dict[str, float] = {lane: 0.0 for lane in self.lanes}
+        self._virtual_time = 0.0
+        self._lane_counts = {lane: {"rejected": 0, "expired": 0, "preempted": 0} for lane in self.lanes}
+        self.rejected = 0
+        self.expired = 0
+
+        for i in range(self.slots):
+            threading.Thread(target=self._worker, name=f"inference-{i}", daemon=True).start()
+
+    def limit(self, model: str) -> int:
+        return max(1, self.limits.get(model, self.default_limit))
+
+    def _lane(self, lane: Optional[str]) -> str:
+        lane = lane or current_lane.get()
+        return lane if lane in self.lanes else INTERACTIVE
+
+    def _estimate_wait(self, model: str, jobs_ahead: int) -> float:
+        return jobs_ahead * self._durations.get(model, 0.0) / self.limit(model)
+
+    def _jobs_ahead(self, model: str, lane: str) -> int:
+        return self._running[model] + sum(1 for job in self._queues[lane] if job.model == model)
+
+    def _reject(self, lane: str):
+        self.rejected += 1
+        self._lane_counts[lane]["rejected"] += 1
+
+    def _admit(self, model: str, jobs_ahead: int, lane: str):
+        config = self.lanes[lane]
+        deadline = config.deadline_ms / 1000
+        if jobs_ahead > config.queue_size or len(self._queues[lane]) >= config.queue_size:
+            self._reject(lane)
+            retry_after = self._estimate_wait(model, jobs_ahead) or deadline
+            raise ServiceOverloadedException(retry_after=math.ceil(retry_after))
+
+        wait = self._estimate_wait(model, jobs_ahead)
+        if wait > deadline:
+            self._reject(lane)
+            raise TooManyRequestsException(retry_after=math.ceil(wait - deadline))
+
+    def check_admission(self, model: str, jobs_ahead: int, lane: Optional[str] = None):
+        """
+        Raises 429/503 if a new job with `jobs_ahead` jobs of the same model before it
+        would miss its lane's deadline. Used by callers that queue work themselves (batchers).
+        """
+        with self._cond:
+            self._admit(model, jobs_ahead, self._lane(lane))
+
+    def _enqueue(self, job: _Job) -> Future:
+        with self._cond:
+            self._admit(job.model, self._jobs_ahead(job.model, job.lane), job.lane)
+            self._queues[job.lane].append(job)
+            self._cond.notify()
+        return job.future
+
+    def submit(self, model: str, fn: Callable, *args: Any, lane: Optional[str] = None) -> Future:
+        """Queues `fn(*args)` in `lane` (default: the current request's lane)."""
+        return self._enqueue(_Job(model, self._lane(lane), fn, args))
+
+    def submit_batch(
+        self, model: str, fn: Callable, items: List, lane: Optional[str] = None, chunk_size: int = 0
+    ) -> Future:
+        """
+        Queues `fn(items)`. With a `chunk_size`, fn runs on successive chunks (results
+        concatenated) and the job can be preempted between two of them.
+        """
+        if chunk_size and len(items) > chunk_size:
+            return self._enqueue(_Job(model, self._lane(lane), fn, (), items=list(items), chunk_size=chunk_size))
+        return self._enqueue(_Job(model, self._lane(lane), fn, (items,)))
+
+    async def run(self, model: str, fn: Callable, *args: Any, lane: Optional[str] = None) -> Any:
+        """Runs `fn(*args)` on an inference slot and awaits its result."""
+        return await asyncio.wrap_future(self.submit(model, fn, *args, lane=lane))
+
+    async def run_batch(
+        self, model: str, fn: Callable, items: List, lane: Optional[str] = None, chunk_size: int = 0
+    ) -> List:
+        return await asyncio.wrap_future(self.submit_batch(model, fn, items, lane=lane, chunk_size=chunk_size))
+
+    def _runnable(self, lane: str) -> Optional[_Job]:
+        for job in self._queues[lane]:
+            if self._running[job.model] < self.limit(job.model):
+                return job
+        return None
+
+    def _next_job(self, prefer: Optional[str] = None) -> Optional[_Job]:
+        candidates = {}
+        for lane in self.lanes:
+            job = self._runnable(lane)
+            if job is not None:
+                candidates[lane] = job
+                # A lane coming back from idle doesn't get to spend credit saved meanwhile
+                self._pass[lane] = max(self._pass[lane], self._virtual_time)
+        if not candidates:
+            return None
+
+        lane = prefer if prefer in candidates else min(candidates, key=lambda name: self._pass[name])
+        self._virtual_time = self._pass[lane]
+        self._pass[lane] += 1 / max(1, self.lanes[lane].weight)
+        job = candidates[lane]
+        self._queues[lane].remove(job)
+        return job
+
+    def _worker(self):
+        prefer = None
+        while True:
+            with self._cond:
+                job = self._next_job(prefer)
+                while job is None:
+                    self._cond.wait()
+                    job = self._next_job()
+                self._running[job.model] += 1
+                self._running_by_lane[job.lane] += 1
+
+            preempted = False
+            try:
+                preempted = self._execute(job)
+            finally:
+                with self._cond:
+                    self._running[job.model] -= 1
+                    self._running_by_lane[job.lane] -= 1
+                    self._cond.notify_all()
+            # The slot given back by a preempted job goes to the work that preempted it
+            prefer = self._higher_lane(job.lane) if preempted else None
+
+    def _higher_lane(self, lane: str) -> Optional[str]:
+        weight = self.lanes[lane].weight
+        higher = [name for name, config in self.lanes.items() if config.weight > weight]
+        return max(higher, key=lambda name: self.lanes[name].weight) if higher else None
+
+    def _should_yield(self, job: _Job) -> bool:
+        """Whether a higher-priority job is waiting for the slot (or model) `job` holds."""
+        weight = self.lanes[job.lane].weight
+        free_slots = self.slots - sum(self._running_by_lane.values())
+        for lane, config in self.lanes.items():
+            if config.weight <= weight:
+                continue
+            for waiting in self._queues[lane]:
+                if waiting.model == job.model and self._running[job.model] >= self.limit(job.model):
+                    return True
+                if free_slots <= 0 and self._running[waiting.model] < self.limit(waiting.model):
+                    return True
+        return False
+
+    def _record_duration(self, model: str, duration: float):
+        with self._cond:
+            previous = self._durations.get(model)
+            self._durations[model] = duration if previous is None else (
+                self.EWMA_ALPHA * duration + (1 - self.EWMA_ALPHA) * previous
+            )
+
+    @staticmethod
+    def _call(job: _Job, *args: Any) -> Any:
+        if job.trace is None:
+            return job.fn(*args)
+        # Stage timings of the job go to the trace of the request that submitted it
+        with collect_stages() as stages:
+            try:
+                return job.fn(*args)
+            finally:
+                job.trace.add_stages(job.model, stages)
+
+    def _execute(self, job: _Job) -> bool:
+        """Runs `job` (or its remaining chunks). True if it was preempted and requeued."""
+        if not job.started:
+            if not job.future.set_running_or_notify_cancel():
+                return False
+            job.started = True
+
+            waited = time.monotonic() - job.enqueued_at
+            QUEUE_WAIT_SECONDS.labels(job.model, job.lane).observe(waited)
+            if job.trace is not None:
+                job.trace.add(f"{job.model}.queue", waited)
+            reason = job.budget.abandoned() if job.budget is not None else None
+            if reason:
+                count_abandoned(job.model, reason)
+                job.future.set_exception(RequestAbandonedException(reason))
+                return False
+            deadline = self.lanes[job.lane].deadline_ms / 1000
+            if waited > deadline:
+                # The caller has most likely given up: don't spend a slot on it
+                with self._cond:
+                    self.expired += 1
+                    self._lane_counts[job.lane]["expired"] += 1
+                logger.warning(
+                    "Inference job expired in queue",
+                    model=job.model, lane=job.lane, waited_ms=round(waited * 1000, 1)
+                )
+                job.future.set_exception(ServiceOverloadedException(retry_after=math.ceil(deadline)))
+                return False
+
+        if job.items is None:
+            start = time.monotonic()
+            try:
+                result = self._call(job, *job.args)
+            except BaseException as e:
+                job.future.set_exception(e)
+            else:
+                job.future.set_result(result)
+            finally:
+                self._record_duration(job.model, time.monotonic() - start)
+            return False
+
+        while True:
+            chunk = job.items[job.position:job.position + job.chunk_size]
+            start = time.monotonic()
+            try:
+                job.results.extend(self._call(job, chunk))
+            except BaseException as e:
+                job.future.set_exception(e)
+                return False
+            finally:
+                self._record_duration(job.model, time.monotonic() - start)
+            job.position += len(chunk)
+            if job.position >= len(job.items):
+                job.future.set_result(job.results)
+                return False
+
+            with self._cond:
+                if self._should_yield(job):
+                    self._queues[job.lane].appendleft(job)
+                    self._lane_counts[job.lane]["preempted"] += 1
+                    self._cond.notify()
+                    return True
+
+    def _queued_by_model(self, lane: Optional[str] = None) -> Dict[str, int]:
+        counts: Dict[str, int] = defaultdict(int)
+        for name, queue in self._queues.items():
+            if lane is None or name == lane:
+                for job in queue:
+                    counts[job.model] += 1
+        return dict(counts)
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                "slots": self.slots,
+                "queued": sum(len(queue) for queue in self._queues.values()),
+                "queued_by_model": self._queued_by_model(),
+                "running": {model: count for model, count in self._running.items() if count},
+                "avg_job_ms": {model: round(d * 1000, 2) for model, d in self._durations.items()},
+                "rejected": self.rejected,
+                "expired": self.expired,
+                "lanes": {
+                    lane: {
+                        "queued_by_model": self._queued_by_model(lane),
+                        "running": self._running_by_lane[lane],
+                        **self._lane_counts[lane],
+                    }
+                    for lane in self.lanes
+                },
+            }
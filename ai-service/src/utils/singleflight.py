@@ -0,0 +1,70 @@
+
+"""
+Single-flight execution: concurrent computations of the same key share one call.
+
+The result cache only helps once a computation has finished; while it runs, an
+identical request (a viral post picked up by several sources in the same second)
+would compute it again. Here the first caller of a key computes it and the
+callers arriving meanwhile wait for its result instead.
+"""
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, List, Tuple
+
+class SingleFlight:
+    """
+    In-flight registry of one analyzer. Thread-safe.
+
+    A caller first computes the keys nobody else is computing, then waits for the
+    others: computations never wait on each other, so callers can't deadlock.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.shared = 0
+
+    def run(self, keys: List[Hashable], compute: Callable[[List[Hashable]], List]) -> List:
+        """
+        Values of the distinct `keys`, in order. `compute` receives the keys this
+        caller has to compute and returns their values in the same order.
+        """
+        owned: Dict[Hashable, Future] = {}
+        joined: List[Tuple[Hashable, Future]] = []
+        with self._lock:
+            for key in keys:
+                call = self._calls.get(key)
+                if call is None:
+                    owned[key] = self._calls[key] = Future()
+                else:
+                    joined.append((key, call))
+            self.shared += len(joined)
+
+        values: Dict[Hashable, object] = {}
+        if owned:
+            try:
+                computed = compute(list(owned))
+                if len(computed) != len(owned):
+                    raise RuntimeError(f"Single-flight '{self.name}' got {len(computed)} values for {len(owned)} keys")
+                for (key, call), value in zip(owned.items(), computed):
+                    call.set_result(value)
+                    values[key] = value
+            except BaseException as e:
+                # Waiters fail with the same error rather than hanging
+                for call in owned.values():
+                    if not call.done():
+                        call.set_exception(e)
+                raise
+            finally:
+                with self._lock:
+                    for key in owned:
+                        self._calls.pop(key, None)
+
+        for key, call in joined:
+            values[key] = call.result()
+        return [values[key] for key in keys]
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,131 @@
+
+"""
+Cold-start benchmark: how long a new worker takes to serve traffic.
+
+Each run starts a fresh `uvicorn src.main:app` process and measures:
+- import: time to import src.main (separate interpreter)
+- health: spawn to the first /health response (time-to-first-byte)
+- ready: spawn to the first 200 from /ready (models loaded and warmed up with
+  PRELOAD_MODELS, immediate otherwise)
+- first inference: spawn to the first response of each enabled analyzer, the
+  models being loaded lazily by that request
+The current environment (ENABLED_ANALYZERS, INFERENCE_BACKEND, PRELOAD_MODELS, ...)
+is passed to the server, so configurations can be compared run against run.
+
+Usage: python -m src.utils.startup_benchmark [--runs 5] [--port 8099] [--json]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+import httpx
+from ..config.settings import settings
+
+# First request sent to each analyzer
+PROBES = {
+    "sentiment": ("/analyze/sentiment", {"text": "Le service client est excellent"}),
+    "emotions": ("/analyze/emotions", {"text": "I am so happy with this product"}),
+    "keywords": ("/analyze/keywords", {"text": "Apple lance un nouvel iPhone à Paris", "language": "fr"}),
+    "topics": ("/analyze/topics", {"texts": ["battery life is great", "battery life is too short"]}),
+    "language": ("/detect/language", {"text": "Bonjour tout le monde"}),
+}
+
+def measure_import() -> float:
+    """Seconds to import src.main in a fresh interpreter."""
+    code = "import time; t = time.perf_counter(); import src.main; print(time.perf_counter() - t)"
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+def _wait_for(path: str, client: httpx.Client, process: subprocess.Popen, timeout: float) -> Optional[float]:
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        if process.poll() is not None:
+            return None
+        try:
+            if client.get(path).status_code == 200:
+                return time.perf_counter()
+        except httpx.TransportError:
+            pass
+        time.sleep(0.01)
+    return None
+
+def measure_run(port: int, analyzers: List[str], timeout: float) -> Dict:
+    """One cold start: seconds from spawn to /health, /ready and each analyzer's first response."""
+    spawned = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=timeout) as client:
+            healthy = _wait_for("/health", client, process, timeout)
+            if healthy is None:
+                raise RuntimeError("Server didn't answer /health (see its logs by running it directly)")
+            ready = _wait_for("/ready", client, process, timeout)
+            if ready is None:
+                raise RuntimeError("Server never got ready (see /ready for the warm-up progress)")
+
+            result = {
+                "health_s": round(healthy - spawned, 3),
+                "ready_s": round(ready - spawned, 3),
+                "first_inference_s": {},
+            }
+            for name in analyzers:
+                path, body = PROBES[name]
+                response = client.post(path, json=body)
+                response.raise_for_status()
+                result["first_inference_s"][name] = round(time.perf_counter() - spawned, 3)
+            return result
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+def _summary(values: List[float]) -> Dict:
+    return {
+        "median": round(statistics.median(values), 3),
+        "min": round(min(values), 3),
+        "max": round(max(values), 3),
+    }
+
+def benchmark(runs: int, port: int, timeout: float) -> Dict:
+    analyzers = [name for name in PROBES if settings.analyzer_enabled(name)]
+    imports = [measure_import() for _ in range(runs)]
+    results = [measure_run(port, analyzers, timeout) for _ in range(runs)]
+    return {
+        "runs": runs,
+        "analyzers": analyzers,
+        "import_s": _summary(imports),
+        "health_s": _summary([r["health_s"] for r in results]),
+        "ready_s": _summary([r["ready_s"] for r in results]),
+        "first_inference_s": {
+            name: _summary([r["first_inference_s"][name] for r in results]) for name in analyzers
+        },
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Time to /health and to the first inference of a new worker")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--timeout", type=float, default=300.0, help="Seconds allowed per step")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    report = benchmark(args.runs, args.port, args.timeout)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{args.runs} runs, analyzers: {', '.join(report['analyzers']) or 'none'}  (seconds: median [min-max])")
+    rows = [("import src.main", report["import_s"]), ("/health", report["health_s"]), ("/ready", report["ready_s"])]
+    rows += [(f"first {name}", stats) for name, stats in report["first_inference_s"].items()]
+    for label, stats in rows:
+        print(f"{label:<20}{stats['median']:>8}  [{stats['min']}-{stats['max']}]")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Optional
+import structlog
+from ..config.settings import settings
+
+logger = structlog.get_logger()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS brand_topics (
+    brand TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_brand_topics_updated ON brand_topics (updated_at);
+"""
+
+class SQLiteTopicStore:
+    """
+    Per-brand topic tables (see models/topic_tracker.py) persisted in a SQLite file.
+
+    All uvicorn workers of a node open the same file, so the mentions a worker folds
+    in are seen by the others, and tracking survives restarts. Updates are
+    read-modify-write transactions serialized by SQLite's write lock. Each row has a
+    version bumped on every write, so workers keep the tables they last read and only
+    load a brand again when another worker changed it. Beyond `max_brands`, the
+    least recently updated brands are dropped.
+    """
+
+    def __init__(self, path: str, max_brands: int):
+        self.path = path
+        self.max_brands = max_brands
+        self._local = threading.local()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connect().executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 connections can't be shared across threads: one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def version(self, brand: str) -> Optional[int]:
+        """Current version of a brand's table, None if the brand isn't tracked."""
+        row = self._connect().execute(
+            "SELECT version FROM brand_topics WHERE brand = ?", (brand,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def load(self, brand: str) -> Optional[Dict]:
+        row = self._connect().execute(
+            "SELECT state FROM brand_topics WHERE brand = ?", (brand,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def update(self, brand: str, apply: Callable[[Optional[int], Callable[[], Optional[Dict]]], Dict]) -> int:
+        """
+        Replaces a brand's state by `apply(version, load)`, where `version` is the stored
+        version (None for a new brand) and `load()` reads the stored state. No other
+        worker writes the brand in between. Returns the new version.
+        """
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = self.version(brand)
+            state = apply(version, lambda: self.load(brand))
+            new_version = (version or 0) + 1
+            conn.execute(
+                "INSERT OR REPLACE INTO brand_topics (brand, state, version, updated_at) VALUES (?, ?, ?, ?)",
+                (brand, json.dumps(state, ensure_ascii=False), new_version, time.time())
+            )
+            if version is None:
+                self._evict(conn)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return new_version
+
+    def _evict(self, conn: sqlite3.Connection):
+        removed = conn.execute(
+            "DELETE FROM brand_topics WHERE brand IN "
+            "(SELECT brand FROM brand_topics ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_brands,)
+        ).rowcount
+        if removed:
+            logger.info("Topic store evicted brands", removed=removed)
+
+    def delete(self, brand: str) -> bool:
+        return self._connect().execute("DELETE FROM brand_topics WHERE brand = ?", (brand,)).rowcount > 0
+
+def create_topic_store() -> Optional[SQLiteTopicStore]:
+    """Builds the store configured in settings, or None when topics are kept in worker memory."""
+    if not settings.TOPIC_STORE_PATH:
+        return None
+    return SQLiteTopicStore(settings.TOPIC_STORE_PATH, max_brands=settings.TOPIC_MAX_BRANDS)
@@ -0,0 +1,66 @@
+
+"""
+Per-request tracing: where the time of one request goes.
+
+A RequestTrace, held in a context variable while the request is handled (see
+api/routing.py), accumulates spans:
+- validate: body parsing, validation and dependencies, before the endpoint runs
+- preprocess: TextPreprocessor.clean_text
+- <model>.queue: wait for a batch and an inference slot
+- <model>.preprocess|tokenize|forward|postprocess: inference stages of the batch
+  the request's texts ran in (shared with the other requests of that batch)
+- endpoint, serialize (response model and JSON rendering), total
+Spans of several models overlap when they run concurrently (/analyze/full).
+"""
+import functools
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional
+
+class RequestTrace:
+    """Span durations (seconds) of one request. Thread-safe: slots record into it too."""
+
+    __slots__ = ("spans", "started", "endpoint_done", "_lock")
+
+    def __init__(self):
+        self.spans: Dict[str, float] = {}
+        self.started = time.perf_counter()
+        self.endpoint_done: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float):
+        with self._lock:
+            self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def add_stages(self, model: str, stages: Dict[str, float]):
+        for stage_name, seconds in stages.items():
+            self.add(f"{model}.{stage_name}", seconds)
+
+    def as_ms(self) -> Dict[str, float]:
+        with self._lock:
+            return {name: round(seconds * 1000, 2) for name, seconds in self.spans.items()}
+
+    def server_timing(self) -> str:
+        """`Server-Timing` header value, e.g. `validate;dur=0.41, sentiment.forward;dur=12.3`."""
+        return ", ".join(f"{name};dur={ms}" for name, ms in self.as_ms().items())
+
+# Trace of the request being served; None outside traced requests (and in batches,
+# which serve several requests: the batchers record into each request's trace)
+current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("current_trace", default=None)
+
+def traced(name: str) -> Callable:
+    """Decorator: calls of the function count towards span `name` of the current trace."""
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            trace = current_trace.get()
+            if trace is None:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                trace.add(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
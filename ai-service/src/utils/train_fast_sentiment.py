@@ -0,0 +1,96 @@
+
+"""
+Trains the linear model of the sentiment cascade's fast stage.
+
+Input is a JSON list (like data/labelled_sample.json), JSON lines or plain text
+lines. Records without a `sentiment` label, or all of them with
+`--labels transformer`, are labelled by the transformer: the fast stage then
+learns to agree with the model it stands in for.
+
+    PYTHONPATH=. python -m src.utils.train_fast_sentiment --input reviews.jsonl --output models/fast_sentiment.npz
+
+Point SENTIMENT_FAST_MODEL_PATH at the output to use it.
+"""
+import argparse
+import json
+import os
+from typing import Dict, List
+import numpy as np
+import structlog
+from ..models.fast_sentiment import CLASSES, FastSentimentModel
+from .quantization import SAMPLE_PATH
+
+logger = structlog.get_logger()
+
+# Response labels to linear model classes (MIXED texts are trained as neutral)
+LABEL_CLASSES = {"NEGATIVE": "negative", "NEUTRAL": "neutral", "MIXED": "neutral", "POSITIVE": "positive"}
+
+def load_records(path: str) -> List[Dict]:
+    """[{"text", "sentiment"?}, ...] from a JSON list, JSON lines or plain text lines."""
+    with open(path, encoding="utf-8") as f:
+        content = f.read()
+    if content.lstrip().startswith("["):
+        return json.loads(content)
+    records = []
+    for line in content.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        records.append(json.loads(line) if line.startswith("{") else {"text": line})
+    return records
+
+def transformer_labels(texts: List[str], batch_size: int = 64) -> List[str]:
+    """Labels of the configured transformer, bypassing the cascade and the result cache."""
+    from ..models.sentiment_analyzer import SentimentAnalyzer
+
+    analyzer = SentimentAnalyzer()
+    analyzer.initialize()
+    labels: List[str] = []
+    for start in range(0, len(texts), batch_size):
+        labels.extend(result["sentiment"] for result in analyzer._analyze_uncached(texts[start:start + batch_size]))
+    return labels
+
+def train(texts: List[str], labels: List[str], c: float = 4.0) -> Dict[str, np.ndarray]:
+    """Fits the multinomial logistic regression and returns its weights in CLASSES order."""
+    from sklearn.linear_model import LogisticRegression
+
+    targets = [CLASSES.index(LABEL_CLASSES[label]) for label in labels]
+    missing = set(range(len(CLASSES))) - set(targets)
+    if missing:
+        raise ValueError(f"No training text for class(es): {', '.join(CLASSES[i] for i in sorted(missing))}")
+
+    features = FastSentimentModel.load().features(texts)
+    classifier = LogisticRegression(C=c, max_iter=1000)
+    classifier.fit(features, targets)
+    return {
+        "coef": classifier.coef_.astype(np.float32),
+        "intercept": classifier.intercept_.astype(np.float32),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the linear fast stage of the sentiment cascade")
+    parser.add_argument("--input", default=SAMPLE_PATH, help="JSON list, JSON lines or text lines")
+    parser.add_argument("--output", default="models/fast_sentiment.npz")
+    parser.add_argument(
+        "--labels", choices=("data", "transformer"), default="data",
+        help="Use the records' labels (the transformer labels the others) or only the transformer's"
+    )
+    parser.add_argument("--c", type=float, default=4.0, help="Inverse regularization strength")
+    args = parser.parse_args()
+
+    records = load_records(args.input)
+    texts = [record["text"] for record in records]
+    labels = [record.get("sentiment") if args.labels == "data" else None for record in records]
+    unlabelled = [i for i, label in enumerate(labels) if label is None]
+    if unlabelled:
+        logger.info("Labelling texts with the transformer", count=len(unlabelled))
+        for i, label in zip(unlabelled, transformer_labels([texts[i] for i in unlabelled])):
+            labels[i] = label
+
+    weights = train(texts, labels, args.c)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    np.savez_compressed(args.output, **weights)
+    logger.info("Fast sentiment model saved", path=args.output, texts=len(texts))
+
+if __name__ == "__main__":
+    main()